@@ -34,14 +34,20 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so that request metrics include the other middleware
+    "users.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS middleware
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # After AuthenticationMiddleware; only admins may ask for a profile
+    "users.middleware.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # 503 instead of 500 when the login pages find every password hashing slot busy
+    "users.middleware.HashingBusyMiddleware",
 ]
 
 # CORS settings
@@ -77,7 +83,9 @@ SESSION_COOKIE_HTTPONLY = True
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.BasicAuthentication",
+        # Bearer tokens from /users/api/login/ (users.tokens); replaces HTTP Basic,
+        # which ran the password hasher on every request
+        "users.authentication.SignedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -85,8 +93,77 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
+    # Token buckets of users.throttling: bursts of N, refilled over the period
+    "DEFAULT_THROTTLE_RATES": {
+        "auth_ip": "20/min",
+        "auth_username": "5/min",
+    },
+    # Proxies in front of the app that append to X-Forwarded-For. With None, DRF
+    # takes the client-supplied header as the address, and anyone could pick a
+    # fresh auth_ip bucket per request; raise it when deploying behind a proxy
+    "NUM_PROXIES": 0,
+    "EXCEPTION_HANDLER": "users.exceptions.exception_handler",
 }
 
+# Password hashes computed at once per process, and how long (seconds) a login
+# waits for a free slot before it is answered with 503 (users.hashers)
+AUTH_MAX_CONCURRENT_HASHES = 4
+AUTH_HASH_WAIT = 5
+
+# Cache backends; swap "default" for Redis/Memcached to share it between processes
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+
+# Per-user response cache of the read endpoints (users.cache)
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_TIMEOUT = 300  # seconds
+
+# Live updates over Server-Sent Events (users.events): the pub/sub backend,
+# seconds between keep-alive comments, and seconds before a stream is closed
+# (EventSource reconnects on its own)
+EVENTS_BROKER = "users.events.InMemoryBroker"
+SSE_KEEPALIVE = 15
+SSE_MAX_DURATION = 300
+
+# Days a deletion stays in the sync change log (users.changelog); clients
+# that have not synced for longer reload everything
+CHANGE_LOG_RETENTION_DAYS = 30
+
+# Admin statistics (users.statistics); user counters are invalidated on change,
+# transaction volume may lag by up to this long
+ADMIN_STATISTICS_TIMEOUT = 60  # seconds
+
+# Signed API tokens (users.tokens), lifetimes in seconds
+ACCESS_TOKEN_LIFETIME = 5 * 60
+REFRESH_TOKEN_LIFETIME = 7 * 24 * 3600
+# How often each process picks up tokens revoked by other processes
+TOKEN_REVOCATION_REFRESH = 30
+
+# Rows per transaction of background jobs (users.jobs, manage.py run_jobs)
+JOB_BATCH_SIZE = 1000
+# Seconds without progress after which a running job counts as abandoned by
+# its worker (restart, crash) and is queued again
+JOB_STALE_AFTER = 15 * 60
+
+# Request metrics (users.metrics): Server-Timing headers on every response,
+# and the bearer token Prometheus scrapes /metrics with (None: admins only)
+SERVER_TIMING = True
+METRICS_TOKEN = None
+
+# Slow-query log (users.slowlog): queries of a request taking this long or
+# longer are stored with their plan (None turns it off), up to this many
+SLOW_QUERY_THRESHOLD = 0.2  # seconds
+SLOW_QUERY_LOG_SIZE = 500
+
+# Request profiler (users.profiling): the fraction of all requests profiled
+# without being asked, seconds between stack samples, and profiles kept
+PROFILE_SAMPLE_RATE = 0
+PROFILE_INTERVAL = 0.001
+PROFILE_LOG_SIZE = 100
+
 ROOT_URLCONF = "budget_manager.urls"
 
 TEMPLATES = [
@@ -122,6 +199,19 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
+# Password hashing cost: "fast", "default" or "strong" (users.hashers). Stored
+# hashes are upgraded or downgraded to the active profile on the next login.
+PASSWORD_HASHER_PROFILE = "default"
+
+PASSWORD_HASHERS = [
+    "users.hashers.ProfilePBKDF2PasswordHasher",
+    # Still verify hashes made by the other built-in hashers
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
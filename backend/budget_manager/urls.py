@@ -18,21 +18,39 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from users.api import UserViewSet, bulk_actions, user_statistics
-from users.views import TransactionViewSet, CategoryViewSet
+from users.api import (
+    JobViewSet,
+    ProfileViewSet,
+    UserViewSet,
+    bulk_actions,
+    metrics_view,
+    response_cache_statistics,
+    user_statistics,
+)
+from users.views import TransactionViewSet, CategoryViewSet, batch_operations, sync
 
 # Set up the API router
 router = DefaultRouter()
 router.register(r"users", UserViewSet)
 router.register(r"transactions", TransactionViewSet)
 router.register(r"categories", CategoryViewSet)
+router.register(r"jobs", JobViewSet)
+router.register(r"profiles", ProfileViewSet)
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("users/", include("users.urls")),
-    # API endpoints
-    path("api/", include(router.urls)),
+    # API endpoints (before the router, whose users/<pk>/ route would shadow them)
     path("api/users/bulk-actions/", bulk_actions, name="api-user-bulk-actions"),
     path("api/users/statistics/", user_statistics, name="api-user-statistics"),
+    path(
+        "api/cache/statistics/",
+        response_cache_statistics,
+        name="api-response-cache-statistics",
+    ),
+    path("api/sync/", sync, name="api-sync"),
+    path("api/batch/", batch_operations, name="api-batch"),
+    path("api/", include(router.urls)),
+    path("metrics", metrics_view, name="metrics"),
     path("api-auth/", include("rest_framework.urls", namespace="rest_framework")),
 ]
@@ -0,0 +1,50 @@
+"""
+Reusable harness for asserting an upper bound on the number of SQL queries a
+route issues.
+
+Mix ``QueryBudgetMixin`` into a TestCase and call ``assertQueryBudget``;
+``iter_route_names`` lists every named route of a URLconf so a test can fail
+when a new route is added without a budget.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+def iter_route_names(urlconf=None, ignored_namespaces=()):
+    """Yield the name of every named route in ``urlconf``."""
+
+    def walk(patterns, namespace):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace in ignored_namespaces:
+                    continue
+                yield from walk(pattern.url_patterns, pattern.namespace or namespace)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                yield f"{namespace}:{pattern.name}" if namespace else pattern.name
+
+    yield from walk(get_resolver(urlconf).url_patterns, None)
+
+
+class QueryBudgetMixin:
+    def assertQueryBudget(self, budget, method, path, **kwargs):
+        """
+        Issue ``self.client.<method>(path, **kwargs)`` and fail if it runs more
+        than ``budget`` queries, including those run while streaming the body.
+        Returns the response.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(path, **kwargs)
+            if response.streaming:
+                # Streamed bodies query lazily; drain them inside the budget
+                response.streaming_content = [b"".join(response.streaming_content)]
+
+        queries = [query["sql"] for query in context.captured_queries]
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            f"{method.upper()} {path} ran {len(queries)} queries, budget is {budget}:\n"
+            + "\n".join(queries),
+        )
+        return response
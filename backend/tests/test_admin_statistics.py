@@ -0,0 +1,70 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users import statistics
+from users.models import CustomUser, Transaction
+
+
+class AdminStatisticsTestCase(TestCase):
+    def setUp(self):
+        statistics.invalidate()
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username="admin", password="adminpassword123", role="admin"
+        )
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        CustomUser.objects.create_user(username="inactive", password="test123", is_active=False)
+        Transaction.objects.create(user=self.user, amount="10.00", date=date(2025, 1, 5))
+        Transaction.objects.create(user=self.user, amount="-4.50", date=date(2025, 1, 9))
+        Transaction.objects.create(user=self.admin_user, amount="7.00", date=date(2025, 3, 1))
+        self.client.force_login(self.admin_user)
+
+    def test_counters_in_a_single_aggregation(self):
+        with self.assertNumQueries(3):  # counters, users by month, transactions by month
+            stats = statistics.compute()
+
+        self.assertEqual(stats["total_users"], 3)
+        self.assertEqual(stats["active_users"], 2)
+        self.assertEqual(stats["inactive_users"], 1)
+        self.assertEqual(stats["admin_users"], 1)
+        self.assertEqual(stats["regular_users"], 2)
+        self.assertEqual(sum(entry["count"] for entry in stats["users_by_month"]), 3)
+        self.assertEqual(
+            stats["transactions_by_month"],
+            [
+                {"month": "2025-01", "count": 2, "total": "5.50"},
+                {"month": "2025-03", "count": 1, "total": "7.00"},
+            ],
+        )
+
+    def test_endpoints_share_the_cached_result(self):
+        self.client.get("/users/admin/users/statistics/")
+
+        with self.assertNumQueries(2):  # session and user
+            dashboard = self.client.get("/users/admin-dashboard/").json()
+        with self.assertNumQueries(2):
+            api = self.client.get("/api/users/statistics/").json()
+
+        self.assertEqual(dashboard["users_count"], 3)
+        self.assertEqual(api, self.client.get("/users/admin/users/statistics/").json())
+
+    def test_user_changes_invalidate(self):
+        writes = [
+            lambda: CustomUser.objects.create_user(username="new", password="test123"),
+            lambda: CustomUser.objects.filter(username="inactive").update(is_active=True),
+            lambda: CustomUser.objects.filter(username="new").delete(),
+            lambda: self.user.save(update_fields=["role"]),
+        ]
+        for index, write in enumerate(writes):
+            with self.subTest(write=index):
+                expected_before = statistics.compute()
+                self.assertEqual(statistics.get_statistics(), expected_before)
+                write()
+                self.assertEqual(statistics.get_statistics(), statistics.compute())
+
+    def test_logins_keep_the_cache(self):
+        statistics.get_statistics()
+        self.client.login(username="user", password="test123")
+        with self.assertNumQueries(0):
+            statistics.get_statistics()
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import CustomUser
+
+
+class AdminUserListingTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username="admin", password="adminpassword123", role="admin", email="boss@example.com"
+        )
+        CustomUser.objects.bulk_create(
+            CustomUser(
+                username=f"member{i:02}",
+                email=f"Member{i:02}@Example.com",
+                is_active=i % 3 != 0,
+                date_joined=datetime(2025, 1 + i % 12, 1, tzinfo=timezone.utc),
+            )
+            for i in range(30)
+        )
+        CustomUser.objects.create_user(username="Zoe", email="zoe@example.org")
+        self.client.force_login(self.admin_user)
+
+    def usernames(self, path, key):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [user["username"] for user in response.json()[key]]
+
+    def walk(self, path, key):
+        """Usernames of every page, following the next links."""
+        usernames, url = [], path
+        while url:
+            data = self.client.get(url).json()
+            usernames += [user["username"] for user in data[key]]
+            url = data["next"]
+        return usernames
+
+    def test_keyset_pages_in_username_order(self):
+        for path, key in (
+            ("/users/admin/users/?page_size=7", "users"),
+            ("/api/users/?page_size=7", "results"),
+        ):
+            with self.subTest(path=path):
+                usernames = self.walk(path, key)
+                self.assertEqual(
+                    usernames,
+                    list(
+                        CustomUser.objects.order_by("username").values_list("username", flat=True)
+                    ),
+                )
+
+    def test_previous_link(self):
+        first = self.client.get("/api/users/?page_size=5").json()
+        second = self.client.get(first["next"]).json()
+        back = self.client.get(second["previous"]).json()
+        self.assertEqual(back["results"], first["results"])
+
+    def test_filters(self):
+        cases = {
+            "search=MEMBER0": [f"member0{i}" for i in range(10)],
+            "search=zoe@": ["Zoe"],
+            "search=boss": ["admin"],
+            "role=admin": ["admin"],
+            "is_active=false&search=member1": ["member12", "member15", "member18"],
+            "joined_after=2025-12-01&joined_before=2025-12-31": ["member11", "member23"],
+            "joined_before=2025-01-01&search=member": ["member00", "member12", "member24"],
+        }
+        for query, expected in cases.items():
+            for path, key in (("/users/admin/users/", "users"), ("/api/users/", "results")):
+                with self.subTest(path=path, query=query):
+                    self.assertEqual(self.usernames(f"{path}?{query}&page_size=100", key), expected)
+
+    def test_invalid_parameters(self):
+        for query in ("role=owner", "is_active=maybe", "joined_after=2025-13-01", "cursor=garbage"):
+            with self.subTest(query=query):
+                self.assertIn(
+                    self.client.get(f"/users/admin/users/?{query}").status_code, (400, 404)
+                )
+                self.assertIn(self.client.get(f"/api/users/?{query}").status_code, (400, 404))
+
+    def test_detail_ignores_list_filters(self):
+        response = self.client.get(f"/api/users/{self.admin_user.id}/?role=user")
+        self.assertEqual(response.status_code, 200)
@@ -1,8 +1,14 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
-from users.models import CustomUser
+from users import jobs
+from users.models import Change, CustomUser, MonthlyRollup, Transaction
 
 
 class AdminUserManagementTestCase(TestCase):
@@ -94,12 +100,42 @@ class AdminUserManagementTestCase(TestCase):
             follow=True,
         )
 
-        # Check redirect and success message
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Deletion is queued and the user deactivated right away
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.regular_user1.refresh_from_db()
+        self.assertFalse(self.regular_user1.is_active)
 
-        # Check that user was deleted
+        # Check that user was deleted once the job has run
+        jobs.run_pending()
         self.assertFalse(CustomUser.objects.filter(username="user1").exists())
 
+    def test_api_delete_user_with_transactions(self):
+        """Deleting a user directly takes their categorized transactions along"""
+        self.client.force_login(self.admin_user)
+
+        def delete_with(user, count):
+            category = user.category_set.first()
+            for i in range(count):
+                Transaction.objects.create(
+                    user=user,
+                    category=category,
+                    amount=Decimal("-10.00"),
+                    date=date(2024, 1 + i % 12, 1),
+                )
+            changes = Change.objects.filter(user_id=user.pk).count()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.delete(f"/api/users/{user.pk}/")
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            self.assertFalse(CustomUser.objects.filter(pk=user.pk).exists())
+            self.assertFalse(Transaction.objects.filter(user_id=user.pk).exists())
+            self.assertFalse(MonthlyRollup.objects.filter(user_id=user.pk).exists())
+            # Nothing is logged for a user on the way out; compaction drops the rest
+            self.assertEqual(Change.objects.filter(user_id=user.pk).count(), changes)
+            return len(queries)
+
+        # No work per transaction
+        self.assertEqual(delete_with(self.regular_user1, 3), delete_with(self.regular_user2, 30))
+
     def test_admin_bulk_actions(self):
         """Test admin bulk actions on users"""
         # Login as admin
@@ -0,0 +1,115 @@
+from datetime import date
+
+from django.test import AsyncClient, TestCase
+from rest_framework.test import APIClient
+from users import tokens
+from users.cache import response_cache
+from users.models import CustomUser, Category, Transaction
+
+
+class AsyncReadEndpointsTestCase(TestCase):
+    """The async endpoints answer what their DRF counterparts answer."""
+
+    ENDPOINTS = {
+        "/users/api/async/user/": "/users/api/user/",
+        "/users/api/async/transactions/": "/api/transactions/",
+        "/users/api/async/transactions/summary/": "/api/transactions/summary/",
+        "/users/api/async/categories/": "/api/categories/",
+    }
+
+    def setUp(self):
+        response_cache().clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+        self.food = Category.objects.create(name="Groceries", user=self.user)
+        self.rent = Category.objects.create(name="Rent", user=self.user)
+        for day in range(1, 16):
+            Transaction.objects.create(
+                user=self.user, amount="-10.50", date=date(2025, 1, day), category=self.food
+            )
+        Transaction.objects.create(
+            user=self.user, amount="-800.00", date=date(2025, 1, 2), category=self.rent
+        )
+        other = CustomUser.objects.create_user(username="other", password="abc123")
+        Transaction.objects.create(user=other, amount="99.00", date=date(2025, 1, 1))
+
+    def test_same_data_as_sync_endpoints(self):
+        for async_path, sync_path in self.ENDPOINTS.items():
+            with self.subTest(async_path):
+                response = self.client.get(async_path)
+                self.assertEqual(response.status_code, 200)
+                body = response.json()
+                expected = self.client.get(sync_path).json()
+                for link in ("next", "previous"):
+                    if link in body:
+                        body[link] = body[link] and body[link].replace(async_path, sync_path)
+                self.assertEqual(body, expected)
+
+    def test_pages_follow_cursor(self):
+        seen = []
+        url = "/users/api/async/transactions/?page_size=4"
+        while url:
+            data = self.client.get(url).json()
+            seen += [row["id"] for row in data["results"]]
+            url = data["next"]
+        expected = list(
+            Transaction.objects.filter(user=self.user)
+            .order_by("-date", "-id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/users/api/async/transactions/?cursor=garbage")
+        self.assertEqual(response.status_code, 404)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        for path in self.ENDPOINTS:
+            with self.subTest(path):
+                self.assertEqual(self.client.get(path).status_code, 403)
+
+    def test_bearer_token(self):
+        self.client.logout()
+        access = tokens.issue(self.user, tokens.ACCESS)
+        response = self.client.get(
+            "/users/api/async/user/", headers={"Authorization": f"Bearer {access}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "user")
+
+        response = self.client.get(
+            "/users/api/async/user/", headers={"Authorization": "Bearer forged"}
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_get_only(self):
+        response = self.client.post("/users/api/async/categories/", {"name": "New"})
+        self.assertEqual(response.status_code, 405)
+
+    def test_cached_per_user(self):
+        path = "/users/api/async/transactions/summary/"
+        first = self.client.get(path)
+        self.assertEqual(first["X-Cache"], "MISS")
+        with self.assertNumQueries(2):  # session and user
+            response = self.client.get(path)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.json(), first.json())
+
+        response = self.client.get(path, headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+        Transaction.objects.create(
+            user=self.user, amount="5.00", date=date(2025, 2, 1), category=self.food
+        )
+        response = self.client.get(path)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["count"], 17)
+
+    async def test_served_by_asgi_handler(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        response = await client.get("/users/api/async/transactions/?page_size=5")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 5)
@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from unittest import mock
+
+from django.contrib.auth import hashers as django_hashers
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from users import hashers
+from users.models import CustomUser
+
+PROFILES = {"light": 1000, "heavier": 2000}
+
+
+@override_settings(PASSWORD_HASHER_PROFILES=PROFILES, PASSWORD_HASHER_PROFILE="light")
+class AuthServiceTestCase(TestCase):
+    def setUp(self):
+        cache.clear()  # auth throttle buckets
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+
+    @contextmanager
+    def assertHashes(self, count):
+        with mock.patch.object(django_hashers, "pbkdf2", wraps=django_hashers.pbkdf2) as pbkdf2:
+            yield
+        self.assertEqual(pbkdf2.call_count, count)
+
+    def login(self, username="user", password="test123"):
+        return self.client.post(
+            "/users/api/login/", {"username": username, "password": password}, format="json"
+        )
+
+    def test_login_hashes_once(self):
+        for username, password, status_code in (
+            ("user", "test123", 200),
+            ("user", "wrong", 401),
+            ("nobody", "test123", 401),
+        ):
+            with self.subTest(username=username, password=password):
+                with self.assertHashes(1):
+                    self.assertEqual(self.login(username, password).status_code, status_code)
+
+    def test_register_hashes_once(self):
+        data = {
+            "username": "registered",
+            "email": "registered@example.com",
+            "password1": "newpassword123",
+            "password2": "newpassword123",
+        }
+        with self.assertHashes(1):
+            response = self.client.post("/users/api/register/", data, format="json")
+        self.assertEqual(response.status_code, 201)
+
+    def test_login_rehashes_under_a_new_profile(self):
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+        with override_settings(PASSWORD_HASHER_PROFILE="heavier"):
+            with self.assertHashes(2):  # verify, then re-hash
+                self.assertEqual(self.login().status_code, 200)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+
+            # Up to date now: back to one hash
+            with self.assertHashes(1):
+                self.assertEqual(self.login().status_code, 200)
+
+    def test_unknown_profile(self):
+        with override_settings(PASSWORD_HASHER_PROFILE="nope"):
+            with self.assertRaises(ImproperlyConfigured):
+                hashers.profile_iterations()
@@ -0,0 +1,128 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from users import hashers
+from users.models import CustomUser
+
+REST_FRAMEWORK = {
+    **settings.REST_FRAMEWORK,
+    "DEFAULT_THROTTLE_RATES": {"auth_ip": "3/min", "auth_username": "2/min"},
+}
+
+
+@override_settings(
+    REST_FRAMEWORK=REST_FRAMEWORK,
+    PASSWORD_HASHER_PROFILES={"light": 1000},
+    PASSWORD_HASHER_PROFILE="light",
+)
+class AuthThrottleTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        CustomUser.objects.create_user(username="user", password="test123")
+
+    def login(self, username="user", password="wrong", ip="10.0.0.1", **headers):
+        return self.client.post(
+            "/users/api/login/",
+            {"username": username, "password": password},
+            format="json",
+            REMOTE_ADDR=ip,
+            **headers,
+        )
+
+    def test_ip_bucket(self):
+        for i in range(3):
+            self.assertEqual(self.login(username=f"someone{i}").status_code, 401)
+
+        response = self.login(username="someone-else")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "20")  # one token every 60/3 s
+
+        # Other addresses have their own bucket
+        self.assertEqual(self.login(password="test123", ip="10.0.0.2").status_code, 200)
+
+    def test_forwarded_for_does_not_pick_the_bucket(self):
+        for i in range(3):
+            response = self.login(username=f"someone{i}", HTTP_X_FORWARDED_FOR=f"10.0.1.{i}")
+            self.assertEqual(response.status_code, 401)
+        response = self.login(username="someone-else", HTTP_X_FORWARDED_FOR="10.0.1.9")
+        self.assertEqual(response.status_code, 429)
+
+    def test_username_bucket_spans_addresses(self):
+        self.assertEqual(self.login(ip="10.0.0.1").status_code, 401)
+        self.assertEqual(self.login(username="USER", ip="10.0.0.2").status_code, 401)
+        self.assertEqual(self.login(ip="10.0.0.3").status_code, 429)
+        self.assertEqual(self.login(username="other", ip="10.0.0.4").status_code, 401)
+
+    def test_registration_is_throttled(self):
+        data = {"username": "new", "email": "new@example.com", "password1": "a", "password2": "b"}
+        for _ in range(2):
+            response = self.client.post("/users/api/register/", data, format="json")
+            self.assertEqual(response.status_code, 400)
+        response = self.client.post("/users/api/register/", data, format="json")
+        self.assertEqual(response.status_code, 429)
+
+    def test_bucket_refills_over_time(self):
+        with mock.patch("users.throttling.time.time", return_value=1000.0):
+            for _ in range(2):
+                self.login()
+            self.assertEqual(self.login().status_code, 429)
+        # 60/2 s later one token is back, and only one
+        with mock.patch("users.throttling.time.time", return_value=1030.0):
+            self.assertEqual(self.login().status_code, 401)
+            self.assertEqual(self.login().status_code, 429)
+
+
+@override_settings(
+    AUTH_MAX_CONCURRENT_HASHES=1,
+    AUTH_HASH_WAIT=0.01,
+    PASSWORD_HASHER_PROFILES={"light": 1000},
+    PASSWORD_HASHER_PROFILE="light",
+)
+class HashingCapTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        CustomUser.objects.create_user(username="user", password="test123")
+        hashers._slots = None
+        self.addCleanup(setattr, hashers, "_slots", None)
+
+    def test_login_gets_503_when_every_slot_is_busy(self):
+        slots = hashers.hash_slots()
+        slots.acquire()
+        try:
+            response = APIClient().post(
+                "/users/api/login/", {"username": "user", "password": "test123"}, format="json"
+            )
+        finally:
+            slots.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+        response = APIClient().post(
+            "/users/api/login/", {"username": "user", "password": "test123"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_html_views_get_503_when_every_slot_is_busy(self):
+        pages = {
+            "/users/login/": {"username": "user", "password": "test123"},
+            "/users/register/": {
+                "username": "new",
+                "email": "new@example.com",
+                "password1": "a-long-password-123",
+                "password2": "a-long-password-123",
+            },
+        }
+        slots = hashers.hash_slots()
+        slots.acquire()
+        try:
+            for path, data in pages.items():
+                with self.subTest(path):
+                    response = self.client.post(path, data)
+                    self.assertEqual(response.status_code, 503)
+                    self.assertIn("Retry-After", response)
+        finally:
+            slots.release()
@@ -0,0 +1,161 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from users import batch
+from users.models import Change, CustomUser, Category, Transaction
+
+
+class BatchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+
+    def post(self, *operations):
+        return self.client.post("/api/batch/", {"operations": operations}, format="json")
+
+    def test_operations_with_references(self):
+        old = Transaction.objects.create(user=self.user, amount="1.00", date=date(2025, 1, 1))
+        response = self.post(
+            {"method": "POST", "path": "/api/categories/", "body": {"name": "Rent"}, "ref": "rent"},
+            {
+                "method": "POST",
+                "path": "/api/transactions/",
+                "body": {"amount": "-900.00", "date": "2025-06-01", "category_id": "@{rent.id}"},
+                "ref": "tx",
+            },
+            {
+                "method": "PATCH",
+                "path": "/api/transactions/@{tx.id}/",
+                "body": {"description": "June rent, @{rent.name}"},
+            },
+            {"method": "DELETE", "path": f"/api/transactions/{old.id}/"},
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        self.assertEqual([result["status"] for result in results], [201, 201, 200, 204])
+
+        category = Category.objects.get(user=self.user, name="Rent")
+        tx = Transaction.objects.get(pk=results[1]["body"]["id"])
+        self.assertEqual(tx.category, category)
+        self.assertEqual(tx.description, "June rent, Rent")
+        self.assertFalse(Transaction.objects.filter(pk=old.pk).exists())
+
+    def test_bulk_rows_can_be_referenced(self):
+        response = self.post(
+            {"method": "POST", "path": "/api/categories/", "body": {"name": "Food"}, "ref": "food"},
+            {
+                "method": "POST",
+                "path": "/api/transactions/bulk/",
+                "body": [
+                    {"amount": "1.00", "date": "2025-06-01", "category_id": "@{food.id}"}
+                    for _ in range(2)
+                ],
+                "ref": "rows",
+            },
+            {"method": "DELETE", "path": "/api/transactions/@{rows.1.id}/"},
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            list(Transaction.objects.filter(user=self.user).values_list("pk", flat=True)),
+            [response.data["results"][1]["body"][0]["id"]],
+        )
+
+    def test_change_log_is_written_once(self):
+        operations = [
+            {"method": "POST", "path": "/api/categories/", "body": {"name": f"C{i}"}}
+            for i in range(3)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            self.post(*operations)
+        inserts = [q for q in context.captured_queries if 'INSERT INTO "users_change"' in q["sql"]]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Change.objects.filter(user=self.user, kind=Change.CATEGORY).count(), 6)
+
+    def test_failure_rolls_back_everything(self):
+        response = self.post(
+            {"method": "POST", "path": "/api/categories/", "body": {"name": "Rent"}, "ref": "rent"},
+            {"method": "POST", "path": "/api/transactions/", "body": {"amount": "x"}},
+            {"method": "POST", "path": "/api/categories/", "body": {"name": "Never"}},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["index"], 1)
+        self.assertEqual([result["status"] for result in response.data["results"]], [201, 400])
+        self.assertIn("amount", response.data["results"][1]["body"])
+        self.assertFalse(Category.objects.filter(name__in=["Rent", "Never"]).exists())
+
+    def test_other_users_rows_are_not_found(self):
+        other = CustomUser.objects.create_user(username="other", password="abc123")
+        tx = Transaction.objects.create(user=other, amount="1.00", date=date(2025, 1, 1))
+        response = self.post({"method": "DELETE", "path": f"/api/transactions/{tx.id}/"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["results"][0]["status"], 404)
+        self.assertTrue(Transaction.objects.filter(pk=tx.pk).exists())
+
+    def test_unknown_reference(self):
+        response = self.post(
+            {"method": "POST", "path": "/api/transactions/", "body": {"category_id": "@{nope.id}"}}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["results"][0]["body"], {"error": "Unknown reference nope"})
+
+        # "²" is a digit to str.isdigit(), but no list index
+        response = self.post(
+            {"method": "POST", "path": "/api/categories/", "body": {"name": "Food"}, "ref": "food"},
+            {
+                "method": "POST",
+                "path": "/api/transactions/bulk/",
+                "body": [{"amount": "1.00", "date": "2025-06-01", "category_id": "@{food.id}"}],
+                "ref": "rows",
+            },
+            {"method": "DELETE", "path": "/api/transactions/@{rows.\u00b2.id}/"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["results"][2]["body"], {"error": "Unknown reference rows.\u00b2.id"}
+        )
+
+    def test_only_transaction_and_category_writes(self):
+        for path in ("/api/transactions/export/", "/api/users/", "/api/batch/", "/nowhere/"):
+            with self.subTest(path):
+                response = self.post({"method": "POST", "path": path, "body": {}})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(response.data["results"][0]["status"], (400, 404))
+
+    def test_malformed_batches(self):
+        operation = {"method": "POST", "path": "/api/categories/", "body": {"name": "A"}}
+        for data in (
+            [],
+            {"operations": []},
+            {"operations": [operation] * (batch.MAX_OPERATIONS + 1)},
+            {"operations": [{**operation, "method": "GET"}]},
+            {"operations": [{**operation, "path": None}]},
+            {"operations": [{**operation, "ref": "a"}, {**operation, "ref": "a"}]},
+        ):
+            with self.subTest(data):
+                response = self.client.post("/api/batch/", data, format="json")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.data)
+        self.assertFalse(Category.objects.filter(name="A").exists())
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.post({"method": "POST", "path": "/api/categories/", "body": {"name": "A"}})
+        self.assertEqual(response.status_code, 403)
+
+    def test_csrf_is_checked_once(self):
+        client = APIClient(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        operations = [{"method": "POST", "path": "/api/categories/", "body": {"name": "A"}}]
+        response = client.post("/api/batch/", {"operations": operations}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+        client.get("/users/api/csrf/")
+        token = client.cookies["csrftoken"].value
+        response = client.post(
+            "/api/batch/", {"operations": operations}, format="json", HTTP_X_CSRFTOKEN=token
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,135 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.test import TestCase
+from users import benchmarks, seeding
+from users.models import Category, CustomUser, MonthlyRollup, Transaction
+
+from .query_budget import iter_route_names
+from .test_query_budgets import IGNORED_NAMESPACES, UNTESTABLE_ROUTES
+
+
+class SeedingTestCase(TestCase):
+    def test_seeds_users_categories_and_transactions(self):
+        users = seeding.seed(3, 50, prefix="seeded")
+        self.assertEqual([user.username for user in users], ["seeded0", "seeded1", "seeded2"])
+        self.assertTrue(users[0].check_password(seeding.PASSWORD))
+
+        for user in users:
+            self.assertEqual(
+                set(Category.objects.filter(user=user).values_list("name", flat=True)),
+                set(seeding.CATEGORIES),
+            )
+            transactions = Transaction.objects.filter(user=user)
+            self.assertEqual(transactions.count(), 50)
+            # Every transaction is in one of the user's own categories
+            self.assertFalse(transactions.exclude(category__user=user).exists())
+            self.assertTrue(transactions.filter(category__name="Salary", amount__gt=0).exists())
+
+        # Rollups are refreshed for the seeded rows
+        self.assertEqual(
+            MonthlyRollup.objects.filter(user__in=users).aggregate(total=Sum("total"))["total"],
+            Transaction.objects.filter(user__in=users).aggregate(total=Sum("amount"))["total"],
+        )
+
+    def test_same_seed_same_data(self):
+        def amounts(prefix):
+            user = seeding.seed(1, 30, prefix=prefix, seed=7)[0]
+            return list(
+                Transaction.objects.filter(user=user)
+                .order_by("id")
+                .values_list("date", "amount", "description", "category__name")
+            )
+
+        self.assertEqual(amounts("a"), amounts("b"))
+
+    def test_command(self):
+        out = StringIO()
+        call_command("seed_benchmark", users=2, tx_per_user=10, prefix="cmd", stdout=out)
+        self.assertIn("Created 2 user(s)", out.getvalue())
+        self.assertEqual(Transaction.objects.filter(user__username__startswith="cmd").count(), 20)
+
+        with self.assertRaises(CommandError):
+            call_command("seed_benchmark", users=2, prefix="cmd", stdout=StringIO())
+
+
+class BenchmarkTestCase(TestCase):
+    def test_every_route_has_a_scenario(self):
+        routes = set(iter_route_names(ignored_namespaces=IGNORED_NAMESPACES))
+        self.assertEqual(routes - UNTESTABLE_ROUTES - set(benchmarks.SCENARIOS), set())
+
+    def test_baseline_covers_every_scenario(self):
+        baseline = json.loads(
+            (Path(settings.BASE_DIR) / "benchmarks" / "baseline.json").read_text()
+        )
+        for label in benchmarks.SCALES:
+            with self.subTest(label):
+                routes = {key.split(" ")[1] for key in baseline["results"][label]}
+                self.assertEqual(set(benchmarks.SCENARIOS) - routes, set())
+
+    def test_every_scenario_runs_and_leaves_no_data(self):
+        users = CustomUser.objects.count()
+        results = benchmarks.run({"tiny": (2, 20)}, iterations=1)
+
+        self.assertEqual(CustomUser.objects.count(), users)
+        self.assertEqual(results["scales"], {"tiny": {"users": 2, "transactions_per_user": 20}})
+        routes = results["results"]["tiny"]
+        self.assertEqual({key.split(" ")[1] for key in routes}, set(benchmarks.SCENARIOS))
+        row = routes["GET transaction-list"]
+        self.assertEqual(row["requests"], 1)
+        self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+        self.assertEqual(row["queries"], 3)
+
+    def test_compare(self):
+        def results(p50, queries):
+            return {"results": {"small": {"GET route": {"p50_ms": p50, "queries": queries}}}}
+
+        baseline = results(10.0, 3)
+        self.assertEqual(benchmarks.compare(results(14.0, 3), baseline), [])
+        self.assertEqual(benchmarks.compare(results(12.0, 2), baseline), [])
+        self.assertEqual(
+            benchmarks.compare(results(10.0, 4), baseline),
+            ["small GET route: 4 queries, was 3"],
+        )
+        self.assertEqual(
+            benchmarks.compare(results(16.0, 3), baseline),
+            ["small GET route: p50 16.0 ms, was 10.0 ms"],
+        )
+        # Within noise on fast routes
+        self.assertEqual(benchmarks.compare(results(0.9, 1), results(0.3, 1)), [])
+        # New routes need a baseline entry; routes that were not run do not
+        self.assertEqual(
+            benchmarks.compare(results(10.0, 3), {"results": {"small": {}}}),
+            ["small GET route: not in the baseline, re-record it"],
+        )
+        self.assertEqual(benchmarks.compare({"results": {"small": {}}}, baseline), [])
+
+    def test_command_compares_against_the_baseline(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        baseline = Path(directory.name) / "baseline.json"
+        options = {"scales": ["small"], "routes": ["user_info"], "iterations": 2}
+
+        call_command(
+            "benchmark_routes", baseline=baseline, save_baseline=True, stdout=StringIO(), **options
+        )
+        saved = json.loads(baseline.read_text())
+        self.assertEqual(saved["results"]["small"]["GET user_info"]["queries"], 2)
+
+        # Timings of two requests are noise; only the query count is compared
+        out = StringIO()
+        call_command("benchmark_routes", baseline=baseline, tolerance=100, stdout=out, **options)
+        self.assertIn("No regressions", out.getvalue())
+
+        saved["results"]["small"]["GET user_info"]["queries"] = 1
+        baseline.write_text(json.dumps(saved))
+        with self.assertRaises(CommandError):
+            call_command(
+                "benchmark_routes", baseline=baseline, tolerance=100, stdout=StringIO(), **options
+            )
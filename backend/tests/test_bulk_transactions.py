@@ -0,0 +1,104 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import CustomUser, Category, Transaction, MonthlyRollup
+
+
+class BulkTransactionTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+
+        self.category = Category.objects.create(name="Groceries", user=self.user)
+        self.other_category = Category.objects.create(name="Fuel", user=self.user)
+
+    def rows(self, count):
+        return [
+            {
+                "amount": f"{i}.50",
+                "date": f"2025-01-{1 + i % 28:02d}",
+                "description": f"Row {i}",
+                "category_id": (self.category if i % 2 else self.other_category).id,
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_create(self):
+        # One category lookup and one INSERT for the whole batch, plus rollup refreshes,
+        # the change log entries and the response cache invalidation
+        with self.assertNumQueries(16):
+            response = self.client.post("/api/transactions/bulk/", self.rows(200), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 200)
+        self.assertEqual(response.data[1]["category"]["name"], "Groceries")
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 200)
+        self.assertEqual(MonthlyRollup.objects.filter(user=self.user).count(), 2)
+
+    def test_bulk_create_is_all_or_nothing(self):
+        foreign = Category.objects.create(name="Foreign", user=None)
+        rows = self.rows(3)
+        rows[1]["amount"] = "not a number"
+        rows[2]["category_id"] = foreign.id
+
+        response = self.client.post("/api/transactions/bulk/", rows, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([row["index"] for row in response.data["errors"]], [1, 2])
+        self.assertIn("amount", response.data["errors"][0]["errors"])
+        self.assertIn("category_id", response.data["errors"][1]["errors"])
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_bulk_create_rejects_non_list(self):
+        response = self.client.post("/api/transactions/bulk/", {"amount": "1"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("non_field_errors", response.data)
+
+    def test_bulk_update(self):
+        transactions = Transaction.objects.bulk_create(
+            Transaction(user=self.user, amount=1, date=date(2025, 1, 1), category=self.category)
+            for _ in range(3)
+        )
+        rows = [
+            {"id": tx.id, "amount": "9.00", "category_id": self.other_category.id}
+            for tx in transactions
+        ]
+
+        response = self.client.patch("/api/transactions/bulk/", rows, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row["amount"] for row in response.data}, {"9.00"})
+        self.assertEqual(
+            Transaction.objects.filter(category=self.other_category, amount=9).count(), 3
+        )
+        self.assertFalse(MonthlyRollup.objects.filter(category=self.category).exists())
+
+    def test_bulk_update_rejects_foreign_rows(self):
+        other_user = CustomUser.objects.create_user(username="other", password="abc123")
+        foreign = Transaction.objects.create(user=other_user, amount=1, date=date(2025, 1, 1))
+
+        response = self.client.patch(
+            "/api/transactions/bulk/", [{"id": foreign.id, "amount": "2.00"}], format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("id", response.data["errors"][0]["errors"])
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.amount, 1)
+
+    def test_bulk_delete(self):
+        transactions = Transaction.objects.bulk_create(
+            Transaction(user=self.user, amount=1, date=date(2025, 1, 1)) for _ in range(3)
+        )
+        ids = [tx.id for tx in transactions[:2]]
+
+        response = self.client.delete(
+            "/api/transactions/bulk/", {"ids": ids + [999999]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["deleted"], sorted(ids))
+        self.assertEqual(response.data["not_found"], [999999])
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
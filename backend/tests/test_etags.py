@@ -0,0 +1,93 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users.cache import response_cache
+from users.models import CustomUser, Category, Transaction
+
+
+class ETagTestCase(TestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+        self.category = Category.objects.create(name="Groceries", user=self.user)
+        Transaction.objects.create(
+            user=self.user, amount="10.00", date=date(2025, 1, 1), category=self.category
+        )
+
+    def test_list_responses_carry_an_etag(self):
+        for path in ("/api/transactions/", "/api/categories/"):
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertTrue(response["ETag"].startswith('W/"'))
+                self.assertIn("no-cache", response["Cache-Control"])
+                self.assertIn("private", response["Cache-Control"])
+
+    def test_matching_etag_gets_304_without_running_the_view(self):
+        for path in ("/api/transactions/", "/api/categories/"):
+            with self.subTest(path=path):
+                tag = self.client.get(path)["ETag"]
+                response_cache().clear()
+                with self.assertNumQueries(2):  # session and user
+                    response = self.client.get(path, HTTP_IF_NONE_MATCH=tag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+                self.assertEqual(response["ETag"], tag)
+
+    def test_strong_comparison_and_lists_of_etags_match(self):
+        tag = self.client.get("/api/transactions/")["ETag"]
+        for header in (tag.removeprefix("W/"), f'"stale", {tag}', "*"):
+            with self.subTest(header=header):
+                response = self.client.get("/api/transactions/", HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+
+    def test_detail_routes_check_the_row_first(self):
+        tag = self.client.get("/api/transactions/")["ETag"]
+        own = Transaction.objects.get(user=self.user)
+        other = CustomUser.objects.create_user(username="other", password="abc")
+        theirs = Transaction.objects.create(user=other, amount="1.00", date=date(2025, 1, 1))
+
+        for header in (tag, "*"):
+            with self.subTest(header=header):
+                response = self.client.get(
+                    f"/api/transactions/{own.id}/", HTTP_IF_NONE_MATCH=header
+                )
+                self.assertEqual(response.status_code, 304)
+                for pk in (theirs.id, theirs.id + 1):
+                    response = self.client.get(
+                        f"/api/transactions/{pk}/", HTTP_IF_NONE_MATCH=header
+                    )
+                    self.assertEqual(response.status_code, 404)
+
+    def test_write_changes_the_etag(self):
+        tag = self.client.get("/api/transactions/")["ETag"]
+        self.client.post(
+            "/api/transactions/",
+            {"amount": "5.00", "date": "2025-01-02", "category_id": self.category.id},
+            format="json",
+        )
+        response = self.client.get("/api/transactions/", HTTP_IF_NONE_MATCH=tag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], tag)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_etag_is_per_user(self):
+        tag = self.client.get("/api/transactions/")["ETag"]
+        self.client.force_login(CustomUser.objects.create_user(username="other", password="abc"))
+        response = self.client.get("/api/transactions/", HTTP_IF_NONE_MATCH=tag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [])
+
+    def test_etag_depends_on_format(self):
+        tag = self.client.get("/api/transactions/")["ETag"]
+        response = self.client.get("/api/transactions/?format=api", HTTP_IF_NONE_MATCH=tag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_writes_are_not_conditional(self):
+        tag = self.client.get("/api/categories/")["ETag"]
+        response = self.client.post(
+            "/api/categories/", {"name": "New"}, format="json", HTTP_IF_NONE_MATCH=tag
+        )
+        self.assertEqual(response.status_code, 201)
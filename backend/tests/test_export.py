@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import CustomUser, Category, Transaction
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+
+        category = Category.objects.create(name="Groceries", user=self.user)
+        Transaction.objects.create(
+            user=self.user, amount="-12.50", date=date(2025, 1, 2), category=category
+        )
+        Transaction.objects.create(
+            user=self.user, amount="100.00", date=date(2025, 2, 1), description='Say "hi", ok'
+        )
+        other_user = CustomUser.objects.create_user(username="other", password="abc123")
+        Transaction.objects.create(user=other_user, amount="1.00", date=date(2025, 1, 1))
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        response = self.client.get("/api/transactions/export/?format=csv")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("transactions.csv", response["Content-Disposition"])
+
+        rows = list(csv.reader(io.StringIO(self.content(response))))
+        self.assertEqual(rows[0], ["id", "date", "amount", "description", "category"])
+        self.assertEqual(rows[1][1:], ["2025-01-02", "-12.50", "", "Groceries"])
+        self.assertEqual(rows[2][1:], ["2025-02-01", "100.00", 'Say "hi", ok', ""])
+        self.assertEqual(len(rows), 3)
+
+    def test_ndjson_export_with_date_range(self):
+        response = self.client.get("/api/transactions/export/?format=ndjson&from=2025-02-01")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["amount"], "100.00")
+        self.assertIsNone(rows[0]["category"])
+
+    def test_csv_is_default(self):
+        response = self.client.get("/api/transactions/export/?to=2025-01-31")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(len(self.content(response).splitlines()), 2)
+
+    def test_invalid_date(self):
+        response = self.client.get("/api/transactions/export/?format=csv&from=2025-13-01")
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_requires_login(self):
+        self.client.logout()
+        response = self.client.get("/api/transactions/export/?format=ndjson")
+        self.assertEqual(response.status_code, 403)
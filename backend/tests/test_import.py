@@ -0,0 +1,125 @@
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users import importers
+from users.models import CustomUser, Category, Transaction, MonthlyRollup
+
+CSV_EXPORT = """Date;Amount;Description;Category
+2025-01-02;-12,50;Bakery;Food
+2025-01-03;3 000,00;Salary;Salary
+not-a-date;1.00;Broken;
+2025-01-04;abc;Broken amount;
+2025-01-05;-40.00;Train;Travel
+"""
+
+QIF_EXPORT = """!Type:Bank
+D01/15/2025
+T-20.00
+PGrocery store
+LFood
+^
+D01/16'25
+T1,250.00
+PEmployer
+^
+"""
+
+OFX_EXPORT = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20250201120000
+<TRNAMT>-9.99
+<NAME>Streaming service
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250202<TRNAMT>100.00<MEMO>Refund</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+class ImportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+
+    def upload(self, name, content, **data):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post("/api/transactions/import/", {"file": upload, **data})
+
+    def test_csv_import_reports_row_errors(self):
+        response = self.upload("export.csv", CSV_EXPORT)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["processed"], 5)
+        self.assertEqual(response.data["imported"], 3)
+        self.assertEqual(response.data["failed"], 2)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [4, 5])
+
+        food = Transaction.objects.get(description="Bakery")
+        self.assertEqual(food.amount, Decimal("-12.50"))
+        # Existing categories are reused, unknown ones are created
+        self.assertEqual(food.category, Category.objects.get(user=self.user, name="Food"))
+        self.assertTrue(Category.objects.filter(user=self.user, name="Travel").exists())
+        self.assertEqual(Transaction.objects.get(description="Salary").amount, 3000)
+
+    def test_parse_amount(self):
+        self.assertEqual(importers.parse_amount("1 234,5"), Decimal("1234.50"))
+        for value in ("nan", "-NaN", "sNaN", "inf", "-Infinity", "1e12", ""):
+            with self.subTest(value), self.assertRaises(importers.ImportRowError):
+                importers.parse_amount(value)
+
+    def test_qif_import(self):
+        response = self.upload("export.qif", QIF_EXPORT)
+
+        self.assertEqual(response.data["imported"], 2)
+        tx = Transaction.objects.get(description="Employer")
+        self.assertEqual(tx.date, date(2025, 1, 16))
+        self.assertEqual(tx.amount, Decimal("1250.00"))
+        self.assertIsNone(tx.category)
+
+    def test_ofx_import(self):
+        response = self.upload("statement.ofx", OFX_EXPORT)
+
+        self.assertEqual(response.data["imported"], 2)
+        self.assertEqual(
+            list(Transaction.objects.order_by("date").values_list("description", "amount")),
+            [("Streaming service", Decimal("-9.99")), ("Refund", Decimal("100.00"))],
+        )
+
+    def test_unknown_format(self):
+        response = self.upload("export.xlsx", "whatever")
+        self.assertEqual(response.status_code, 400)
+
+    def test_chunks_keep_rollups_current(self):
+        chunks = []
+        rows = ((i, {"date": "2025-03-01", "amount": "1.00"}) for i in range(7))
+
+        report = importers.import_transactions(
+            self.user, rows, chunk_size=3, progress=lambda r: chunks.append(r["imported"])
+        )
+
+        self.assertEqual(report["imported"], 7)
+        self.assertEqual(chunks, [3, 6, 7])
+        self.assertEqual(MonthlyRollup.objects.get(user=self.user).count, 7)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as export:
+            export.write(CSV_EXPORT)
+        self.addCleanup(os.remove, export.name)
+
+        out, err = StringIO(), StringIO()
+        call_command(
+            "import_transactions", export.name, user="user", chunk_size=2, stdout=out, stderr=err
+        )
+
+        self.assertIn("Imported 3 of 5", out.getvalue())
+        self.assertIn("line 4", err.getvalue())
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
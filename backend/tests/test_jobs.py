@@ -0,0 +1,125 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users import jobs
+from users.models import CustomUser, Category, Change, Job, MonthlyRollup, Transaction
+
+
+class UserDeletionJobTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username="admin", password="adminpassword123", role="admin"
+        )
+        self.members = [
+            CustomUser.objects.create_user(username=f"member{i}", password="test123")
+            for i in range(3)
+        ]
+        for member in self.members:
+            Transaction.objects.bulk_create(
+                Transaction(
+                    user=member,
+                    amount=i,
+                    date=date(2025, 1 + i % 12, 1),
+                    category=Category.objects.filter(user=member).first(),
+                )
+                for i in range(25)
+            )
+        self.client.force_login(self.admin_user)
+
+    def test_bulk_delete_is_queued(self):
+        ids = [self.members[0].id, self.members[1].id]
+        response = self.client.post(
+            "/api/users/bulk-actions/", {"user_ids": ids, "action": "delete"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get(pk=response.data["job"])
+        self.assertEqual(
+            (job.kind, job.status, job.created_by), ("delete_users", "queued", self.admin_user)
+        )
+        # Nothing deleted yet, but the users can no longer sign in
+        self.assertEqual(CustomUser.objects.filter(pk__in=ids, is_active=False).count(), 2)
+        self.assertEqual(Transaction.objects.filter(user_id__in=ids).count(), 50)
+
+    def test_job_deletes_users_and_their_data_in_batches(self):
+        ids = [self.members[0].id, self.members[1].id]
+        job = jobs.schedule_user_deletion(ids, created_by=self.admin_user)
+
+        # 50 transactions, 24 rollups, 6 categories and 2 users
+        (job,) = jobs.run_pending(batch_size=7)
+
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual((job.total, job.processed), (144, 144))
+        self.assertFalse(CustomUser.objects.filter(pk__in=ids).exists())
+        for model in (Transaction, MonthlyRollup, Category, Change):
+            self.assertFalse(model.objects.filter(user_id__in=ids).exists())
+        # Other users are untouched
+        self.assertEqual(Transaction.objects.filter(user=self.members[2]).count(), 25)
+        self.assertEqual(MonthlyRollup.objects.filter(user=self.members[2]).count(), 12)
+
+    def test_one_delete_per_batch(self):
+        job = jobs.schedule_user_deletion([self.members[0].id])
+        transactions = Transaction.objects.filter(user=self.members[0])
+
+        with CaptureQueriesContext(connection) as context:
+            jobs.delete_in_batches(transactions, job, 10, raw=True)
+
+        deletes = [q for q in context.captured_queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(job.processed, 25)
+        job.refresh_from_db()
+        self.assertEqual(job.processed, 25)
+
+    def test_failed_job_is_reported(self):
+        job = jobs.enqueue(Job.DELETE_USERS, {})
+        with self.assertLogs("users.jobs", "ERROR"):
+            jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("user_ids", job.error)
+
+    def test_abandoned_job_is_requeued(self):
+        abandoned = jobs.schedule_user_deletion([self.members[0].id])
+        busy = jobs.schedule_user_deletion([self.members[1].id])
+        # Both were claimed; the worker of the first died after one batch
+        for job in (jobs.claim_next(), jobs.claim_next()):
+            jobs.advance(job, 5)
+        Job.objects.filter(pk=abandoned.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+        with self.assertLogs("users.jobs", "WARNING"):
+            self.assertEqual(jobs.run_pending(), [abandoned])
+        abandoned.refresh_from_db()
+        self.assertEqual((abandoned.status, abandoned.processed), (Job.DONE, abandoned.total))
+        self.assertFalse(CustomUser.objects.filter(pk=self.members[0].id).exists())
+        # Still running elsewhere
+        self.assertEqual(Job.objects.get(pk=busy.pk).status, Job.RUNNING)
+
+    def test_status_endpoints(self):
+        job = jobs.schedule_user_deletion([self.members[0].id], created_by=self.admin_user)
+
+        response = self.client.get(f"/api/jobs/{job.id}/")
+        self.assertEqual(response.data["status"], "queued")
+        self.assertEqual(response.data["progress"], 0.0)
+
+        jobs.run_pending()
+        response = self.client.get("/api/jobs/")
+        self.assertEqual(response.data["results"][0]["id"], job.id)
+        self.assertEqual(response.data["results"][0]["status"], "done")
+        self.assertEqual(response.data["results"][0]["progress"], 100.0)
+
+        self.client.force_login(self.members[2])
+        self.assertEqual(self.client.get("/api/jobs/").status_code, 403)
+
+    def test_worker_command(self):
+        jobs.schedule_user_deletion([self.members[0].id])
+        out = StringIO()
+        call_command("run_jobs", "--once", "--batch-size", "5", stdout=out)
+        self.assertIn("72 row(s) processed", out.getvalue())
+        self.assertFalse(CustomUser.objects.filter(pk=self.members[0].id).exists())
@@ -0,0 +1,139 @@
+import json
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+from users import events
+from users.models import CustomUser, Category, Transaction
+
+
+def parse(chunk):
+    """(event name, data) of one SSE message."""
+    chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines() if ": " in line)
+    return fields.get("event"), json.loads(fields["data"]) if "data" in fields else None
+
+
+@override_settings(SSE_KEEPALIVE=0.01, SSE_MAX_DURATION=5)
+class LiveEventsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+        self.category = Category.objects.create(name="Groceries", user=self.user)
+        Transaction.objects.create(
+            user=self.user, amount="100.00", date=date(2025, 1, 1), category=self.category
+        )
+
+    def open_stream(self):
+        response = self.client.get("/users/api/events/", HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = iter(response.streaming_content)
+        self.addCleanup(response.close)
+        self.assertEqual(parse(next(stream)), ("ready", {"balance": "100.00"}))
+        return stream
+
+    def next_delta(self, stream):
+        for chunk in stream:
+            if not chunk.startswith(b":"):  # keep-alive
+                return parse(chunk)
+
+    def test_transaction_deltas_with_balance(self):
+        stream = self.open_stream()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tx = Transaction.objects.create(
+                user=self.user, amount="-30.00", date=date(2025, 1, 2), category=self.category
+            )
+        name, data = self.next_delta(stream)
+        self.assertEqual(name, "delta")
+        self.assertEqual(data["balance"], "70.00")
+        self.assertEqual(
+            data["changes"],
+            [
+                {
+                    "type": "transaction",
+                    "op": "created",
+                    "id": tx.id,
+                    "amount": "-30.00",
+                    "date": "2025-01-02",
+                    "description": "",
+                    "category_id": self.category.id,
+                }
+            ],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tx.amount = "-40.00"
+            tx.save()
+            tx.delete()
+        _, data = self.next_delta(stream)
+        self.assertEqual(data["balance"], "100.00")
+        self.assertEqual([change["op"] for change in data["changes"]], ["updated", "deleted"])
+
+    def test_category_deltas(self):
+        stream = self.open_stream()
+        category_id = self.category.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.delete()
+        _, data = self.next_delta(stream)
+        self.assertEqual(
+            data["changes"], [{"type": "category", "op": "deleted", "id": category_id}]
+        )
+
+    def test_bulk_writes_ask_for_resync(self):
+        stream = self.open_stream()
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.bulk_create(
+                Transaction(user=self.user, amount="5.00", date=date(2025, 2, 1)) for _ in range(3)
+            )
+        _, data = self.next_delta(stream)
+        self.assertEqual(data, {"balance": "115.00", "resync": True})
+
+    def test_only_own_events(self):
+        stream = self.open_stream()
+        other = CustomUser.objects.create_user(username="other", password="abc123")
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(user=other, amount="1.00", date=date(2025, 1, 1))
+            Transaction.objects.create(user=self.user, amount="2.00", date=date(2025, 1, 1))
+        _, data = self.next_delta(stream)
+        self.assertEqual([change["amount"] for change in data["changes"]], ["2.00"])
+
+    def test_rolled_back_writes_publish_nothing(self):
+        subscription = events.Subscription(events.channel(self.user.id))
+        events.broker().subscribe(subscription)
+        self.addCleanup(events.broker().unsubscribe, subscription)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                Transaction.objects.create(user=self.user, amount="1.00", date=date(2025, 1, 1))
+                raise IntegrityError
+        self.assertEqual(subscription.drain(), [])
+
+    def test_slow_consumer_is_told_to_resync(self):
+        subscription = events.Subscription("test")
+        for i in range(events.MAX_BUFFERED + 5):
+            subscription.put({"id": i})
+        self.assertEqual(subscription.drain()[0], events.RESYNC)
+
+    def test_stream_ends_and_unsubscribes(self):
+        with override_settings(SSE_MAX_DURATION=0.05):
+            stream = self.open_stream()
+            self.assertTrue(all(chunk.startswith(b":") for chunk in stream))
+        self.assertNotIn(events.channel(self.user.id), events.broker().subscriptions)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.get("/users/api/events/", HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, 403)
+
+    async def test_async_stream_under_asgi(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        with override_settings(SSE_MAX_DURATION=0.05):
+            response = await client.get("/users/api/events/")
+            self.assertEqual(response.status_code, 200)
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(parse(chunks[0]), ("ready", {"balance": "100.00"}))
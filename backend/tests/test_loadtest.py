@@ -0,0 +1,99 @@
+import asyncio
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import LiveServerTestCase, override_settings
+from users import loadtest, seeding
+from users.models import CustomUser, Transaction
+
+# Every virtual user signs in from 127.0.0.1
+REST_FRAMEWORK = {
+    **settings.REST_FRAMEWORK,
+    "DEFAULT_THROTTLE_RATES": {"auth_ip": "1000/min", "auth_username": "1000/min"},
+}
+
+
+@override_settings(
+    REST_FRAMEWORK=REST_FRAMEWORK,
+    PASSWORD_HASHER_PROFILES={"light": 1000},
+    PASSWORD_HASHER_PROFILE="light",
+)
+class LoadTestTestCase(LiveServerTestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = seeding.seed(2, 20, prefix="load")
+        CustomUser.objects.create_user("boss", password=seeding.PASSWORD, role="admin")
+
+    def run_journeys(self, mix, **options):
+        # One virtual user: the live server threads share the test database's
+        # single SQLite connection, which does not take concurrent writes
+        options = {"concurrency": 1, "journeys": 4, "prefix": "load", "accounts": 2, **options}
+        return asyncio.run(loadtest.run(self.live_server_url, mix=mix, **options))
+
+    def test_every_journey_completes(self):
+        for name in loadtest.JOURNEYS:
+            with self.subTest(journey=name):
+                report = self.run_journeys({name: 1}, admin="boss")
+                self.assertEqual(report["failed_journeys"], {})
+                self.assertEqual(report["journeys"], {name: 4})
+                self.assertEqual(report["errors"], 0)
+
+    def test_report_per_endpoint(self):
+        before = Transaction.objects.count()
+        report = self.run_journeys({"transactions": 1})
+
+        # Three added, one deleted per journey
+        self.assertEqual(Transaction.objects.count(), before + 4 * 2)
+        row = report["endpoints"]["POST /api/transactions/"]
+        self.assertEqual(row["requests"], 12)
+        self.assertEqual(row["error_rate"], 0)
+        self.assertLessEqual(row["p50_ms"], row["p95_ms"])
+        self.assertLessEqual(row["p95_ms"], row["p99_ms"])
+        self.assertIn("DELETE /api/transactions/{id}/", report["endpoints"])
+        # One sign-in per virtual user, on a kept-alive connection
+        self.assertEqual(report["endpoints"]["POST /users/api/login/"]["requests"], 1)
+
+    def test_admin_journey_only_touches_registered_accounts(self):
+        self.run_journeys({"register": 1, "admin": 1}, admin="boss", journeys=4)
+
+        self.assertTrue(CustomUser.objects.get(username="boss").is_active)
+        for user in self.users:
+            user.refresh_from_db()
+            self.assertTrue(user.is_active)
+        self.assertTrue(CustomUser.objects.filter(username__startswith="load-").exists())
+
+    def test_failures_are_counted(self):
+        report = self.run_journeys({"dashboard": 1}, prefix="missing")
+
+        self.assertEqual(report["journeys"], {})
+        self.assertEqual(report["failed_journeys"], {"dashboard": 4})
+        self.assertEqual(report["endpoints"]["POST /users/api/login/"]["error_rate"], 1)
+
+    def test_invalid_runs(self):
+        with self.assertRaises(ValueError):
+            self.run_journeys({"admin": 1})
+        with self.assertRaises(ValueError):
+            self.run_journeys({"browse": 1})
+        with self.assertRaises(ValueError):
+            self.run_journeys(None, journeys=None)
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            "loadtest",
+            url=self.live_server_url,
+            concurrency=1,
+            journeys=2,
+            mix="dashboard=1",
+            prefix="load",
+            accounts=2,
+            stdout=out,
+        )
+        self.assertIn("GET /api/transactions/summary/", out.getvalue())
+        self.assertIn("dashboard: 2 completed, 0 failed", out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command("loadtest", url=self.live_server_url, mix="dashboard", stdout=StringIO())
@@ -0,0 +1,134 @@
+import re
+from datetime import date
+
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from users import metrics
+from users.models import Category, CustomUser, Transaction
+
+
+def server_timing(response):
+    """Server-Timing metrics of ``response`` as {name: (ms, description)}."""
+    timings = {}
+    for entry in response["Server-Timing"].split(","):
+        name, *params = entry.strip().split(";")
+        params = dict(param.split("=", 1) for param in params)
+        timings[name] = (float(params["dur"]), params.get("desc", "").strip('"'))
+    return timings
+
+
+def sample(text, name, **labels):
+    """Value of the sample ``name{labels}`` in a Prometheus text page."""
+    selector = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(f'{name}{{{selector}}}')} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.admin = CustomUser.objects.create_user(
+            username="admin", password="adminpassword123", role="admin"
+        )
+        category = Category.objects.create(name="Food", user=self.user)
+        Transaction.objects.bulk_create(
+            Transaction(user=self.user, amount=-i, date=date(2025, 1, 1), category=category)
+            for i in range(1, 6)
+        )
+        self.client = APIClient()
+        self.client.force_login(self.user)
+
+    def test_server_timing(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/transactions/")
+
+        timings = server_timing(response)
+        self.assertEqual(set(timings), {"total", "db", "serialize"})
+        self.assertEqual(timings["db"][1], f"{len(context)} queries")
+        self.assertGreater(timings["serialize"][0], 0)
+        self.assertLessEqual(timings["db"][0] + timings["serialize"][0], timings["total"][0])
+
+        # No serializer behind this view
+        self.assertEqual(server_timing(self.client.get("/users/api/csrf/"))["serialize"][0], 0)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_off(self):
+        self.assertNotIn("Server-Timing", self.client.get("/api/transactions/"))
+
+    async def test_server_timing_async(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        response = await client.get("/users/api/async/transactions/")
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(server_timing(response)["db"][1], r"^[1-9]\d* queries$")
+
+    @override_settings(DEBUG=True)
+    def test_middleware_is_native_under_asgi(self):
+        # With DEBUG on, Django logs every middleware it has to adapt
+        with self.assertNoLogs("django.request", "DEBUG"):
+            ASGIHandler().load_middleware(is_async=True)
+
+    def test_histograms(self):
+        listed = [self.client.get("/api/transactions/") for _ in range(3)]
+        self.client.get("/no/such/page/")
+        self.client.generic("BREW", "/api/transactions/")
+
+        self.client.force_login(self.admin)
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        text = response.content.decode()
+
+        labels = {"view": "transaction-list", "method": "GET"}
+        self.assertEqual(sample(text, "http_responses_total", **labels, status=200), 3)
+        self.assertEqual(
+            sample(text, "http_responses_total", view="unmatched", method="GET", status=404), 1
+        )
+        self.assertEqual(
+            sample(
+                text, "http_responses_total", view="transaction-list", method="OTHER", status=405
+            ),
+            1,
+        )
+        self.assertEqual(sample(text, "http_request_duration_seconds_count", **labels), 3)
+        self.assertEqual(
+            sample(text, "http_request_duration_seconds_bucket", **labels, le="+Inf"), 3
+        )
+        self.assertEqual(
+            sample(text, "http_response_size_bytes_sum", **labels),
+            sum(len(response.content) for response in listed),
+        )
+        self.assertEqual(
+            sample(text, "http_request_db_queries_sum", **labels),
+            sum(int(server_timing(response)["db"][1].split()[0]) for response in listed),
+        )
+        self.assertGreater(sample(text, "http_request_serialize_duration_seconds_sum", **labels), 0)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram((1, 5))
+        for value in (0, 1, 2, 5, 9):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 2, 1])
+        self.assertEqual(histogram.sum, 17)
+
+        metrics.record("view", "GET", 200, metrics.RequestMetrics(), 0.002, size=3)
+        text = metrics.render()
+        labels = {"view": "view", "method": "GET"}
+        self.assertEqual(sample(text, "http_response_size_bytes_bucket", **labels, le="100"), 1)
+        self.assertEqual(sample(text, "http_request_db_queries_bucket", **labels, le="0"), 1)
+        self.assertIn("# TYPE http_request_duration_seconds histogram", text)
+
+    def test_access(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.assertEqual(APIClient().get("/metrics").status_code, 403)
+
+        with override_settings(METRICS_TOKEN="scrape-token"):
+            anonymous = APIClient()
+            response = anonymous.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-token")
+            self.assertEqual(response.status_code, 200)
+            response = anonymous.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong")
+            self.assertEqual(response.status_code, 403)
@@ -0,0 +1,125 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import CustomUser, Category, Transaction, MonthlyRollup
+
+
+class MonthlyRollupTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.category = Category.objects.create(name="Groceries", user=self.user)
+        self.other_category = Category.objects.create(name="Fuel", user=self.user)
+
+    def rollup(self, month, category=None):
+        return MonthlyRollup.objects.get(user=self.user, category=category, month=month)
+
+    def snapshot(self):
+        return set(
+            MonthlyRollup.objects.values_list(
+                "user_id", "category_id", "month", "total", "count", "min_amount", "max_amount"
+            )
+        )
+
+    def test_create_update_delete(self):
+        tx = Transaction.objects.create(
+            user=self.user, amount="-20.00", date=date(2025, 3, 4), category=self.category
+        )
+        Transaction.objects.create(
+            user=self.user, amount="-5.00", date=date(2025, 3, 20), category=self.category
+        )
+
+        rollup = self.rollup(date(2025, 3, 1), self.category)
+        self.assertEqual(rollup.total, Decimal("-25.00"))
+        self.assertEqual(rollup.count, 2)
+        self.assertEqual(rollup.min_amount, Decimal("-20.00"))
+        self.assertEqual(rollup.max_amount, Decimal("-5.00"))
+
+        # Moving a transaction to another month updates both buckets
+        tx.date = date(2025, 4, 1)
+        tx.save()
+        self.assertEqual(self.rollup(date(2025, 3, 1), self.category).min_amount, Decimal("-5.00"))
+        self.assertEqual(self.rollup(date(2025, 4, 1), self.category).total, Decimal("-20.00"))
+
+        tx.delete()
+        self.assertFalse(
+            MonthlyRollup.objects.filter(month=date(2025, 4, 1), category=self.category).exists()
+        )
+
+    def test_queryset_update_and_delete(self):
+        for day in range(1, 4):
+            Transaction.objects.create(
+                user=self.user, amount="10.00", date=date(2025, 1, day), category=self.category
+            )
+
+        Transaction.objects.filter(category=self.category).update(category=self.other_category)
+        self.assertFalse(MonthlyRollup.objects.filter(category=self.category).exists())
+        self.assertEqual(self.rollup(date(2025, 1, 1), self.other_category).count, 3)
+
+        Transaction.objects.filter(date=date(2025, 1, 1)).delete()
+        self.assertEqual(self.rollup(date(2025, 1, 1), self.other_category).count, 2)
+
+    def test_bulk_create(self):
+        Transaction.objects.bulk_create(
+            [
+                Transaction(user=self.user, amount="1.00", date=date(2025, 2, 1)),
+                Transaction(user=self.user, amount="2.00", date=date(2025, 2, 28)),
+            ]
+        )
+        rollup = self.rollup(date(2025, 2, 1))
+        self.assertEqual(rollup.total, Decimal("3.00"))
+        self.assertEqual(rollup.count, 2)
+
+    def test_category_delete_moves_totals_to_uncategorized(self):
+        Transaction.objects.create(
+            user=self.user, amount="7.00", date=date(2025, 5, 5), category=self.category
+        )
+        Transaction.objects.create(user=self.user, amount="3.00", date=date(2025, 5, 6))
+
+        self.category.delete()
+        rollup = self.rollup(date(2025, 5, 1))
+        self.assertEqual(rollup.total, Decimal("10.00"))
+        self.assertEqual(rollup.count, 2)
+
+    def test_rebuild_matches_incremental(self):
+        Transaction.objects.create(
+            user=self.user, amount="-4.00", date=date(2024, 12, 31), category=self.category
+        )
+        Transaction.objects.create(user=self.user, amount="9.99", date=date(2025, 1, 1))
+        Transaction.objects.create(
+            user=self.user, amount="1.01", date=date(2025, 1, 2), category=self.other_category
+        )
+        incremental = self.snapshot()
+
+        MonthlyRollup.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_rollups", stdout=out)
+
+        self.assertIn("Rebuilt 3", out.getvalue())
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_monthly_endpoint(self):
+        Transaction.objects.create(
+            user=self.user, amount="-4.00", date=date(2024, 12, 31), category=self.category
+        )
+        Transaction.objects.create(user=self.user, amount="9.00", date=date(2025, 1, 1))
+        Transaction.objects.create(
+            user=self.user, amount="1.00", date=date(2025, 1, 2), category=self.other_category
+        )
+
+        client = APIClient()
+        client.force_login(self.user)
+        response = client.get("/api/transactions/monthly/", {"year": 2025})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["month"], "2025-01")
+        self.assertEqual(response.data[0]["total"], "10.00")
+        self.assertEqual(response.data[0]["count"], 2)
+
+        for year in ("abc", "\u00b2", "0", "10000"):
+            with self.subTest(year):
+                response = client.get("/api/transactions/monthly/", {"year": year})
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,84 @@
+import base64
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import CustomUser, Category, Transaction
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+
+        # Many rows share a date, which OFFSET paging over "-date" alone mishandles
+        Transaction.objects.bulk_create(
+            Transaction(user=self.user, amount=i, date=date(2025, 1, 1 + i % 3)) for i in range(25)
+        )
+
+    def walk(self, url, key="next"):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row["id"] for row in response.data["results"])
+            url = response.data[key]
+        return ids
+
+    def test_pages_cover_every_row_once_in_order(self):
+        ids = self.walk("/api/transactions/?page_size=4")
+
+        expected = list(
+            Transaction.objects.filter(user=self.user)
+            .order_by("-date", "-id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_previous_links_walk_back(self):
+        response = self.client.get("/api/transactions/?page_size=10")
+        first_page = [row["id"] for row in response.data["results"]]
+        self.assertIsNone(response.data["previous"])
+
+        response = self.client.get(response.data["next"])
+        self.assertIsNotNone(response.data["previous"])
+
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([row["id"] for row in response.data["results"]], first_page)
+        self.assertIsNone(response.data["previous"])
+
+    def test_no_count_query(self):
+        response = self.client.get("/api/transactions/")
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_page_size_is_capped(self):
+        Transaction.objects.bulk_create(
+            Transaction(user=self.user, amount=1, date=date(2025, 2, 1)) for _ in range(2000)
+        )
+        response = self.client.get("/api/transactions/?page_size=5000")
+        self.assertEqual(len(response.data["results"]), 2000)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/transactions/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+        # Well-formed, but with a value no row can have
+        for values in ("[null,1]", '["2025-01-01",null]'):
+            cursor = base64.urlsafe_b64encode(f'{{"v":{values},"r":0}}'.encode()).decode()
+            response = self.client.get(f"/api/transactions/?cursor={cursor}")
+            self.assertEqual(response.status_code, 404)
+
+    def test_categories_paginate_by_name(self):
+        for name in ["b", "a", "a", "c"]:
+            Category.objects.create(name=name, user=self.user)
+
+        ids = self.walk("/api/categories/?page_size=2")
+        expected = list(
+            Category.objects.filter(user=self.user)
+            .order_by("name", "id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
@@ -0,0 +1,143 @@
+import time
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from users import profiling, tokens
+from users.models import CustomUser, Profile
+
+
+def slow_statistics():
+    time.sleep(0.05)
+    return {}
+
+
+@mock.patch("users.api.statistics.get_statistics", slow_statistics)
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.admin = CustomUser.objects.create_user(
+            username="admin", password="adminpassword123", role="admin"
+        )
+        self.client = APIClient()
+        self.client.force_login(self.admin)
+
+    def test_profile_on_demand(self):
+        response = self.client.get("/api/users/statistics/", HTTP_X_PROFILE="1")
+
+        profile = Profile.objects.get(pk=response["X-Profile-Id"])
+        self.assertEqual(profile.trigger, Profile.ON_DEMAND)
+        self.assertEqual(profile.view, "api-user-statistics")
+        self.assertEqual((profile.method, profile.path), ("GET", "/api/users/statistics/"))
+        self.assertEqual((profile.status, profile.user_id), (200, self.admin.pk))
+        self.assertGreaterEqual(profile.duration, 0.05)
+        self.assertGreater(profile.samples, 0)
+
+        lines = profile.collapsed.splitlines()
+        for line in lines:
+            self.assertRegex(line, r"^[^ ;]+(;[^ ;]+)* \d+$")
+        # Most of the time is in the sleep, under the view
+        stacks = [line for line in lines if "tests/test_profiling.py:slow_statistics" in line]
+        self.assertTrue(all("users/api.py:user_statistics" in line for line in stacks))
+        sleeping = sum(int(line.rsplit(" ", 1)[1]) for line in stacks)
+        self.assertGreater(sleeping, 0.5 * profile.duration * 1_000_000)
+
+    def test_query_flag(self):
+        response = self.client.get("/api/users/statistics/?profile=1")
+        self.assertTrue(Profile.objects.filter(pk=response["X-Profile-Id"]).exists())
+
+    def test_bearer_token_admin(self):
+        client = APIClient()
+        access = tokens.issue_pair(self.admin)["access"]
+        response = client.get(
+            "/api/users/statistics/", HTTP_AUTHORIZATION=f"Bearer {access}", HTTP_X_PROFILE="1"
+        )
+        self.assertIn("X-Profile-Id", response)
+
+    @mock.patch("users.profiling.Sampler")
+    def test_only_admins_can_ask(self, sampler):
+        self.client.force_login(self.user)
+        response = self.client.get("/api/transactions/", HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+
+        anonymous = APIClient()
+        access = tokens.issue_pair(self.user)["access"]
+        for headers in ({}, {"HTTP_AUTHORIZATION": f"Bearer {access}"}):
+            response = anonymous.get("/api/users/statistics/?profile=1", **headers)
+            self.assertNotIn("X-Profile-Id", response)
+        response = anonymous.get("/users/api/csrf/?profile=1", HTTP_AUTHORIZATION="Bearer forged")
+        self.assertEqual(response.status_code, 200)
+
+        # The sampler never started
+        sampler.assert_not_called()
+        self.assertFalse(Profile.objects.exists())
+
+    def test_not_profiled_by_default(self):
+        self.client.get("/api/users/statistics/")
+        self.assertFalse(Profile.objects.exists())
+
+    @override_settings(PROFILE_SAMPLE_RATE=1)
+    def test_sampled_traffic(self):
+        self.client.force_login(self.user)
+        response = self.client.get("/api/transactions/")
+
+        # Sampled profiles are not announced to the client
+        self.assertNotIn("X-Profile-Id", response)
+        profile = Profile.objects.get()
+        self.assertEqual(profile.trigger, Profile.SAMPLED)
+        self.assertEqual((profile.view, profile.user_id), ("transaction-list", self.user.pk))
+
+    @override_settings(PROFILE_LOG_SIZE=2)
+    def test_keeps_the_latest(self):
+        ids = [
+            int(self.client.get("/api/users/statistics/?profile=1")["X-Profile-Id"])
+            for _ in range(3)
+        ]
+        self.assertEqual(sorted(Profile.objects.values_list("id", flat=True)), ids[1:])
+
+    def test_api(self):
+        profile_id = self.client.get("/api/users/statistics/?profile=1")["X-Profile-Id"]
+
+        response = self.client.get("/api/profiles/")
+        self.assertEqual([row["id"] for row in response.data["results"]], [int(profile_id)])
+        self.assertNotIn("collapsed", response.data["results"][0])
+
+        response = self.client.get(f"/api/profiles/{profile_id}/")
+        frames = [row["frame"] for row in response.data["top"]]
+        self.assertEqual(frames[0], "tests/test_profiling.py:slow_statistics")
+
+        response = self.client.get(f"/api/profiles/{profile_id}/collapsed/")
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        self.assertIn(f'filename="profile-{profile_id}.collapsed"', response["Content-Disposition"])
+        self.assertEqual(
+            response.content.decode(), Profile.objects.get(pk=profile_id).collapsed + "\n"
+        )
+        self.assertEqual(self.client.get("/api/profiles/999/collapsed/").status_code, 404)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get("/api/profiles/").status_code, 403)
+        self.assertEqual(self.client.get(f"/api/profiles/{profile_id}/collapsed/").status_code, 403)
+
+    def test_admin(self):
+        profile_id = self.client.get("/api/users/statistics/?profile=1")["X-Profile-Id"]
+        root = CustomUser.objects.create_superuser("root", "root@example.com", "rootpassword")
+        self.client.force_login(root)
+
+        response = self.client.get("/admin/users/profile/")
+        self.assertContains(response, f'href="/api/profiles/{profile_id}/collapsed/"')
+        response = self.client.get(f"/admin/users/profile/{profile_id}/change/")
+        self.assertContains(response, "/api/users/statistics/")
+
+    def test_top(self):
+        collapsed = "a;b;c 3000\na;b 1000\na;d 2000"
+        self.assertEqual(
+            profiling.top(collapsed, limit=2),
+            [
+                {"frame": "c", "self_ms": 3.0, "total_ms": 3.0},
+                {"frame": "d", "self_ms": 2.0, "total_ms": 2.0},
+            ],
+        )
+        self.assertEqual(
+            profiling.top(collapsed)[-1], {"frame": "b", "self_ms": 1.0, "total_ms": 4.0}
+        )
@@ -0,0 +1,321 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from users import jobs, tokens
+from users.models import CustomUser, Category, Profile, Transaction
+
+from .query_budget import QueryBudgetMixin, iter_route_names
+
+# Routes that cannot be exercised in this tree: the HTML views render
+# templates and redirect to a "home" route that the project does not ship.
+UNTESTABLE_ROUTES = {"register", "login"}
+
+# Third-party route namespaces (Django admin, DRF browsable API login)
+IGNORED_NAMESPACES = {"admin", "rest_framework"}
+
+
+class QueryBudgetCases(QueryBudgetMixin):
+    """
+    Query budgets for every route. Subclasses set ``rows``; every budget must
+    hold at each scale, so none of them may grow with the data.
+    """
+
+    rows = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username="user", password="test123")
+        cls.admin_user = CustomUser.objects.create_user(
+            username="admin", password="adminpassword123", role="admin"
+        )
+        CustomUser.objects.bulk_create(
+            CustomUser(username=f"member{i}", email=f"member{i}@example.com")
+            for i in range(cls.rows)
+        )
+        categories = Category.objects.bulk_create(
+            Category(name=f"Category {i}", user=cls.user) for i in range(cls.rows)
+        )
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=cls.user,
+                amount=i - cls.rows // 2,
+                date=date(2025, 1 + i % 12, 1 + i % 28),
+                category=categories[i % 10],
+            )
+            for i in range(cls.rows)
+        )
+
+    def setUp(self):
+        cache.clear()  # auth throttle buckets
+        self.client = APIClient()
+        self.client.force_login(self.user)
+
+    def new_transaction(self):
+        return Transaction.objects.create(
+            user=self.user, amount="1.00", date=date(2025, 6, 1), category=self.category()
+        )
+
+    def new_member(self):
+        return CustomUser.objects.create(username="disposable")
+
+    def category(self):
+        return Category.objects.filter(user=self.user).first()
+
+    def as_admin(self):
+        self.client.force_login(self.admin_user)
+
+    def test_every_route_has_a_budget(self):
+        tested = {
+            name[len("test_route_") :].replace("__", "-")
+            for name in dir(self)
+            if name.startswith("test_route_")
+        }
+        routes = set(iter_route_names(ignored_namespaces=IGNORED_NAMESPACES))
+        self.assertEqual(routes - UNTESTABLE_ROUTES - tested, set())
+
+    # users/urls.py
+
+    def test_route_logout(self):
+        self.assertQueryBudget(4, "post", "/users/logout/")
+
+    def test_route_admin__dashboard(self):
+        self.as_admin()
+        self.assertQueryBudget(5, "get", "/users/admin-dashboard/")
+
+    def test_route_admin__users__list(self):
+        self.as_admin()
+        self.assertQueryBudget(3, "get", "/users/admin/users/")
+
+    def test_route_admin__create__user(self):
+        self.as_admin()
+        data = {
+            "username": "created",
+            "email": "created@example.com",
+            "password1": "newpassword123",
+            "password2": "newpassword123",
+            "role": "user",
+            "is_active": True,
+        }
+        self.assertQueryBudget(10, "post", "/users/admin/users/create/", data=data)
+
+    def test_route_admin__delete__user(self):
+        self.as_admin()
+        member = self.new_member()
+        self.assertQueryBudget(7, "post", f"/users/admin/users/delete/{member.id}/")
+
+    def test_route_admin__bulk__actions(self):
+        self.as_admin()
+        member = self.new_member()
+        data = {"users": [member.id], "action": "deactivate"}
+        self.assertQueryBudget(5, "post", "/users/admin/users/bulk-actions/", data=data)
+
+    def test_route_admin__user__statistics(self):
+        self.as_admin()
+        self.assertQueryBudget(5, "get", "/users/admin/users/statistics/")
+
+    def test_route_csrf(self):
+        self.assertQueryBudget(0, "get", "/users/api/csrf/")
+
+    def test_route_api_register(self):
+        self.client.logout()
+        data = {
+            "username": "registered",
+            "email": "registered@example.com",
+            "password1": "newpassword123",
+            "password2": "newpassword123",
+        }
+        self.assertQueryBudget(16, "post", "/users/api/register/", data=data, format="json")
+
+    def test_route_api_login(self):
+        self.client.logout()
+        data = {"username": "user", "password": "test123"}
+        self.assertQueryBudget(9, "post", "/users/api/login/", data=data, format="json")
+
+    def test_route_api_logout(self):
+        self.assertQueryBudget(4, "post", "/users/api/logout/")
+
+    def test_route_api_token_refresh(self):
+        data = {"refresh": tokens.issue(self.user, tokens.REFRESH)}
+        # Claiming the token is an INSERT in a savepoint (SAVEPOINT/RELEASE), and
+        # the revocation list may be due for its poll of other processes' rows
+        self.assertQueryBudget(7, "post", "/users/api/token/refresh/", data=data, format="json")
+
+    def test_route_user_info(self):
+        self.assertQueryBudget(2, "get", "/users/api/user/")
+
+    def test_route_api_events(self):
+        # The stream closes right after its "ready" message
+        with override_settings(SSE_MAX_DURATION=0):
+            self.assertQueryBudget(3, "get", "/users/api/events/")
+
+    def test_route_async_user_info(self):
+        self.assertQueryBudget(2, "get", "/users/api/async/user/")
+
+    def test_route_async_transaction_list(self):
+        self.assertQueryBudget(3, "get", "/users/api/async/transactions/")
+        self.assertQueryBudget(3, "get", "/users/api/async/transactions/?page_size=500")
+
+    def test_route_async_transaction_summary(self):
+        self.assertQueryBudget(3, "get", "/users/api/async/transactions/summary/")
+
+    def test_route_async_category_list(self):
+        self.assertQueryBudget(3, "get", "/users/api/async/categories/")
+
+    def test_route_api__root(self):
+        self.assertQueryBudget(2, "get", "/api/")
+
+    def test_route_transaction__list(self):
+        self.assertQueryBudget(3, "get", "/api/transactions/")
+        self.assertQueryBudget(3, "get", "/api/transactions/?page_size=500")
+        data = {
+            "amount": "10.00",
+            "date": "2025-06-01",
+            "description": "Budgeted",
+            "category_id": self.category().id,
+        }
+        self.assertQueryBudget(11, "post", "/api/transactions/", data=data, format="json")
+
+    def test_route_transaction__detail(self):
+        tx = self.new_transaction()
+        url = f"/api/transactions/{tx.id}/"
+        self.assertQueryBudget(3, "get", url)
+        self.assertQueryBudget(11, "patch", url, data={"amount": "2.00"}, format="json")
+        self.assertQueryBudget(8, "delete", url)
+
+    def test_route_transaction__bulk(self):
+        category = self.category()
+        rows = [
+            {"amount": "1.00", "date": "2025-06-01", "category_id": category.id}
+            for _ in range(self.rows)
+        ]
+        response = self.assertQueryBudget(
+            13, "post", "/api/transactions/bulk/", data=rows, format="json"
+        )
+        ids = [row["id"] for row in response.data]
+        rows = [{"id": pk, "amount": "2.00"} for pk in ids]
+        self.assertQueryBudget(17, "patch", "/api/transactions/bulk/", data=rows, format="json")
+
+    def test_route_transaction__import(self):
+        lines = ["date,amount,category"]
+        lines += [f"2025-06-01,1.00,Category {i % 10}" for i in range(self.rows)]
+        upload = SimpleUploadedFile("export.csv", "\n".join(lines).encode())
+        # Dominated by the 10 rollup buckets the rows fall into, not by the row count
+        self.assertQueryBudget(39, "post", "/api/transactions/import/", data={"file": upload})
+
+    def test_route_transaction__export(self):
+        self.assertQueryBudget(3, "get", "/api/transactions/export/?format=csv")
+        self.assertQueryBudget(3, "get", "/api/transactions/export/?format=ndjson")
+
+    def test_route_transaction__summary(self):
+        self.assertQueryBudget(3, "get", "/api/transactions/summary/")
+
+    def test_route_transaction__monthly(self):
+        self.assertQueryBudget(3, "get", "/api/transactions/monthly/?year=2025")
+
+    def test_route_category__list(self):
+        self.assertQueryBudget(3, "get", "/api/categories/")
+        self.assertQueryBudget(5, "post", "/api/categories/", data={"name": "New"}, format="json")
+
+    def test_route_category__detail(self):
+        category = Category.objects.create(name="Disposable", user=self.user)
+        url = f"/api/categories/{category.id}/"
+        self.assertQueryBudget(3, "get", url)
+        self.assertQueryBudget(9, "delete", url)
+
+    # budget_manager/urls.py
+
+    def test_route_api__user__bulk__actions(self):
+        self.as_admin()
+        member = self.new_member()
+        data = {"user_ids": [member.id], "action": "deactivate"}
+        self.assertQueryBudget(4, "post", "/api/users/bulk-actions/", data=data, format="json")
+        data = {"user_ids": [member.id], "action": "delete"}
+        self.assertQueryBudget(7, "post", "/api/users/bulk-actions/", data=data, format="json")
+
+    def test_route_api__user__statistics(self):
+        self.as_admin()
+        self.assertQueryBudget(5, "get", "/api/users/statistics/")
+
+    def test_route_api__sync(self):
+        cursor = self.client.get("/api/sync/").data["cursor"]
+        self.new_transaction()
+        self.assertQueryBudget(4, "get", f"/api/sync/?since={cursor}")
+        self.assertQueryBudget(5, "get", "/api/sync/?since=0&limit=500")
+
+    def test_route_api__batch(self):
+        operations = [
+            {"method": "POST", "path": "/api/categories/", "body": {"name": "New"}, "ref": "new"}
+        ] + [
+            {
+                "method": "POST",
+                "path": "/api/transactions/",
+                "body": {"amount": "1.00", "date": "2025-06-01", "category_id": "@{new.id}"},
+            }
+            for _ in range(5)
+        ]
+        # One auth check and one rollup refresh and change log INSERT for the
+        # whole batch; 4 queries per transaction created
+        self.assertQueryBudget(
+            31, "post", "/api/batch/", data={"operations": operations}, format="json"
+        )
+
+    def test_route_api__response__cache__statistics(self):
+        self.as_admin()
+        self.assertQueryBudget(2, "get", "/api/cache/statistics/")
+
+    def new_profile(self):
+        return Profile.objects.create(
+            trigger=Profile.SAMPLED,
+            method="GET",
+            path="/api/transactions/",
+            status=200,
+            duration=0.01,
+            samples=1,
+            collapsed="views.py:list 10000",
+        )
+
+    def test_route_profile__list(self):
+        self.as_admin()
+        self.new_profile()
+        self.assertQueryBudget(3, "get", "/api/profiles/")
+
+    def test_route_profile__detail(self):
+        self.as_admin()
+        self.assertQueryBudget(3, "get", f"/api/profiles/{self.new_profile().id}/")
+
+    def test_route_profile__collapsed(self):
+        self.as_admin()
+        self.assertQueryBudget(3, "get", f"/api/profiles/{self.new_profile().id}/collapsed/")
+
+    def test_route_metrics(self):
+        self.as_admin()
+        self.assertQueryBudget(2, "get", "/metrics")
+
+    def test_route_job__list(self):
+        self.as_admin()
+        jobs.schedule_user_deletion([self.new_member().id])
+        self.assertQueryBudget(3, "get", "/api/jobs/")
+
+    def test_route_job__detail(self):
+        self.as_admin()
+        job = jobs.schedule_user_deletion([self.new_member().id])
+        self.assertQueryBudget(3, "get", f"/api/jobs/{job.id}/")
+
+    def test_route_customuser__list(self):
+        self.as_admin()
+        self.assertQueryBudget(4, "get", "/api/users/")
+
+    def test_route_customuser__detail(self):
+        self.as_admin()
+        self.assertQueryBudget(3, "get", f"/api/users/{self.user.id}/")
+
+
+class SmallDataQueryBudgetTestCase(QueryBudgetCases, TestCase):
+    rows = 10
+
+
+class LargeDataQueryBudgetTestCase(QueryBudgetCases, TestCase):
+    rows = 1000
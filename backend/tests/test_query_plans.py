@@ -0,0 +1,95 @@
+import re
+from datetime import date
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import CustomUser, Category, Transaction
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that keeps every SELECT with its params."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith("SELECT"):
+            self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite specific")
+class QueryPlanTestCase(TestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on every SELECT issued by the hot endpoints and
+    fails if any of them scans a whole table instead of seeking an index.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            username="admin", password="adminpassword123", role="admin"
+        )
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.category = Category.objects.create(name="Groceries", user=self.user)
+
+        self.tx = Transaction.objects.create(
+            user=self.user, amount="12.50", date=date(2025, 1, 1), category=self.category
+        )
+        Transaction.objects.bulk_create(
+            Transaction(user=self.user, amount=i, date=date(2025, 1, 1 + i % 28)) for i in range(30)
+        )
+
+    def full_scans(self, sql, params):
+        tables = set(connection.introspection.table_names())
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            details = [row[-1] for row in cursor.fetchall()]
+
+        scans = []
+        for detail in details:
+            match = re.match(r"SCAN (\w+)", detail)
+            if match and match.group(1) in tables and "INDEX" not in detail:
+                scans.append(detail)
+        return scans
+
+    def assertNoFullScans(self, url, user):
+        self.client.force_login(user)
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        self.assertTrue(recorder.queries, url)
+
+        for sql, params in recorder.queries:
+            scans = self.full_scans(sql, params)
+            self.assertFalse(scans, f"{url} scans a whole table: {scans}\n{sql}")
+
+        return response
+
+    def test_transaction_endpoints(self):
+        response = self.assertNoFullScans("/api/transactions/?page_size=5", self.user)
+        self.assertNoFullScans(response.data["next"], self.user)
+        self.assertNoFullScans(f"/api/transactions/{self.tx.id}/", self.user)
+        self.assertNoFullScans("/api/transactions/summary/", self.user)
+        self.assertNoFullScans("/api/transactions/monthly/?year=2025", self.user)
+
+    def test_category_endpoints(self):
+        response = self.assertNoFullScans("/api/categories/?page_size=2", self.user)
+        self.assertNoFullScans(response.data["next"], self.user)
+        self.assertNoFullScans(f"/api/categories/{self.category.id}/", self.user)
+
+    def test_statistics_endpoints(self):
+        self.assertNoFullScans("/users/admin-dashboard/", self.admin_user)
+        self.assertNoFullScans("/users/admin/users/statistics/", self.admin_user)
+        self.assertNoFullScans("/api/users/statistics/", self.admin_user)
+
+    def test_admin_user_listings(self):
+        queries = ("", "&search=Us", "&role=user&is_active=true", "&joined_after=2025-01-01")
+        for path in ("/users/admin/users/", "/api/users/"):
+            for query in queries:
+                url = f"{path}?page_size=1{query}"
+                with self.subTest(url=url):
+                    self.assertNoFullScans(url, self.admin_user)
@@ -0,0 +1,132 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users.cache import reset_cache_statistics, response_cache
+from users.models import CustomUser, Category, Transaction
+
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        response_cache().clear()
+        reset_cache_statistics()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+        self.category = Category.objects.create(name="Groceries", user=self.user)
+        Transaction.objects.create(
+            user=self.user, amount="10.00", date=date(2025, 1, 1), category=self.category
+        )
+
+    def get(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def assertCached(self, path, queries=2):
+        self.assertEqual(self.get(path)["X-Cache"], "MISS")
+        with self.assertNumQueries(queries):  # session and user (and the row)
+            response = self.get(path)
+        self.assertEqual(response["X-Cache"], "HIT")
+        return response
+
+    def test_read_endpoints_are_cached(self):
+        for path in (
+            "/api/transactions/",
+            "/api/transactions/summary/",
+            "/api/transactions/monthly/",
+            "/api/categories/",
+            "/users/api/user/",
+        ):
+            with self.subTest(path=path):
+                self.assertCached(path)
+        # A detail view looks up its row first, for its existence and owner
+        self.assertCached(f"/api/categories/{self.category.id}/", queries=3)
+
+    def test_hit_returns_the_same_data(self):
+        first = self.get("/api/transactions/")
+        second = self.get("/api/transactions/")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.json(), first.json())
+
+    def test_query_string_is_part_of_the_key(self):
+        self.get("/api/transactions/?page_size=1")
+        self.assertEqual(self.get("/api/transactions/?page_size=2")["X-Cache"], "MISS")
+
+    def test_api_write_invalidates(self):
+        self.assertCached("/api/transactions/")
+        self.client.post(
+            "/api/transactions/",
+            {"amount": "5.00", "date": "2025-01-02", "category_id": self.category.id},
+            format="json",
+        )
+        response = self.get("/api/transactions/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_bulk_queryset_writes_invalidate(self):
+        writes = [
+            lambda: Transaction.objects.bulk_create(
+                [Transaction(user=self.user, amount="1.00", date=date(2025, 2, 1))]
+            ),
+            lambda: Transaction.objects.filter(user=self.user).update(description="Edited"),
+            lambda: Transaction.objects.filter(user=self.user).update(amount="3.00"),
+            lambda: Transaction.objects.bulk_update(
+                list(Transaction.objects.filter(user=self.user)), ["description"]
+            ),
+            lambda: Transaction.objects.filter(user=self.user).delete(),
+            lambda: Category.objects.filter(user=self.user).update(name="Food"),
+            lambda: Category.objects.bulk_create([Category(name="New", user=self.user)]),
+            lambda: self.category.delete(),
+        ]
+        for index, write in enumerate(writes):
+            with self.subTest(write=index):
+                self.get("/api/transactions/")
+                self.assertEqual(self.get("/api/transactions/")["X-Cache"], "HIT")
+                write()
+                self.assertEqual(self.get("/api/transactions/")["X-Cache"], "MISS")
+
+    def test_profile_change_invalidates_but_login_does_not(self):
+        self.assertCached("/users/api/user/")
+        self.client.login(username="user", password="test123")
+        self.assertEqual(self.get("/users/api/user/")["X-Cache"], "HIT")
+
+        self.user.email = "user@example.com"
+        self.user.save()
+        response = self.get("/users/api/user/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["email"], "user@example.com")
+
+    def test_other_users_writes_do_not_invalidate(self):
+        other_user = CustomUser.objects.create_user(username="other", password="abc123")
+        self.assertCached("/api/transactions/")
+        Transaction.objects.create(user=other_user, amount="1.00", date=date(2025, 1, 1))
+        self.assertEqual(self.get("/api/transactions/")["X-Cache"], "HIT")
+
+    def test_users_do_not_share_entries(self):
+        self.get("/api/transactions/")
+        other_user = CustomUser.objects.create_user(username="other", password="abc123")
+        self.client.force_login(other_user)
+        response = self.get("/api/transactions/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"], [])
+
+    def test_errors_are_not_cached(self):
+        self.client.get("/api/transactions/?cursor=garbage")
+        response = self.client.get("/api/transactions/?cursor=garbage")
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("X-Cache", response)
+
+    def test_statistics_endpoint(self):
+        self.get("/api/transactions/")
+        self.get("/api/transactions/")
+        self.get("/api/categories/")
+
+        self.client.force_login(
+            CustomUser.objects.create_user(username="admin", password="admin123", role="admin")
+        )
+        response = self.get("/api/cache/statistics/")
+        self.assertEqual(response.data, {"hits": 1, "misses": 2, "hit_rate": 0.3333})
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get("/api/cache/statistics/").status_code, 403)
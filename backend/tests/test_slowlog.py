@@ -0,0 +1,89 @@
+import json
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from users.models import Category, CustomUser, SlowQuery, Transaction
+
+
+@override_settings(SLOW_QUERY_THRESHOLD=0)
+class SlowQueryLogTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        category = Category.objects.create(name="Food", user=self.user)
+        Transaction.objects.create(
+            user=self.user, amount="-5.00", date=date(2025, 1, 1), category=category
+        )
+        self.client = APIClient()
+        self.client.force_login(self.user)
+
+    def transaction_query(self):
+        return SlowQuery.objects.filter(sql__contains='FROM "users_transaction"').first()
+
+    def test_logs_queries_with_origin_and_plan(self):
+        self.client.get("/api/transactions/?page_size=5")
+
+        entry = self.transaction_query()
+        self.assertEqual(entry.view, "transaction-list")
+        self.assertEqual(entry.method, "GET")
+        self.assertEqual(entry.path, "/api/transactions/?page_size=5")
+        self.assertEqual(entry.user_id, self.user.pk)
+        self.assertEqual(entry.database, "default")
+        self.assertGreaterEqual(entry.duration, 0)
+        # The project frame that evaluated the queryset, not Django's
+        self.assertRegex(entry.callsite, r"^users/\w+\.py:\d+ in \w+$")
+        self.assertIn(str(self.user.pk), entry.params)
+        self.assertRegex(entry.plan, r"(SCAN|SEARCH) ")
+
+    @override_settings(SLOW_QUERY_THRESHOLD=None)
+    def test_off(self):
+        self.client.get("/api/transactions/")
+        self.assertFalse(SlowQuery.objects.exists())
+
+    @override_settings(SLOW_QUERY_THRESHOLD=60)
+    def test_fast_queries_are_not_logged(self):
+        self.client.get("/api/transactions/")
+        self.assertFalse(SlowQuery.objects.exists())
+
+    @override_settings(SLOW_QUERY_LOG_SIZE=3)
+    def test_ring_buffer(self):
+        for _ in range(3):
+            self.client.get("/api/categories/")
+        self.client.get("/api/transactions/")
+
+        self.assertLessEqual(SlowQuery.objects.count(), 3)
+        # The newest entries are kept
+        self.assertEqual(SlowQuery.objects.order_by("-id").first().view, "transaction-list")
+
+    def test_admin(self):
+        self.client.get("/api/transactions/")
+        admin = CustomUser.objects.create_superuser("root", "root@example.com", "rootpassword")
+        self.client.force_login(admin)
+
+        response = self.client.get("/admin/users/slowquery/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "transaction-list")
+        entry = self.transaction_query()
+        response = self.client.get(f"/admin/users/slowquery/{entry.pk}/change/")
+        self.assertContains(response, "users_transaction")
+        self.assertEqual(self.client.get("/admin/users/slowquery/add/").status_code, 403)
+
+    def test_dump_command(self):
+        self.client.get("/api/transactions/")
+        entry = self.transaction_query()
+
+        out = StringIO()
+        call_command("dump_slow_queries", view="transaction-list", stdout=out)
+        self.assertIn("GET /api/transactions/ (transaction-list", out.getvalue())
+        self.assertIn(f"at {entry.callsite}", out.getvalue())
+        self.assertIn(entry.plan.splitlines()[0].strip(), out.getvalue())
+
+        newest = SlowQuery.objects.latest("id")
+        out = StringIO()
+        call_command("dump_slow_queries", json=True, limit=1, clear=True, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(json.loads(lines[0])["sql"], newest.sql)
+        self.assertIn("Cleared", lines[1])
+        self.assertFalse(SlowQuery.objects.exists())
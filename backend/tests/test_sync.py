@@ -0,0 +1,190 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users import jobs
+from users.models import Change, CustomUser, Category, Job, Transaction
+
+
+class SyncTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+        self.category = Category.objects.create(name="Groceries", user=self.user)
+
+    def cursor(self):
+        response = self.client.get("/api/sync/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["reset"])
+        return response.data["cursor"]
+
+    def sync(self, since, **params):
+        response = self.client.get("/api/sync/", {"since": since, **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["reset"])
+        return response.data
+
+    def new_transaction(self, amount="1.00"):
+        return Transaction.objects.create(
+            user=self.user, amount=amount, date=date(2025, 1, 1), category=self.category
+        )
+
+    def test_only_changed_rows_in_order(self):
+        kept = self.new_transaction()
+        cursor = self.cursor()
+
+        removed = self.new_transaction()
+        removed_id = removed.id
+        kept.amount = "5.00"
+        kept.save()
+        removed.delete()
+        self.category.name = "Food"
+        self.category.save()
+
+        data = self.sync(cursor)
+        self.assertFalse(data["more"])
+        self.assertEqual(
+            [(change["type"], change["op"], change["id"]) for change in data["changes"]],
+            [
+                ("transaction", "upsert", kept.id),
+                ("transaction", "delete", removed_id),
+                ("category", "upsert", self.category.id),
+            ],
+        )
+        self.assertEqual(data["changes"][0]["data"]["amount"], "5.00")
+        self.assertEqual(data["changes"][2]["data"]["name"], "Food")
+
+        # Nothing new since the returned cursor
+        self.assertEqual(self.sync(data["cursor"])["changes"], [])
+
+    def test_bulk_writes_are_logged(self):
+        cursor = self.cursor()
+        rows = Transaction.objects.bulk_create(
+            Transaction(user=self.user, amount="1.00", date=date(2025, 1, 1)) for _ in range(3)
+        )
+        Transaction.objects.filter(pk=rows[0].pk).update(description="Edited")
+        with CaptureQueriesContext(connection) as context:
+            Transaction.objects.filter(pk__in=[rows[1].pk, rows[2].pk]).delete()
+        inserts = [q for q in context.captured_queries if 'INSERT INTO "users_change"' in q["sql"]]
+        self.assertEqual(len(inserts), 1)
+
+        changes = self.sync(cursor)["changes"]
+        self.assertEqual((changes[0]["op"], changes[0]["id"]), ("upsert", rows[0].pk))
+        self.assertCountEqual(
+            [(change["op"], change["id"]) for change in changes[1:]],
+            [("delete", rows[1].pk), ("delete", rows[2].pk)],
+        )
+        self.assertEqual(changes[0]["data"]["description"], "Edited")
+
+    def test_rolled_back_writes_are_not_logged(self):
+        cursor = self.cursor()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.new_transaction()
+            raise IntegrityError
+        self.assertEqual(self.sync(cursor)["changes"], [])
+
+    def test_pages(self):
+        cursor = self.cursor()
+        created = [self.new_transaction().id for _ in range(5)]
+
+        seen, more = [], True
+        while more:
+            data = self.sync(cursor, limit=2)
+            seen += [change["id"] for change in data["changes"]]
+            cursor, more = data["cursor"], data["more"]
+        self.assertEqual(seen, created)
+
+    def test_other_users_changes_are_not_visible(self):
+        cursor = self.cursor()
+        other = CustomUser.objects.create_user(username="other", password="abc123")
+        Transaction.objects.create(user=other, amount="1.00", date=date(2025, 1, 1))
+        self.assertEqual(self.sync(cursor)["changes"], [])
+
+    def test_invalid_parameters(self):
+        for params in (
+            {"since": "abc"},
+            {"since": "-1"},
+            {"since": "\u00b2"},
+            {"since": "1", "limit": "x"},
+        ):
+            with self.subTest(params):
+                self.assertEqual(self.client.get("/api/sync/", params).status_code, 400)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.client.get("/api/sync/").status_code, 403)
+
+
+class ChangeLogCompactionTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+
+    def compact(self):
+        jobs.enqueue(Job.COMPACT_CHANGES, {})
+        (job,) = jobs.run_pending()
+        self.assertEqual(job.status, Job.DONE, job.error)
+        self.assertEqual(job.processed, job.total)
+        return job
+
+    def test_superseded_entries_are_dropped(self):
+        cursor = self.client.get("/api/sync/").data["cursor"]
+        tx = Transaction.objects.create(user=self.user, amount="1.00", date=date(2025, 1, 1))
+        for amount in ("2.00", "3.00"):
+            tx.amount = amount
+            tx.save()
+
+        self.compact()
+        self.assertEqual(Change.objects.filter(kind=Change.TRANSACTION, object_id=tx.id).count(), 1)
+        # A client behind the dropped entries still gets the row
+        changes = self.client.get("/api/sync/", {"since": cursor}).data["changes"]
+        self.assertEqual(
+            [(change["id"], change["data"]["amount"]) for change in changes], [(tx.id, "3.00")]
+        )
+
+    def test_old_deletions_move_the_horizon(self):
+        cursor = self.client.get("/api/sync/").data["cursor"]
+        tx = Transaction.objects.create(user=self.user, amount="1.00", date=date(2025, 1, 1))
+        tx.delete()
+        Change.objects.filter(op=Change.DELETE).update(
+            created_at=timezone.now() - timedelta(days=31)
+        )
+
+        self.compact()
+        self.assertFalse(Change.objects.filter(op=Change.DELETE).exists())
+        self.user.refresh_from_db()
+        self.assertGreater(self.user.sync_horizon, int(cursor))
+
+        # The stale client starts over from a fresh cursor
+        data = self.client.get("/api/sync/", {"since": cursor}).data
+        self.assertTrue(data["reset"])
+        self.assertFalse(self.client.get("/api/sync/", {"since": data["cursor"]}).data["reset"])
+
+    def test_recent_deletions_are_kept(self):
+        tx = Transaction.objects.create(user=self.user, amount="1.00", date=date(2025, 1, 1))
+        tx_id = tx.id
+        tx.delete()
+        self.compact()
+        self.assertTrue(Change.objects.filter(op=Change.DELETE, object_id=tx_id).exists())
+
+    def test_entries_of_deleted_users_are_dropped(self):
+        other = CustomUser.objects.create_user(username="other", password="abc123")
+        Transaction.objects.create(user=other, amount="1.00", date=date(2025, 1, 1))
+        other_id = other.id
+        other.delete()
+        self.assertTrue(Change.objects.filter(user_id=other_id).exists())
+
+        self.compact()
+        self.assertFalse(Change.objects.filter(user_id=other_id).exists())
+
+    def test_command_queues_a_job(self):
+        out = StringIO()
+        call_command("compact_changes", stdout=out)
+        self.assertTrue(Job.objects.filter(kind=Job.COMPACT_CHANGES, status=Job.QUEUED).exists())
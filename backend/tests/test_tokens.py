@@ -0,0 +1,146 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users import tokens
+from users.models import CustomUser, RevokedToken
+
+
+class SignedTokenTestCase(TestCase):
+    def setUp(self):
+        tokens.revocations.clear()
+        cache.clear()  # auth throttle buckets
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+
+    def login(self):
+        response = self.client.post(
+            "/users/api/login/", {"username": "user", "password": "test123"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        # Token requests must not ride on the session cookie
+        self.client.logout()
+        return response.data
+
+    def bearer(self, token):
+        return APIClient(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_login_issues_a_token_pair(self):
+        data = self.login()
+        self.assertEqual(data["token"], data["access"])
+        self.assertNotEqual(data["access"], data["refresh"])
+
+    def test_access_token_authenticates_without_session_or_hashing(self):
+        client = self.bearer(self.login()["access"])
+        tokens.revocations.refresh()
+        with self.assertNumQueries(1):  # the user, by primary key
+            response = client.get("/users/api/user/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["username"], "user")
+
+    # Failed authentication is 403 rather than 401: SessionAuthentication comes
+    # first and sends no WWW-Authenticate challenge
+
+    def test_rejected_tokens(self):
+        data = self.login()
+        for header in (
+            f"Bearer {data['access']}x",
+            f"Bearer {data['refresh']}",
+            "Bearer",
+            "Bearer a b",
+        ):
+            with self.subTest(header=header):
+                client = APIClient(HTTP_AUTHORIZATION=header)
+                self.assertEqual(client.get("/api/transactions/").status_code, 403)
+
+    def test_basic_auth_is_no_longer_accepted(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Basic dXNlcjp0ZXN0MTIz")  # user:test123
+        self.assertEqual(client.get("/api/transactions/").status_code, 403)
+
+    @override_settings(ACCESS_TOKEN_LIFETIME=-1)
+    def test_expired_access_token(self):
+        response = self.bearer(self.login()["access"]).get("/api/transactions/")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data["detail"], "Token expired")
+
+    def test_refresh_rotates_the_pair(self):
+        refresh = self.login()["refresh"]
+
+        response = self.client.post("/users/api/token/refresh/", {"refresh": refresh})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.bearer(response.data["access"]).get("/api/transactions/").status_code, 200
+        )
+
+        # Single use
+        response = self.client.post("/users/api/token/refresh/", {"refresh": refresh})
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_used_by_another_process(self):
+        refresh = self.login()["refresh"]
+        tokens.revocations.refresh()
+        # Another worker used the token since this one last looked at the table
+        payload = tokens.decode(refresh, tokens.REFRESH)
+        RevokedToken.objects.create(
+            jti=payload["jti"], expires_at=timezone.now() + timedelta(hours=1)
+        )
+
+        response = self.client.post("/users/api/token/refresh/", {"refresh": refresh})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["error"], "Token revoked")
+
+    def test_logout_revokes_both_tokens(self):
+        data = self.login()
+        client = self.bearer(data["access"])
+        response = client.post("/users/api/logout/", {"refresh": data["refresh"]}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(client.get("/api/transactions/").data["detail"], "Token revoked")
+        response = self.client.post("/users/api/token/refresh/", {"refresh": data["refresh"]})
+        self.assertEqual(response.status_code, 401)
+
+    def test_revocations_of_other_processes_are_picked_up(self):
+        access = self.login()["access"]
+        payload = tokens.decode(access, tokens.ACCESS)
+        RevokedToken.objects.create(
+            jti=payload["jti"], expires_at=timezone.now() + timedelta(hours=1)
+        )
+
+        client = self.bearer(access)
+        self.assertEqual(client.get("/api/transactions/").status_code, 200)  # not refreshed yet
+        tokens.revocations.refreshed_at = None
+        self.assertEqual(client.get("/api/transactions/").status_code, 403)
+
+    def test_password_change_and_deactivation_invalidate_tokens(self):
+        for change in ("set_password", "is_active"):
+            with self.subTest(change=change):
+                self.user.refresh_from_db()
+                self.user.is_active = True
+                self.user.set_password("test123")
+                self.user.save()
+                client = self.bearer(self.login()["access"])
+                self.assertEqual(client.get("/api/transactions/").status_code, 200)
+
+                if change == "set_password":
+                    self.user.set_password("another-password-456")
+                else:
+                    self.user.is_active = False
+                self.user.save()
+                self.assertEqual(client.get("/api/transactions/").status_code, 403)
+
+    def test_prune(self):
+        RevokedToken.objects.create(jti="old", expires_at=timezone.now() - timedelta(seconds=1))
+        RevokedToken.objects.create(jti="new", expires_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(tokens.prune(), 1)
+        self.assertTrue(tokens.revocations.is_revoked("new"))
+        self.assertFalse(tokens.revocations.is_revoked("old"))
+
+    def test_expired_revocations_are_forgotten(self):
+        RevokedToken.objects.create(jti="old", expires_at=timezone.now() - timedelta(seconds=1))
+        RevokedToken.objects.create(jti="new", expires_at=timezone.now() + timedelta(hours=1))
+        tokens.revocations.refresh()
+        # Without a prune of the table in this process
+        self.assertEqual(set(tokens.revocations.revoked), {"new"})
@@ -0,0 +1,57 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import CustomUser, Category, Transaction
+from datetime import date
+
+
+class TransactionSummaryTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(username="user", password="test123")
+        self.client.force_login(self.user)
+
+        self.food = Category.objects.create(name="Groceries", user=self.user)
+        self.salary = Category.objects.create(name="Payroll", user=self.user)
+
+    def test_summary_covers_whole_ledger(self):
+        # More rows than fit on a single list page
+        for _ in range(15):
+            Transaction.objects.create(
+                user=self.user, amount="-10.50", date=date.today(), category=self.food
+            )
+        Transaction.objects.create(
+            user=self.user, amount="1000.00", date=date.today(), category=self.salary
+        )
+        Transaction.objects.create(user=self.user, amount="5.00", date=date.today())
+
+        response = self.client.get("/api/transactions/summary/")
+        self.assertEqual(response.status_code, 200)
+
+        data = response.data
+        self.assertEqual(data["balance"], "847.50")
+        self.assertEqual(data["income"], "1005.00")
+        self.assertEqual(data["expenses"], "-157.50")
+        self.assertEqual(data["count"], 17)
+
+        by_name = {row["category_name"]: row for row in data["categories"]}
+        self.assertEqual(by_name["Groceries"]["total"], "-157.50")
+        self.assertEqual(by_name["Groceries"]["count"], 15)
+        self.assertEqual(by_name["Payroll"]["income"], "1000.00")
+        self.assertEqual(by_name[None]["total"], "5.00")
+
+    def test_summary_only_for_logged_user(self):
+        other_user = CustomUser.objects.create_user(username="other", password="abc123")
+        Transaction.objects.create(user=other_user, amount=100, date=date.today())
+
+        response = self.client.get("/api/transactions/summary/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["balance"], "0.00")
+        self.assertEqual(response.data["categories"], [])
+
+    def test_summary_runs_single_query(self):
+        Transaction.objects.create(
+            user=self.user, amount="12.00", date=date.today(), category=self.food
+        )
+        with self.assertNumQueries(3):
+            # session + user lookup + the aggregate itself
+            self.client.get("/api/transactions/summary/")
@@ -1,7 +1,9 @@
 # Register your models here.
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Transaction, Category
+from django.urls import reverse
+from django.utils.html import format_html
+from .models import CustomUser, Transaction, Category, Job, MonthlyRollup, Profile, SlowQuery
 
 
 class CustomUserAdmin(UserAdmin):
@@ -14,6 +16,61 @@ class CustomUserAdmin(UserAdmin):
         super().save_model(request, obj, form, change)
 
 
+class SlowQueryAdmin(admin.ModelAdmin):
+    """The slow-query log (users.slowlog): read-only, newest first."""
+
+    list_display = ("created_at", "duration_ms", "view", "callsite", "user_id")
+    list_filter = ("view", "database")
+    search_fields = ("sql", "callsite", "path")
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
+    ordering = ("-id",)
+
+    @admin.display(description="ms", ordering="duration")
+    def duration_ms(self, obj):
+        return round(obj.duration * 1000, 1)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class ProfileAdmin(admin.ModelAdmin):
+    """Request profiles (users.profiling): read-only, with their collapsed stacks."""
+
+    list_display = ("created_at", "method", "path", "duration_ms", "trigger", "download")
+    list_filter = ("trigger", "view")
+    search_fields = ("path",)
+    exclude = ("collapsed",)
+    readonly_fields = [
+        field.name for field in Profile._meta.fields if field.name != "collapsed"
+    ] + ["download"]
+    ordering = ("-id",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("collapsed")
+
+    @admin.display(description="ms", ordering="duration")
+    def duration_ms(self, obj):
+        return round(obj.duration * 1000, 1)
+
+    @admin.display(description="Collapsed stacks")
+    def download(self, obj):
+        url = reverse("profile-collapsed", args=[obj.pk])
+        return format_html('<a href="{}">Download</a>', url)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(Transaction)
 admin.site.register(Category)
+admin.site.register(MonthlyRollup)
+admin.site.register(Job)
+admin.site.register(SlowQuery, SlowQueryAdmin)
+admin.site.register(Profile, ProfileAdmin)
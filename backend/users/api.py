@@ -1,11 +1,19 @@
+import hmac
+
 from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404
-from django.db.models import Count
-from django.db.models.functions import TruncMonth
-from .models import CustomUser
-from .serializers import CustomUserSerializer
+from django.views.decorators.http import require_GET
+from .cache import cache_statistics
+from .filters import filter_users
+from .models import CustomUser, Job, Profile
+from .pagination import KeysetPagination, UserPagination
+from .serializers import CustomUserSerializer, JobSerializer, ProfileSerializer
+from . import jobs, metrics, profiling, statistics
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -25,6 +33,15 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = CustomUser.objects.all().order_by("username")
     serializer_class = CustomUserSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    pagination_class = UserPagination
+
+    def filter_queryset(self, queryset):
+        if self.action != "list":
+            return queryset
+        try:
+            return filter_users(queryset, self.request.query_params)
+        except ValueError as exc:
+            raise ParseError(str(exc))
 
     def perform_create(self, serializer):
         # Handle password separately
@@ -45,6 +62,44 @@ class UserViewSet(viewsets.ModelViewSet):
         return user
 
 
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status and progress of background jobs, newest first.
+    """
+
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    pagination_class = KeysetPagination
+
+
+class ProfileViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Request profiles (users.profiling), newest first. The detail adds the
+    functions with the most time; ``collapsed/`` downloads the stacks.
+    """
+
+    queryset = Profile.objects.defer("collapsed")
+    serializer_class = ProfileSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    pagination_class = KeysetPagination
+
+    def retrieve(self, request, *args, **kwargs):
+        profile = get_object_or_404(Profile, pk=kwargs["pk"])
+        return Response(
+            {**self.get_serializer(profile).data, "top": profiling.top(profile.collapsed)}
+        )
+
+    @action(detail=True)
+    def collapsed(self, request, pk=None):
+        collapsed = Profile.objects.filter(pk=pk).values_list("collapsed", flat=True).first()
+        if collapsed is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        response = HttpResponse(collapsed + "\n", content_type="text/plain; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="profile-{pk}.collapsed"'
+        return response
+
+
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated, IsAdminUser])
 def bulk_actions(request):
@@ -65,9 +120,12 @@ def bulk_actions(request):
     users = CustomUser.objects.filter(id__in=user_ids)
 
     if action == "delete":
-        deleted_count = users.count()
-        users.delete()
-        return Response({"message": f"{deleted_count} user(s) deleted successfully"})
+        user_ids = list(users.values_list("id", flat=True))
+        job = jobs.schedule_user_deletion(user_ids, created_by=request.user)
+        return Response(
+            {"message": f"{len(user_ids)} user(s) scheduled for deletion", "job": job.id},
+            status=status.HTTP_202_ACCEPTED,
+        )
     elif action == "activate":
         users.update(is_active=True)
         return Response({"message": f"{users.count()} user(s) activated successfully"})
@@ -84,34 +142,31 @@ def user_statistics(request):
     """
     Get user statistics.
     """
-    # Basic user statistics
-    total_users = CustomUser.objects.count()
-    active_users = CustomUser.objects.filter(is_active=True).count()
-    inactive_users = total_users - active_users
-    admin_users = CustomUser.objects.filter(role="admin").count()
-    regular_users = CustomUser.objects.filter(role="user").count()
-
-    # Users created by month
-    users_by_month = (
-        CustomUser.objects.annotate(month=TruncMonth("date_joined"))
-        .values("month")
-        .annotate(count=Count("id"))
-        .order_by("month")
-    )
-
-    # Convert to list for serialization
-    users_by_month_data = [
-        {"month": entry["month"].strftime("%Y-%m"), "count": entry["count"]}
-        for entry in users_by_month
-    ]
-
-    return Response(
-        {
-            "total_users": total_users,
-            "active_users": active_users,
-            "inactive_users": inactive_users,
-            "admin_users": admin_users,
-            "regular_users": regular_users,
-            "users_by_month": users_by_month_data,
-        }
-    )
+    return Response(statistics.get_statistics())
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated, IsAdminUser])
+def response_cache_statistics(request):
+    """
+    Hit/miss counters of the per-user response cache (this process only).
+    """
+    return Response(cache_statistics())
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Request metrics of this process (users.metrics) for Prometheus, which
+    sends ``Authorization: Bearer <METRICS_TOKEN>``. Admins signed in to the
+    site may read them too.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    if not (
+        token
+        and scheme.lower() == "bearer"
+        and hmac.compare_digest(credentials.encode(), token.encode())
+    ) and not (request.user.is_authenticated and request.user.is_admin()):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,116 @@
+"""
+Async versions of the hot read endpoints, for ASGI deployments.
+
+They answer the same data as their DRF counterparts under /users/api/, but
+every query goes through the async ORM, so a request waiting on the
+database holds no worker thread and one process can keep many dashboard
+connections open. DRF views are sync only, hence plain Django views; the
+authentication, pagination, serializers and response cache are the ones
+the DRF views use.
+
+Under WSGI these views still work (Django runs them in an event loop per
+request) but gain nothing; serve the project with an ASGI server, e.g.
+``uvicorn budget_manager.asgi:application``, to benefit.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+
+from .authentication import SignedTokenAuthentication
+from .cache import acache_per_user
+from .models import Category, Transaction
+from .pagination import CategoryPagination, TransactionPagination
+from .serializers import CategorySerializer, TransactionSerializer, TransactionSummarySerializer
+from .views import summarize, summary_rows
+
+
+def respond(data, status=200):
+    """JsonResponse that keeps ``data`` around, like DRF's Response, for the cache."""
+    response = JsonResponse(data, status=status, safe=False)
+    response.data = data
+    return response
+
+
+async def authenticate(request):
+    """
+    The user of the session cookie or of an ``Authorization: Bearer`` access
+    token, in the order DRF tries them for the sync endpoints.
+    """
+    user = await request.auser()
+    if user.is_authenticated:
+        return user
+    # Token checks may refresh the revocation list, a sync ORM call
+    result = await sync_to_async(SignedTokenAuthentication().authenticate)(request)
+    return result[0] if result is not None else user
+
+
+def api_view(view):
+    """GET only, authenticated as by the DRF API; errors answered in DRF's format."""
+
+    @require_GET
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        try:
+            request.user = await authenticate(request)
+        except AuthenticationFailed as exc:
+            return JsonResponse({"detail": str(exc.detail)}, status=403)
+        if not request.user.is_authenticated:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."}, status=403
+            )
+        return await view(request, *args, **kwargs)
+
+    return wrapped
+
+
+async def paginated(paginator, queryset, serializer_class, request):
+    try:
+        page = await paginator.apaginate_queryset(queryset, request)
+    except NotFound as exc:
+        return JsonResponse({"detail": str(exc.detail)}, status=404)
+    serializer = serializer_class(page, many=True, context={"request": request})
+    return respond(
+        {
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "results": serializer.data,
+        }
+    )
+
+
+@api_view
+@acache_per_user
+async def user_info(request):
+    user = request.user
+    return respond(
+        {
+            "username": user.username,
+            "email": user.email,
+            "is_admin": user.is_admin(),
+        }
+    )
+
+
+@api_view
+@acache_per_user
+async def transaction_list(request):
+    transactions = Transaction.objects.filter(user=request.user).select_related("category")
+    return await paginated(TransactionPagination(), transactions, TransactionSerializer, request)
+
+
+@api_view
+@acache_per_user
+async def transaction_summary(request):
+    rows = [row async for row in summary_rows(request.user).aiterator()]
+    return respond(TransactionSummarySerializer(summarize(rows)).data)
+
+
+@api_view
+@acache_per_user
+async def category_list(request):
+    categories = Category.objects.filter(user=request.user)
+    return await paginated(CategoryPagination(), categories, CategorySerializer, request)
@@ -0,0 +1,33 @@
+"""
+Login and registration for both the HTML views and the API views.
+
+Every path runs the password hasher exactly once per request. The only
+exception is the one login that re-hashes a password saved under an older
+hasher profile (users.hashers).
+
+- ``authenticate_user``: one verification. Django's ModelBackend also hashes
+  once for unknown usernames, so a failed login costs the same as a
+  successful one.
+- ``sign_in``: starts the session for a user who has already been
+  authenticated. It never hashes again.
+- ``register``: hashes the new password once, in the form's
+  ``set_password``, then signs the user in.
+
+Under load, hashing may raise users.hashers.HashingBusy.
+"""
+
+from django.contrib.auth import authenticate, login
+
+
+def authenticate_user(request, username, password):
+    return authenticate(request, username=username, password=password)
+
+
+def sign_in(request, user):
+    login(request, user)
+    return user
+
+
+def register(request, form):
+    """Save a valid registration form and sign the new user in."""
+    return sign_in(request, form.save())
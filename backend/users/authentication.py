@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from rest_framework import authentication, exceptions
+
+from . import tokens
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """
+    ``Authorization: Bearer <access token>`` with the tokens of users.tokens.
+    Costs an HMAC check and one primary-key lookup of the user; no password
+    hashing and no session query.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed("Invalid Authorization header")
+
+        try:
+            payload = tokens.decode(header[1].decode(), tokens.ACCESS)
+            user = get_user_model().objects.filter(pk=payload["uid"]).first()
+            tokens.check_user(payload, user)
+        except (tokens.InvalidToken, UnicodeDecodeError) as exc:
+            raise exceptions.AuthenticationFailed(str(exc) or "Invalid token")
+
+        return user, payload
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,177 @@
+"""
+Many API writes in one round trip, for /api/batch/.
+
+A batch is an ordered list of operations on the transaction and category
+endpoints::
+
+    {"operations": [
+        {"method": "POST", "path": "/api/categories/", "body": {"name": "Rent"},
+         "ref": "rent"},
+        {"method": "POST", "path": "/api/transactions/",
+         "body": {"amount": "-900.00", "date": "2025-06-01", "category_id": "@{rent.id}"}},
+        {"method": "DELETE", "path": "/api/transactions/42/"}
+    ]}
+
+Each operation is dispatched to the same viewset as the standalone request,
+as the user the batch request authenticated, so validation and permissions
+are unchanged but authentication, CSRF and session checks run once. The
+batch is all or nothing: it runs in one DB transaction, with rollup refreshes
+and change log entries written once at the end, and stops at the first
+operation that fails, rolling back the ones before it.
+
+An operation with a "ref" can be referred to by the operations after it:
+``@{ref.field}`` in their body or path is replaced by that field of its
+response body, e.g. ``@{rent.id}``, or ``@{rows.0.id}`` for the first row a
+bulk create returned. A string that is only a reference takes the value's
+type, so ids stay integers.
+"""
+
+import io
+import json
+import re
+from urllib.parse import urlsplit
+
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+
+from . import changelog, rollups
+
+MAX_OPERATIONS = 100
+METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+# Reads are left out: responses cached per data version would not see the
+# batch's own writes
+ROUTES = {
+    "transaction-list",
+    "transaction-detail",
+    "transaction-bulk",
+    "category-list",
+    "category-detail",
+}
+
+REFERENCE = re.compile(r"@\{([\w-]+)((?:\.[\w-]+)+)\}")
+
+
+class InvalidBatch(Exception):
+    """The request body is not a list of well-formed operations."""
+
+
+class Failed(Exception):
+    """An operation failed; the whole batch was rolled back."""
+
+    def __init__(self, index, results):
+        super().__init__(index)
+        self.index = index
+        self.results = results
+
+
+def parse(data):
+    """The operations of a batch request body, or InvalidBatch."""
+    operations = data.get("operations") if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not 0 < len(operations) <= MAX_OPERATIONS:
+        raise InvalidBatch(f"operations must be a list of 1 to {MAX_OPERATIONS} operations")
+
+    refs = set()
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise InvalidBatch(f"Operation {index} is not an object")
+        if operation.get("method") not in METHODS:
+            raise InvalidBatch(f"Operation {index}: method must be one of {', '.join(METHODS)}")
+        if not isinstance(operation.get("path"), str):
+            raise InvalidBatch(f"Operation {index}: missing path")
+        ref = operation.get("ref")
+        if ref is not None:
+            if not isinstance(ref, str) or not re.fullmatch(r"[\w-]+", ref) or ref in refs:
+                raise InvalidBatch(f"Operation {index}: ref must be a unique name")
+            refs.add(ref)
+    return operations
+
+
+def lookup(ref, fields, results):
+    value = results.get(ref)
+    if value is None:
+        raise KeyError(ref)
+    for field in fields.split(".")[1:]:
+        if isinstance(value, list) and field.isascii() and field.isdigit() and int(field) < len(value):
+            value = value[int(field)]
+        elif isinstance(value, dict) and field in value:
+            value = value[field]
+        else:
+            raise KeyError(ref + fields)
+    return value
+
+
+def substitute(value, results):
+    """``value`` with every ``@{ref.field}`` replaced; KeyError if one is unknown."""
+    if isinstance(value, dict):
+        return {key: substitute(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute(item, results) for item in value]
+    if not isinstance(value, str):
+        return value
+    match = REFERENCE.fullmatch(value)
+    if match:
+        return lookup(*match.groups(), results)
+    return REFERENCE.sub(lambda match: str(lookup(*match.groups(), results)), value)
+
+
+def dispatch(request, method, path, body):
+    """Run one operation through its viewset; returns (status, response body)."""
+    url = urlsplit(path)
+    try:
+        match = resolve(url.path)
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, {"error": f"No route for {url.path}"}
+    if match.url_name not in ROUTES:
+        return status.HTTP_400_BAD_REQUEST, {"error": f"{url.path} cannot be batched"}
+
+    content = b"" if body is None else json.dumps(body).encode()
+    sub = HttpRequest()
+    sub.method = method
+    sub.path = sub.path_info = url.path
+    sub.META = {
+        **request.META,
+        "REQUEST_METHOD": method,
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(content)),
+    }
+    sub.GET = QueryDict(url.query)
+    sub.COOKIES = request.COOKIES
+    sub._stream = io.BytesIO(content)
+    sub._read_started = False
+    sub.resolver_match = match
+    # Authenticated once, by the batch request
+    sub.user = request.user
+    sub._force_auth_user = request.user
+
+    response = match.func(sub, *match.args, **match.kwargs)
+    return response.status_code, getattr(response, "data", None)
+
+
+def execute(request, operations):
+    """
+    Run the parsed ``operations`` as ``request.user``. Returns the result of
+    each, {"status": ..., "body": ...}, or raises Failed with the results so
+    far once one fails, after rolling them all back.
+    """
+    results, bodies = [], {}
+    with rollups.deferred(), changelog.collect():
+        for index, operation in enumerate(operations):
+            try:
+                path = substitute(operation["path"], bodies)
+                body = substitute(operation.get("body"), bodies)
+            except KeyError as error:
+                code = status.HTTP_400_BAD_REQUEST
+                data = {"error": f"Unknown reference {error.args[0]}"}
+            else:
+                code, data = dispatch(request, operation["method"], path, body)
+
+            results.append({"status": code, "body": data})
+            if code >= 400:
+                raise Failed(index, results)
+            if operation.get("ref") is not None:
+                bodies[operation["ref"]] = data
+    return results
@@ -0,0 +1,528 @@
+"""
+Latency and query counts of every route, at several data scales.
+
+For each scale, ``run()`` seeds synthetic users (users.seeding) inside a DB
+transaction, requests every route ``iterations`` times through Django's test
+client, in-process, and rolls the transaction back, so the database is left
+as it was. Each route has a scenario below that prepares what its requests
+need (a row to delete, a fresh session to log out) without timing it; the
+requests themselves are timed, body included for streamed responses, and
+their queries counted.
+
+Results are keyed "<METHOD> <route name>" per scale, with p50/p95/p99/mean
+latency in milliseconds and the most queries any request made. ``compare()``
+checks them against a stored baseline of the same shape: more queries is a
+regression whatever the timing, a p50 slower by more than the tolerance is
+one too. Timings only compare between runs on the same machine; query counts
+compare anywhere.
+
+Throttling and the response and statistics caches are off, so every request
+does its full work; ``cache=True`` keeps the response cache on to measure
+hits.
+"""
+
+import itertools
+import statistics
+import time
+from collections import defaultdict
+from datetime import date
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from . import jobs, seeding, tokens
+from .models import Category, CustomUser, Profile, Transaction
+
+# label -> (users, transactions per user); routes act as the first user
+SCALES = {
+    "small": (10, 100),
+    "medium": (20, 1000),
+    "large": (20, 10000),
+}
+ITERATIONS = 20
+# Rows sent to the bulk, import and batch routes
+BATCH_ROWS = 100
+
+HOST = "localhost"
+
+
+class BenchmarkError(Exception):
+    """A route answered with an error, so its timing would mean nothing."""
+
+
+SCENARIOS = {}
+
+
+def scenario(*names):
+    """Register the decorated function as the scenario of the routes ``names``."""
+
+    def register(function):
+        for name in names:
+            SCENARIOS[name] = function
+        return function
+
+    return register
+
+
+class Bench:
+    """The users, clients and samples of a benchmark at one scale."""
+
+    def __init__(self, user, admin):
+        self.user = user
+        self.admin = admin
+        self.client = self.login(user)
+        self.admin_client = self.login(admin)
+        self.anonymous = APIClient(SERVER_NAME=HOST)
+        self.route = None
+        self.samples = defaultdict(list)
+        self.counter = itertools.count()
+
+    def login(self, user):
+        client = APIClient(SERVER_NAME=HOST)
+        client.force_login(user)
+        return client
+
+    def request(self, method, path, client=None, **kwargs):
+        """Issue a timed request as the benchmark user, or with ``client``."""
+        client = client or self.client
+        # Under DEBUG every query of the run is logged; keep the log short
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, **kwargs)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise BenchmarkError(f"{method.upper()} {path} answered {response.status_code}")
+        self.samples[f"{method.upper()} {self.route}"].append((elapsed, len(context)))
+        return response
+
+    def unique(self, prefix):
+        return f"{prefix}{next(self.counter)}"
+
+    def category(self):
+        return Category.objects.filter(user=self.user).first()
+
+    def new_transaction(self):
+        return Transaction.objects.create(
+            user=self.user, amount="-1.00", date=date.today(), category=self.category()
+        )
+
+    def new_member(self):
+        return CustomUser.objects.create(username=self.unique("benchmark-member"))
+
+    def summary(self):
+        return {key: summarize(samples) for key, samples in sorted(self.samples.items())}
+
+
+def summarize(samples):
+    latencies = sorted(elapsed * 1000 for elapsed, _ in samples)
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "queries": max(queries for _, queries in samples),
+    }
+
+
+# ------------------------------
+# Scenarios: users/urls.py
+# ------------------------------
+
+
+@scenario("logout")
+def logout(bench):
+    bench.request("post", "/users/logout/", client=bench.login(bench.user))
+
+
+@scenario("api_logout")
+def api_logout(bench):
+    bench.request("post", "/users/api/logout/", client=bench.login(bench.user))
+
+
+@scenario("admin-dashboard")
+def admin_dashboard(bench):
+    bench.request("get", "/users/admin-dashboard/", client=bench.admin_client)
+
+
+@scenario("admin-users-list")
+def admin_users_list(bench):
+    bench.request("get", "/users/admin/users/", client=bench.admin_client)
+
+
+@scenario("admin-create-user")
+def admin_create_user(bench):
+    username = bench.unique("benchmark-created")
+    data = {
+        "username": username,
+        "email": f"{username}@example.com",
+        "password1": "newpassword123",
+        "password2": "newpassword123",
+        "role": "user",
+        "is_active": True,
+    }
+    bench.request("post", "/users/admin/users/create/", client=bench.admin_client, data=data)
+
+
+@scenario("admin-delete-user")
+def admin_delete_user(bench):
+    member = bench.new_member()
+    bench.request("post", f"/users/admin/users/delete/{member.id}/", client=bench.admin_client)
+
+
+@scenario("admin-bulk-actions")
+def admin_bulk_actions(bench):
+    data = {"users": [bench.new_member().id], "action": "deactivate"}
+    bench.request("post", "/users/admin/users/bulk-actions/", client=bench.admin_client, data=data)
+
+
+@scenario("admin-user-statistics")
+def admin_user_statistics(bench):
+    bench.request("get", "/users/admin/users/statistics/", client=bench.admin_client)
+
+
+@scenario("csrf")
+def csrf(bench):
+    bench.request("get", "/users/api/csrf/", client=bench.anonymous)
+
+
+@scenario("api_register")
+def api_register(bench):
+    username = bench.unique("benchmark-registered")
+    data = {
+        "username": username,
+        "email": f"{username}@example.com",
+        "password1": "newpassword123",
+        "password2": "newpassword123",
+    }
+    bench.request(
+        "post",
+        "/users/api/register/",
+        client=APIClient(SERVER_NAME=HOST),
+        data=data,
+        format="json",
+    )
+
+
+@scenario("api_login")
+def api_login(bench):
+    data = {"username": bench.user.username, "password": seeding.PASSWORD}
+    bench.request(
+        "post", "/users/api/login/", client=APIClient(SERVER_NAME=HOST), data=data, format="json"
+    )
+
+
+@scenario("api_token_refresh")
+def api_token_refresh(bench):
+    data = {"refresh": tokens.issue(bench.user, tokens.REFRESH)}
+    bench.request(
+        "post", "/users/api/token/refresh/", client=bench.anonymous, data=data, format="json"
+    )
+
+
+@scenario("user_info")
+def user_info(bench):
+    bench.request("get", "/users/api/user/")
+
+
+@scenario("api_events")
+def api_events(bench):
+    # SSE_MAX_DURATION is 0 while benchmarking: the stream ends after "ready"
+    bench.request("get", "/users/api/events/")
+
+
+@scenario("async_user_info")
+def async_user_info(bench):
+    bench.request("get", "/users/api/async/user/")
+
+
+@scenario("async_transaction_list")
+def async_transaction_list(bench):
+    bench.request("get", "/users/api/async/transactions/")
+
+
+@scenario("async_transaction_summary")
+def async_transaction_summary(bench):
+    bench.request("get", "/users/api/async/transactions/summary/")
+
+
+@scenario("async_category_list")
+def async_category_list(bench):
+    bench.request("get", "/users/api/async/categories/")
+
+
+# ------------------------------
+# Scenarios: the API router (under both urls.py)
+# ------------------------------
+
+
+@scenario("api-root")
+def api_root(bench):
+    bench.request("get", "/api/")
+
+
+@scenario("transaction-list")
+def transaction_list(bench):
+    bench.request("get", "/api/transactions/")
+    data = {
+        "amount": "-10.00",
+        "date": date.today().isoformat(),
+        "description": "Benchmark",
+        "category_id": bench.category().id,
+    }
+    bench.request("post", "/api/transactions/", data=data, format="json")
+
+
+@scenario("transaction-detail")
+def transaction_detail(bench):
+    url = f"/api/transactions/{bench.new_transaction().id}/"
+    bench.request("get", url)
+    bench.request("patch", url, data={"amount": "-2.00"}, format="json")
+    bench.request("delete", url)
+
+
+@scenario("transaction-bulk")
+def transaction_bulk(bench):
+    category_id = bench.category().id
+    rows = [
+        {"amount": "-1.00", "date": date.today().isoformat(), "category_id": category_id}
+        for _ in range(BATCH_ROWS)
+    ]
+    response = bench.request("post", "/api/transactions/bulk/", data=rows, format="json")
+    rows = [{"id": row["id"], "amount": "-2.00"} for row in response.data]
+    bench.request("patch", "/api/transactions/bulk/", data=rows, format="json")
+    ids = [row["id"] for row in rows]
+    bench.request("delete", "/api/transactions/bulk/", data={"ids": ids}, format="json")
+
+
+@scenario("transaction-import")
+def transaction_import(bench):
+    lines = ["date,amount,description,category"]
+    lines += [f"{date.today().isoformat()},-1.00,Imported,Food" for _ in range(BATCH_ROWS)]
+    upload = SimpleUploadedFile("export.csv", "\n".join(lines).encode())
+    bench.request("post", "/api/transactions/import/", data={"file": upload})
+
+
+@scenario("transaction-export")
+def transaction_export(bench):
+    bench.request("get", "/api/transactions/export/?format=csv")
+
+
+@scenario("transaction-summary")
+def transaction_summary(bench):
+    bench.request("get", "/api/transactions/summary/")
+
+
+@scenario("transaction-monthly")
+def transaction_monthly(bench):
+    bench.request("get", f"/api/transactions/monthly/?year={date.today().year}")
+
+
+@scenario("category-list")
+def category_list(bench):
+    bench.request("get", "/api/categories/")
+    bench.request("post", "/api/categories/", data={"name": bench.unique("New")}, format="json")
+
+
+@scenario("category-detail")
+def category_detail(bench):
+    category = Category.objects.create(name=bench.unique("Disposable"), user=bench.user)
+    url = f"/api/categories/{category.id}/"
+    bench.request("get", url)
+    bench.request("delete", url)
+
+
+# ------------------------------
+# Scenarios: budget_manager/urls.py
+# ------------------------------
+
+
+@scenario("api-user-bulk-actions")
+def api_user_bulk_actions(bench):
+    data = {"user_ids": [bench.new_member().id], "action": "deactivate"}
+    bench.request(
+        "post", "/api/users/bulk-actions/", client=bench.admin_client, data=data, format="json"
+    )
+
+
+@scenario("api-user-statistics")
+def api_user_statistics(bench):
+    bench.request("get", "/api/users/statistics/", client=bench.admin_client)
+
+
+@scenario("api-sync")
+def api_sync(bench):
+    cursor = bench.client.get("/api/sync/").data["cursor"]
+    bench.new_transaction()
+    bench.request("get", f"/api/sync/?since={cursor}")
+
+
+@scenario("api-batch")
+def api_batch(bench):
+    operations = [
+        {
+            "method": "POST",
+            "path": "/api/categories/",
+            "body": {"name": bench.unique("Batch")},
+            "ref": "new",
+        }
+    ] + [
+        {
+            "method": "POST",
+            "path": "/api/transactions/",
+            "body": {
+                "amount": "-1.00",
+                "date": date.today().isoformat(),
+                "category_id": "@{new.id}",
+            },
+        }
+        for _ in range(BATCH_ROWS // 10)
+    ]
+    bench.request("post", "/api/batch/", data={"operations": operations}, format="json")
+
+
+@scenario("api-response-cache-statistics")
+def api_response_cache_statistics(bench):
+    bench.request("get", "/api/cache/statistics/", client=bench.admin_client)
+
+
+@scenario("job-list", "job-detail")
+def job_routes(bench):
+    job = jobs.schedule_user_deletion([bench.new_member().id])
+    bench.route = "job-list"
+    bench.request("get", "/api/jobs/", client=bench.admin_client)
+    bench.route = "job-detail"
+    bench.request("get", f"/api/jobs/{job.id}/", client=bench.admin_client)
+
+
+@scenario("customuser-list", "customuser-detail")
+def user_routes(bench):
+    bench.route = "customuser-list"
+    bench.request("get", "/api/users/", client=bench.admin_client)
+    bench.route = "customuser-detail"
+    bench.request("get", f"/api/users/{bench.user.id}/", client=bench.admin_client)
+
+
+@scenario("profile-list", "profile-detail", "profile-collapsed")
+def profile_routes(bench):
+    profile = Profile.objects.create(
+        trigger=Profile.ON_DEMAND,
+        method="GET",
+        path="/api/transactions/",
+        status=200,
+        duration=0.01,
+        samples=2,
+        collapsed="views.py:list;serializers.py:to_representation 5000\nviews.py:list 5000",
+    )
+    bench.route = "profile-list"
+    bench.request("get", "/api/profiles/", client=bench.admin_client)
+    bench.route = "profile-detail"
+    bench.request("get", f"/api/profiles/{profile.id}/", client=bench.admin_client)
+    bench.route = "profile-collapsed"
+    bench.request("get", f"/api/profiles/{profile.id}/collapsed/", client=bench.admin_client)
+
+
+@scenario("metrics")
+def metrics(bench):
+    bench.request("get", "/metrics", client=bench.admin_client)
+
+
+# ------------------------------
+# Runs
+# ------------------------------
+
+
+def benchmark_settings(cache):
+    caches = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    if cache:
+        caches["responses"] = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    return {
+        "ALLOWED_HOSTS": [HOST],
+        # Throttle buckets live in the default cache: dummy, so never throttled
+        "CACHES": caches,
+        "RESPONSE_CACHE_ALIAS": "responses" if cache else "default",
+        "SSE_MAX_DURATION": 0,
+    }
+
+
+def run_scale(users, transactions_per_user, iterations, routes, progress=None):
+    seeded = seeding.seed(users, transactions_per_user, prefix="benchmark-user")
+    admin = CustomUser.objects.create_user(
+        username="benchmark-admin", password=seeding.PASSWORD, role="admin"
+    )
+    bench = Bench(seeded[0], admin)
+
+    done = set()
+    for name in routes:
+        function = SCENARIOS[name]
+        if function in done:
+            # One scenario covering several routes runs once
+            continue
+        done.add(function)
+        for _ in range(iterations):
+            bench.route = name
+            function(bench)
+        if progress:
+            progress(name)
+    return bench.summary()
+
+
+def run(scales=None, iterations=ITERATIONS, routes=None, cache=False, progress=None):
+    """
+    Benchmark ``routes`` (default: every route with a scenario) at each of
+    ``scales``, a {label: (users, transactions per user)} subset of SCALES.
+    ``progress`` is called with each route name once it is done.
+    """
+    scales = scales or SCALES
+    routes = sorted(routes or SCENARIOS)
+    results = {}
+    with override_settings(**benchmark_settings(cache)):
+        for label, (users, transactions_per_user) in scales.items():
+            with transaction.atomic():
+                results[label] = run_scale(
+                    users, transactions_per_user, iterations, routes, progress
+                )
+                # Leave the database as it was
+                transaction.set_rollback(True)
+    return {
+        "iterations": iterations,
+        "cache": cache,
+        "scales": {
+            label: {"users": users, "transactions_per_user": transactions_per_user}
+            for label, (users, transactions_per_user) in scales.items()
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, tolerance=0.5, min_delta_ms=1.0):
+    """
+    Regressions of ``results`` against ``baseline``, as readable lines: more
+    queries, or a p50 more than ``tolerance`` (a fraction) and ``min_delta_ms``
+    slower. A route the baseline has no entry for counts too, so that new
+    routes cannot go unchecked; routes missing from ``results`` were not run.
+    """
+    regressions = []
+    for label, routes in results["results"].items():
+        before_routes = baseline.get("results", {}).get(label, {})
+        for key, after in routes.items():
+            before = before_routes.get(key)
+            if before is None:
+                regressions.append(f"{label} {key}: not in the baseline, re-record it")
+                continue
+            if after["queries"] > before["queries"]:
+                regressions.append(
+                    f"{label} {key}: {after['queries']} queries, was {before['queries']}"
+                )
+            delta = after["p50_ms"] - before["p50_ms"]
+            if delta > min_delta_ms and after["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{label} {key}: p50 {after['p50_ms']:.1f} ms, was {before['p50_ms']:.1f} ms"
+                )
+    return regressions
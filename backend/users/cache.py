@@ -0,0 +1,184 @@
+"""
+Per-user response cache for read endpoints.
+
+Cached responses are keyed on the requesting user's ``data_version``, which is
+replaced in the same DB transaction as every write to that user's
+transactions, categories or profile (see ``user_data_changed``). A write
+therefore never has to find and delete cache entries: the next read simply
+misses, and stale entries age out through the cache timeout.
+
+The same token makes a cheap ETag: a request whose If-None-Match still names
+the current version is answered with 304 before a list view runs any query.
+Detail views look up the row first, for its existence and owner.
+
+The cache backend is the ``RESPONSE_CACHE_ALIAS`` entry of ``CACHES``.
+"""
+
+import hashlib
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .models import CustomUser, new_data_version
+
+_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0}
+
+
+def response_cache():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def bump_data_version(user_ids):
+    """Invalidate every cached response of ``user_ids``."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        CustomUser.objects.filter(pk__in=user_ids).update(data_version=new_data_version())
+
+
+def cache_key(request):
+    # Paginated responses embed absolute next/previous links, hence the host
+    url = hashlib.md5(request.build_absolute_uri().encode(), usedforsecurity=False).hexdigest()
+    return f"response:{request.user.pk}:{request.user.data_version}:{url}"
+
+
+def etag(request, file_format=None):
+    # Weak: it is derived from the data version, not from the bytes of the body
+    user = request.user
+    file_format = file_format or request.accepted_renderer.format
+    return f'W/"{user.pk}-{user.data_version}-{file_format}"'
+
+
+def etag_matches(request, value):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    etags = {tag.removeprefix("W/") for tag in parse_etags(header)}
+    return "*" in etags or value.removeprefix("W/") in etags
+
+
+def conditional(response, value):
+    response["ETag"] = value
+    # Let browsers keep the body but revalidate it on every use
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def count(name):
+    with _lock:
+        _counters[name] += 1
+
+
+def cache_statistics():
+    """Hit/miss counters of this process since start-up (or the last reset)."""
+    with _lock:
+        hits, misses = _counters["hits"], _counters["misses"]
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else None,
+    }
+
+
+def reset_cache_statistics():
+    with _lock:
+        _counters.update(hits=0, misses=0)
+
+
+def cache_per_user(view):
+    """
+    Serve successful GET responses of ``view`` from the response cache, or
+    with 304 Not Modified when the client's ETag is current. Wraps DRF
+    handlers, either viewset methods or functions under ``@api_view``.
+    """
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        request = next(arg for arg in args if isinstance(arg, Request))
+        if request.method != "GET" or not request.user.is_authenticated:
+            return view(*args, **kwargs)
+
+        tag = etag(request)
+        if etag_matches(request, tag):
+            return conditional(Response(status=304), tag)
+
+        cache = response_cache()
+        key = cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            count("hits")
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return conditional(response, tag)
+
+        count("misses")
+        response = view(*args, **kwargs)
+        if response.status_code == 200 and getattr(response, "data", None) is not None:
+            cache.set(key, response.data, getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300))
+            response["X-Cache"] = "MISS"
+            conditional(response, tag)
+        return response
+
+    return wrapped
+
+
+class PerUserCacheMixin:
+    """Caches ``list`` and ``retrieve`` of a viewset per user."""
+
+    @cache_per_user
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        # The ETag names the user's data, not this row: look the row up first,
+        # so that missing rows and other users' rows get 404 rather than 304
+        return self.cached_retrieve(request, self.get_object())
+
+    @cache_per_user
+    def cached_retrieve(self, request, instance):
+        return Response(self.get_serializer(instance).data)
+
+
+def acache_per_user(view):
+    """
+    ``cache_per_user`` for async Django views answering JsonResponse: the same
+    keys, ETags and counters, through the async cache API. Expects
+    ``request.user`` to be resolved already.
+    """
+
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        if request.method != "GET" or not request.user.is_authenticated:
+            return await view(request, *args, **kwargs)
+
+        tag = etag(request, "json")
+        if etag_matches(request, tag):
+            return conditional(HttpResponseNotModified(), tag)
+
+        cache = response_cache()
+        key = cache_key(request)
+        data = await cache.aget(key)
+        if data is not None:
+            count("hits")
+            response = JsonResponse(data, safe=False)
+            response["X-Cache"] = "HIT"
+            return conditional(response, tag)
+
+        count("misses")
+        response = await view(request, *args, **kwargs)
+        data = getattr(response, "data", None)
+        if response.status_code == 200 and data is not None:
+            await cache.aset(key, data, getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300))
+            response["X-Cache"] = "MISS"
+            conditional(response, tag)
+        return response
+
+    return wrapped
@@ -0,0 +1,208 @@
+"""
+Append-only change log of transactions and categories, read by /api/sync/.
+
+Every write to a user's transactions or categories appends Change entries
+(kind, object id, upsert or delete) in the same DB transaction, so the log
+never disagrees with the data. A client keeps the id of the last entry it
+has applied as its cursor and asks for what changed since; the answer costs
+one indexed range scan of the entries since the cursor plus one lookup per
+kind of the rows they name, whatever the size of the ledger.
+
+Entries are numbered in commit order because SQLite runs one writer at a
+time. A deleted category's transactions become uncategorized without
+entries of their own; clients apply that when they see the category go.
+
+Compaction (the compact_changes job of users.jobs, queued with ``manage.py
+compact_changes``) bounds the log to about one entry per live row plus
+recent deletions:
+
+- entries superseded by a later entry for the same row are dropped; a
+  client behind them still gets the later one
+- delete entries older than CHANGE_LOG_RETENTION_DAYS are dropped, after
+  the user's ``sync_horizon`` is raised past them; a client whose cursor is
+  older than the horizon is told to reset and reload
+- entries of users that no longer exist are dropped
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from .models import Category, Change, CustomUser, Transaction
+from .serializers import CategorySerializer, TransactionSerializer
+
+# ?limit= of a sync page, capped so the row lookups stay within SQLite's
+# bound parameter limit
+SYNC_PAGE_SIZE = 200
+SYNC_MAX_PAGE_SIZE = 500
+
+_state = threading.local()
+
+
+def record(kind, op, rows):
+    """
+    Append an ``op`` entry of ``kind`` for each (user_id, object_id) of
+    ``rows``: one INSERT, or none inside ``collect()`` until it ends.
+    """
+    entries = [
+        Change(user_id=user_id, kind=kind, object_id=object_id, op=op)
+        for user_id, object_id in rows
+        if user_id is not None and object_id is not None
+    ]
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        pending.extend(entries)
+    elif entries:
+        Change.objects.bulk_create(entries)
+
+
+@contextmanager
+def collect():
+    """
+    Run a block of writes atomically and append every entry it records with
+    a single INSERT, before the block commits.
+    """
+    if getattr(_state, "pending", None) is not None:
+        # Nested: the outermost block writes
+        yield
+        return
+
+    # No savepoint, like Django's own Collector.delete: callers are atomic blocks
+    # already and an error aborts them anyway
+    with transaction.atomic(savepoint=False):
+        _state.pending = []
+        try:
+            yield
+            pending = _state.pending
+        finally:
+            _state.pending = None
+        if pending:
+            Change.objects.bulk_create(pending)
+
+
+# ------------------------------
+# Sync
+# ------------------------------
+
+
+def latest_cursor(user):
+    return Change.objects.filter(user=user).aggregate(cursor=Max("id"))["cursor"] or 0
+
+
+def changes_since(user, since, limit=SYNC_PAGE_SIZE, context=None):
+    """
+    What changed for ``user`` after the cursor ``since``: each changed row
+    once, in the order of its latest change, with its current data or as a
+    deletion. ``more`` tells the client to ask again from the new cursor
+    straight away. Without a cursor, or with one from before the last
+    compaction, the answer is a reset: reload everything, then sync from the
+    returned cursor.
+    """
+    if since is None or since < user.sync_horizon:
+        # The last entries may be deletions compaction has dropped since
+        cursor = max(latest_cursor(user), user.sync_horizon)
+        return {"cursor": str(cursor), "reset": True, "more": False, "changes": []}
+
+    entries = list(
+        Change.objects.filter(user=user, id__gt=since)
+        .order_by("id")
+        .values_list("id", "kind", "object_id", "op")[: limit + 1]
+    )
+    more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Last op per row, ordered by when the row last changed
+    latest = {}
+    for _, kind, object_id, op in entries:
+        latest.pop((kind, object_id), None)
+        latest[(kind, object_id)] = op
+
+    def current(kind, queryset, serializer_class):
+        ids = [pk for (k, pk), op in latest.items() if k == kind and op == Change.UPSERT]
+        if not ids:
+            return {}
+        rows = serializer_class(queryset.filter(pk__in=ids), many=True, context=context).data
+        return {row["id"]: row for row in rows}
+
+    rows = {
+        Change.TRANSACTION: current(
+            Change.TRANSACTION,
+            Transaction.objects.filter(user=user).select_related("category"),
+            TransactionSerializer,
+        ),
+        Change.CATEGORY: current(
+            Change.CATEGORY, Category.objects.filter(user=user), CategorySerializer
+        ),
+    }
+
+    changes = []
+    for (kind, object_id), op in latest.items():
+        data = rows[kind].get(object_id) if op == Change.UPSERT else None
+        if data is None:
+            # Deleted, or moved to another user since
+            changes.append({"type": kind, "op": Change.DELETE, "id": object_id})
+        else:
+            changes.append({"type": kind, "op": Change.UPSERT, "id": object_id, "data": data})
+
+    return {
+        "cursor": str(entries[-1][0] if entries else since),
+        "reset": False,
+        "more": more,
+        "changes": changes,
+    }
+
+
+# ------------------------------
+# Compaction
+# ------------------------------
+
+
+def retention():
+    return timedelta(days=getattr(settings, "CHANGE_LOG_RETENTION_DAYS", 30))
+
+
+# The three sets are disjoint, so their counts add up to the job's total
+
+
+def _later():
+    return Exists(
+        Change.objects.filter(
+            user_id=OuterRef("user_id"),
+            kind=OuterRef("kind"),
+            object_id=OuterRef("object_id"),
+            id__gt=OuterRef("id"),
+        )
+    )
+
+
+def _live():
+    return Change.objects.filter(user_id__in=CustomUser.objects.values("pk"))
+
+
+def superseded():
+    """Entries of existing users with a later entry for the same row."""
+    return _live().filter(_later())
+
+
+def expired_deletions(now=None):
+    """Latest entries of existing users' rows deleted before the retention period."""
+    cutoff = (now or timezone.now()) - retention()
+    return _live().filter(op=Change.DELETE, created_at__lt=cutoff).exclude(_later())
+
+
+def orphans():
+    """Entries of users that no longer exist."""
+    return Change.objects.exclude(user_id__in=CustomUser.objects.values("pk"))
+
+
+def raise_horizons(deletions):
+    """Move each user's sync horizon past the ``deletions`` about to be dropped."""
+    horizons = deletions.values("user_id").annotate(last=Max("id")).values_list("user_id", "last")
+    with transaction.atomic():
+        for user_id, last in horizons:
+            CustomUser.objects.filter(pk=user_id, sync_horizon__lt=last).update(sync_horizon=last)
@@ -0,0 +1,265 @@
+"""
+Live updates of a user's ledger, pushed to dashboards over Server-Sent Events.
+
+Writes publish compact deltas on the user's channel once their DB
+transaction commits (rolled-back writes publish nothing):
+
+- ``{"type": "transaction", "op": "created" | "updated", "id": ..., "amount": ...,
+  "date": ..., "description": ..., "category_id": ...}``
+- ``{"type": "transaction", "op": "deleted", "id": ...}``
+- ``{"type": "category", "op": "created" | "updated", "id": ..., "name": ...}``
+- ``{"type": "category", "op": "deleted", "id": ...}``: its transactions are
+  now uncategorized
+- ``{"op": "resync"}``: a bulk write (bulk create/update, import, queryset
+  update) changed rows that are not listed; reload the ledger once
+
+A stream sends everything that arrived since its last message as one
+``delta`` event together with the new balance, so a burst of writes costs
+one balance query per connected dashboard, and nothing while nobody
+listens.
+
+The pub/sub backend is settings.EVENTS_BROKER. InMemoryBroker reaches the
+subscribers of this process only, which suits a single ASGI process; a
+multi-process deployment plugs in a broker with the same ``subscribe``,
+``unsubscribe`` and ``publish`` methods over a shared channel (e.g. Redis
+pub/sub).
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from decimal import Decimal
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils.module_loading import import_string
+from rest_framework.renderers import BaseRenderer
+
+RESYNC = {"op": "resync"}
+
+# Deltas a slow consumer may fall behind by before it is told to resync instead
+MAX_BUFFERED = 1000
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(
+                getattr(settings, "EVENTS_BROKER", "users.events.InMemoryBroker")
+            )()
+        return _broker
+
+
+def channel(user_id):
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """
+    The deltas of one channel for one stream. Filled from any thread; read
+    either blocking (``wait``, WSGI) or from the event loop given as ``loop``
+    (``await_events``, ASGI).
+    """
+
+    def __init__(self, name, loop=None):
+        self.channel = name
+        self.loop = loop
+        self.lock = threading.Lock()
+        self.events = deque()
+        self.ready = asyncio.Event() if loop is not None else threading.Event()
+
+    def put(self, event):
+        with self.lock:
+            if len(self.events) >= MAX_BUFFERED:
+                self.events.clear()
+                event = RESYNC
+            self.events.append(event)
+        if self.loop is None:
+            self.ready.set()
+        else:
+            self.loop.call_soon_threadsafe(self.ready.set)
+
+    def drain(self):
+        with self.lock:
+            events = list(self.events)
+            self.events.clear()
+            self.ready.clear()
+        return events
+
+    def wait(self, timeout):
+        self.ready.wait(timeout)
+        return self.drain()
+
+    async def await_events(self, timeout):
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except TimeoutError:
+            pass
+        return self.drain()
+
+
+class InMemoryBroker:
+    """Delivers events to the subscriptions of this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    def subscribe(self, subscription):
+        with self.lock:
+            self.subscriptions[subscription.channel].add(subscription)
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscriptions[subscription.channel]
+
+    def publish(self, name, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(name, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+
+# ------------------------------
+# Publishing
+# ------------------------------
+
+
+def publish(user_id, event):
+    """Publish ``event`` to ``user_id``'s streams once the current DB transaction commits."""
+    if user_id is not None:
+        transaction.on_commit(partial(broker().publish, channel(user_id), event))
+
+
+def resync(user_ids):
+    for user_id in set(user_ids):
+        publish(user_id, RESYNC)
+
+
+def amount(value):
+    return f"{Decimal(str(value)):.2f}"
+
+
+def transaction_delta(tx, op):
+    if op == "deleted":
+        return {"type": "transaction", "op": op, "id": tx.pk}
+    return {
+        "type": "transaction",
+        "op": op,
+        "id": tx.pk,
+        "amount": amount(tx.amount),
+        "date": str(tx.date),
+        "description": tx.description,
+        "category_id": tx.category_id,
+    }
+
+
+def category_delta(category, op):
+    if op == "deleted":
+        return {"type": "category", "op": op, "id": category.pk}
+    return {"type": "category", "op": op, "id": category.pk, "name": category.name}
+
+
+# ------------------------------
+# Streaming
+# ------------------------------
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets DRF's content negotiation accept EventSource's
+    ``Accept: text/event-stream``. Streams write their own body; this
+    renderer only serializes error responses.
+    """
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode()
+
+
+def balance_query(user_id):
+    # MonthlyRollup holds a few rows per month rather than one per transaction
+    from .models import MonthlyRollup
+
+    return MonthlyRollup.objects.filter(user_id=user_id)
+
+
+def balance(user_id):
+    return balance_query(user_id).aggregate(balance=Sum("total", default=0))["balance"]
+
+
+async def abalance(user_id):
+    totals = await balance_query(user_id).aaggregate(balance=Sum("total", default=0))
+    return totals["balance"]
+
+
+def message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def delta_message(events, total):
+    if RESYNC in events:
+        return message("delta", {"balance": amount(total), "resync": True})
+    return message("delta", {"balance": amount(total), "changes": events})
+
+
+def keepalive():
+    return getattr(settings, "SSE_KEEPALIVE", 15)
+
+
+def deadline():
+    return time.monotonic() + getattr(settings, "SSE_MAX_DURATION", 300)
+
+
+def stream(user_id):
+    """
+    Event stream of ``user_id`` for WSGI servers: holds a worker thread for
+    as long as the client stays connected, up to SSE_MAX_DURATION.
+    """
+    subscription = Subscription(channel(user_id))
+    broker().subscribe(subscription)
+    try:
+        # Anything missed while disconnected is lost; "ready" tells the client to reload
+        yield "retry: 3000\n" + message("ready", {"balance": amount(balance(user_id))})
+        until = deadline()
+        while (remaining := until - time.monotonic()) > 0:
+            events = subscription.wait(min(keepalive(), remaining))
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            yield delta_message(events, balance(user_id))
+    finally:
+        broker().unsubscribe(subscription)
+
+
+async def astream(user_id):
+    """``stream`` for ASGI servers: an open stream holds no thread while it waits."""
+    subscription = Subscription(channel(user_id), loop=asyncio.get_running_loop())
+    broker().subscribe(subscription)
+    try:
+        total = await abalance(user_id)
+        yield "retry: 3000\n" + message("ready", {"balance": amount(total)})
+        until = deadline()
+        while (remaining := until - time.monotonic()) > 0:
+            events = await subscription.await_events(min(keepalive(), remaining))
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            yield delta_message(events, await abalance(user_id))
+    finally:
+        broker().unsubscribe(subscription)
@@ -0,0 +1,16 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from .hashers import HashingBusy, retry_after
+
+
+def exception_handler(exc, context):
+    """DRF's handler, plus 503 for logins turned away by the hashing cap."""
+    if isinstance(exc, HashingBusy):
+        return Response(
+            {"detail": str(exc)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": retry_after()},
+        )
+    return drf_exception_handler(exc, context)
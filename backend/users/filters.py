@@ -0,0 +1,70 @@
+"""
+Filters of the admin user listings (admin_users_list and api.UserViewSet).
+
+Every filter is a plain range or equality on an indexed column, so it
+combines with the keyset pagination on username without scanning the table:
+
+- ``search``: case-insensitive prefix of the username or the email
+- ``role``: "admin" or "user"
+- ``is_active``: "true" or "false"
+- ``joined_after`` / ``joined_before``: inclusive YYYY-MM-DD bounds on date_joined
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import CustomUser
+
+BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+# Sorts after every character a username or email can continue with
+PREFIX_END = "\U0010ffff"
+
+
+def prefix_range(field, prefix):
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix + PREFIX_END})
+
+
+def start_of_day(value):
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def filter_users(queryset, params):
+    """Apply the query parameters above; raises ValueError on invalid values."""
+    search = params.get("search", "").strip().lower()
+    if search:
+        queryset = queryset.alias(
+            username_lower=Lower("username"), email_lower=Lower("email")
+        ).filter(prefix_range("username_lower", search) | prefix_range("email_lower", search))
+
+    role = params.get("role")
+    if role:
+        if role not in dict(CustomUser.ROLE_CHOICES):
+            raise ValueError("Invalid role")
+        queryset = queryset.filter(role=role)
+
+    is_active = params.get("is_active")
+    if is_active:
+        if is_active.lower() not in BOOLEANS:
+            raise ValueError("Invalid is_active")
+        queryset = queryset.filter(is_active=BOOLEANS[is_active.lower()])
+
+    for param, lookup, offset in (
+        ("joined_after", "date_joined__gte", timedelta()),
+        ("joined_before", "date_joined__lt", timedelta(days=1)),
+    ):
+        value = params.get(param)
+        if value:
+            try:
+                day = parse_date(value)
+            except ValueError:
+                day = None
+            if day is None:
+                raise ValueError(f"Invalid {param} date")
+            queryset = queryset.filter(**{lookup: start_of_day(day + offset)})
+
+    return queryset
@@ -0,0 +1,87 @@
+"""
+Password hashing whose cost is picked by settings.PASSWORD_HASHER_PROFILE.
+
+Changing the profile needs no migration. Every stored hash records its own
+iteration count, so it keeps verifying, and Django re-hashes the password
+with the current profile on the user's next successful login
+(``must_update``).
+
+Hashing is also capped at AUTH_MAX_CONCURRENT_HASHES at a time per process.
+A caller that waits longer than AUTH_HASH_WAIT seconds for a free slot gets
+HashingBusy, so a flood of logins queues for the CPU instead of slowing down
+every other request the process serves. API views (users.exceptions) and
+HTML views (users.middleware.HashingBusyMiddleware) answer it with 503.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.exceptions import ImproperlyConfigured
+
+# PBKDF2-SHA256 iterations per profile; extend or override them with
+# settings.PASSWORD_HASHER_PROFILES
+PROFILES = {
+    # OWASP's minimum for PBKDF2-HMAC-SHA256
+    "fast": 600_000,
+    "default": PBKDF2PasswordHasher.iterations,
+    "strong": 3_000_000,
+}
+
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+class HashingBusy(Exception):
+    pass
+
+
+def retry_after():
+    """``Retry-After`` value for the 503 that answers HashingBusy."""
+    return str(int(getattr(settings, "AUTH_HASH_WAIT", 5)))
+
+
+def hash_slots():
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(getattr(settings, "AUTH_MAX_CONCURRENT_HASHES", 4))
+        return _slots
+
+
+@contextmanager
+def hashing_slot():
+    slots = hash_slots()
+    if not slots.acquire(timeout=getattr(settings, "AUTH_HASH_WAIT", 5)):
+        raise HashingBusy("Too many logins in progress, retry shortly")
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def profiles():
+    return {**PROFILES, **getattr(settings, "PASSWORD_HASHER_PROFILES", {})}
+
+
+def profile_iterations(profile=None):
+    profile = profile or getattr(settings, "PASSWORD_HASHER_PROFILE", "default")
+    try:
+        return profiles()[profile]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown PASSWORD_HASHER_PROFILE: {profile}")
+
+
+class ProfilePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the iteration count of the active profile."""
+
+    @property
+    def iterations(self):
+        return profile_iterations()
+
+    def encode(self, password, salt, iterations=None):
+        # verify() and harden_runtime() hash through here too
+        with hashing_slot():
+            return super().encode(password, salt, iterations)
@@ -0,0 +1,252 @@
+"""
+Streaming import of bank exports (CSV, OFX, QIF) into Transaction.
+
+Parsers are generators yielding ``(line_number, row)`` pairs where ``row`` is
+a dict of raw strings with the keys ``date``, ``amount``, ``description`` and
+``category``. ``import_transactions`` validates the rows and inserts them in
+chunks with ``bulk_create``, so memory use depends on the chunk size rather
+than on the size of the file.
+"""
+
+import csv
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .models import Category, Transaction
+
+FORMATS = ("csv", "ofx", "qif")
+
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%m/%d/%Y", "%m/%d/%y", "%Y%m%d")
+
+# Transaction.amount is DecimalField(max_digits=10, decimal_places=2)
+MAX_AMOUNT = Decimal("99999999.99")
+
+# Only the first errors are kept in the report; the rest are just counted
+MAX_REPORTED_ERRORS = 1000
+
+CSV_COLUMNS = {
+    "date": ("date", "transaction date", "posted", "booking date", "data"),
+    "amount": ("amount", "value", "kwota"),
+    "description": ("description", "payee", "memo", "name", "title", "opis"),
+    "category": ("category", "kategoria"),
+}
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+# ------------------------------
+# Parsers
+# ------------------------------
+
+
+def parse_csv(lines):
+    """
+    Rows of a CSV file with a header line. Column names are matched
+    case-insensitively against CSV_COLUMNS; the delimiter is sniffed from
+    the header.
+    """
+    lines = iter(lines)
+    header = next(lines, None)
+    if header is None:
+        return
+
+    dialect = csv.Sniffer().sniff(header, delimiters=",;\t|")
+    names = [name.strip().lower() for name in next(csv.reader([header], dialect))]
+    columns = {}
+    for key, aliases in CSV_COLUMNS.items():
+        for index, name in enumerate(names):
+            if name in aliases:
+                columns[key] = index
+                break
+
+    missing = {"date", "amount"} - set(columns)
+    if missing:
+        raise ImportRowError(f"CSV header is missing column(s): {', '.join(sorted(missing))}")
+
+    for line_number, values in enumerate(csv.reader(lines, dialect), start=2):
+        if not any(value.strip() for value in values):
+            continue
+        yield line_number, {
+            key: values[index] if index < len(values) else "" for key, index in columns.items()
+        }
+
+
+def parse_qif(lines):
+    """Records of a QIF file, each terminated by a "^" line."""
+    row, start = {}, None
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("!"):
+            continue
+
+        code, value = line[0], line[1:].strip()
+        if code == "^":
+            if row:
+                yield start, row
+            row, start = {}, None
+            continue
+
+        start = start or line_number
+        if code == "D":
+            row["date"] = value.replace("'", "/").replace(" ", "")
+        elif code in "TU":
+            row.setdefault("amount", value)
+        elif code == "P":
+            row["description"] = value
+        elif code == "M":
+            row.setdefault("description", value)
+        elif code == "L":
+            row["category"] = value.strip("[]")
+
+    if row:
+        yield start, row
+
+
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def parse_ofx(lines):
+    """
+    STMTTRN records of an OFX file, either SGML (OFX 1.x, unclosed tags) or
+    XML (OFX 2.x).
+    """
+    row, start = None, None
+    for line_number, line in enumerate(lines, start=1):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag, value = tag.upper(), value.strip()
+            if tag == "STMTTRN":
+                if closing:
+                    if row is not None:
+                        yield start, row
+                    row = None
+                else:
+                    row, start = {}, line_number
+            elif row is not None and not closing:
+                if tag == "DTPOSTED":
+                    row["date"] = value[:8]
+                elif tag == "TRNAMT":
+                    row["amount"] = value
+                elif tag == "NAME":
+                    row["description"] = value
+                elif tag == "MEMO":
+                    row.setdefault("description", value)
+
+
+PARSERS = {"csv": parse_csv, "ofx": parse_ofx, "qif": parse_qif}
+
+
+def detect_format(filename):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return extension if extension in FORMATS else None
+
+
+# ------------------------------
+# Row conversion
+# ------------------------------
+
+
+def parse_date(value):
+    value = (value or "").strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ImportRowError(f"Invalid date: {value!r}")
+
+
+def parse_amount(value):
+    value = (value or "").strip().replace(" ", "").replace("\xa0", "")
+    if "," in value:
+        # "1,234.56" -> thousands separator, "12,50" -> decimal comma
+        value = value.replace(",", "") if "." in value else value.replace(",", ".")
+    try:
+        amount = Decimal(value).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ImportRowError(f"Invalid amount: {value!r}")
+    if not amount.is_finite():
+        raise ImportRowError(f"Invalid amount: {value!r}")
+    if abs(amount) > MAX_AMOUNT:
+        raise ImportRowError(f"Amount out of range: {value}")
+    return amount
+
+
+class CategoryResolver:
+    """Maps category names to the user's categories, creating missing ones."""
+
+    def __init__(self, user):
+        self.user = user
+        self.categories = {}
+        for category in Category.objects.filter(user=user).order_by("-id"):
+            self.categories[category.name.lower()] = category
+
+    def __call__(self, name):
+        name = (name or "").strip()[:100]
+        if not name:
+            return None
+        category = self.categories.get(name.lower())
+        if category is None:
+            category = Category.objects.create(name=name, user=self.user)
+            self.categories[name.lower()] = category
+        return category
+
+
+# ------------------------------
+# Import
+# ------------------------------
+
+
+def import_transactions(user, rows, chunk_size=1000, progress=None):
+    """
+    Insert ``(line_number, row)`` pairs for ``user`` in chunks of
+    ``chunk_size``. Invalid rows are reported and skipped; every chunk is
+    committed on its own. ``progress`` is called after each chunk with the
+    running report.
+    """
+    report = {"processed": 0, "imported": 0, "failed": 0, "errors": []}
+    resolve_category = CategoryResolver(user)
+    chunk = []
+
+    def flush():
+        with transaction.atomic():
+            Transaction.objects.bulk_create(chunk)
+        report["imported"] += len(chunk)
+        chunk.clear()
+        if progress is not None:
+            progress(report)
+
+    def fail(line_number, message):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line_number, "error": message})
+
+    try:
+        for line_number, row in rows:
+            report["processed"] += 1
+            try:
+                tx = Transaction(
+                    user=user,
+                    date=parse_date(row.get("date")),
+                    amount=parse_amount(row.get("amount")),
+                    description=(row.get("description") or "").strip(),
+                    category=resolve_category(row.get("category")),
+                )
+            except ImportRowError as exc:
+                fail(line_number, str(exc))
+                continue
+
+            chunk.append(tx)
+            if len(chunk) >= chunk_size:
+                flush()
+    except (ImportRowError, csv.Error, UnicodeDecodeError) as exc:
+        # The file itself is unreadable from here on; keep what was imported
+        fail(None, str(exc))
+
+    if chunk:
+        flush()
+    return report
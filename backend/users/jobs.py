@@ -0,0 +1,193 @@
+"""
+Local, DB-backed job queue for admin operations too heavy for a request.
+
+Views enqueue a users.Job row and answer 202 at once; ``manage.py run_jobs``
+claims queued jobs one at a time and runs their handler. Handlers commit
+their work in batches of JOB_BATCH_SIZE rows, one transaction each, so the
+SQLite write lock is released between batches and other writers are not
+starved. Handlers must be safe to run again after a crash half way through:
+a running job whose worker has shown no progress for JOB_STALE_AFTER
+seconds is queued again, and the next worker to claim it starts over.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from . import changelog
+from .models import Category, Change, CustomUser, Job, MonthlyRollup, Transaction
+
+logger = logging.getLogger(__name__)
+
+
+def default_batch_size():
+    return getattr(settings, "JOB_BATCH_SIZE", 1000)
+
+
+def enqueue(kind, payload, created_by=None):
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(kind=kind, payload=payload, created_by=created_by)
+
+
+def schedule_user_deletion(user_ids, created_by=None):
+    """
+    Deactivate the users right away, which also ends their sessions, and
+    enqueue deleting them together with all their data.
+    """
+    user_ids = sorted(set(user_ids))
+    with transaction.atomic():
+        CustomUser.objects.filter(pk__in=user_ids).update(is_active=False)
+        return enqueue(Job.DELETE_USERS, {"user_ids": user_ids}, created_by)
+
+
+# ------------------------------
+# Worker
+# ------------------------------
+
+
+def requeue_stale():
+    """Queue running jobs whose worker went silent again. Returns their number."""
+    stale_after = timedelta(seconds=getattr(settings, "JOB_STALE_AFTER", 15 * 60))
+    requeued = Job.objects.filter(
+        status=Job.RUNNING, heartbeat_at__lt=timezone.now() - stale_after
+    ).update(status=Job.QUEUED, processed=0)
+    if requeued:
+        logger.warning("Requeued %d abandoned job(s)", requeued)
+    return requeued
+
+
+def claim_next():
+    """Mark the oldest queued job as running and return it, or None."""
+    requeue_stale()
+    while True:
+        job = Job.objects.filter(status=Job.QUEUED).order_by("id").first()
+        if job is None:
+            return None
+        job.status, job.started_at = Job.RUNNING, timezone.now()
+        job.heartbeat_at = job.started_at
+        # Another worker may have claimed it since the SELECT
+        claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=job.status, started_at=job.started_at, heartbeat_at=job.heartbeat_at
+        )
+        if claimed:
+            return job
+
+
+def run(job, batch_size=None):
+    try:
+        HANDLERS[job.kind](job, batch_size or default_batch_size())
+    except Exception as exc:
+        logger.exception("Job %s failed", job.pk)
+        finish(job, Job.FAILED, error=str(exc) or exc.__class__.__name__)
+    else:
+        finish(job, Job.DONE)
+    return job
+
+
+def run_pending(batch_size=None):
+    """Run queued jobs until there are none left. Returns the jobs run."""
+    done = []
+    while (job := claim_next()) is not None:
+        done.append(run(job, batch_size))
+    return done
+
+
+def finish(job, status, error=""):
+    job.status, job.error, job.finished_at = status, error, timezone.now()
+    Job.objects.filter(pk=job.pk).update(
+        status=job.status, error=job.error, finished_at=job.finished_at
+    )
+
+
+def set_total(job, total):
+    job.total, job.heartbeat_at = total, timezone.now()
+    Job.objects.filter(pk=job.pk).update(total=total, heartbeat_at=job.heartbeat_at)
+
+
+def advance(job, count):
+    job.processed += count
+    job.heartbeat_at = timezone.now()
+    Job.objects.filter(pk=job.pk).update(
+        processed=F("processed") + count, heartbeat_at=job.heartbeat_at
+    )
+
+
+def delete_in_batches(queryset, job, batch_size, raw=False):
+    """
+    Delete the rows of ``queryset`` ``batch_size`` at a time, committing
+    each batch. With ``raw`` the rows go with a plain DELETE, without
+    signals or cascades, so the caller has to remove dependent rows first.
+    """
+    model = queryset.model
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return
+            batch = model.objects.filter(pk__in=pks)
+            if raw:
+                batch._raw_delete(batch.db)
+            else:
+                batch.delete()
+        advance(job, len(pks))
+
+
+# ------------------------------
+# Handlers
+# ------------------------------
+
+
+def delete_users(job, batch_size):
+    """
+    Delete ``payload["user_ids"]`` with their transactions, rollups and
+    categories, children first so that deleting the users themselves no
+    longer cascades to anything large.
+    """
+    user_ids = job.payload["user_ids"]
+    transactions = Transaction.objects.filter(user_id__in=user_ids)
+    rollups = MonthlyRollup.objects.filter(user_id__in=user_ids)
+    categories = Category.objects.filter(user_id__in=user_ids)
+    changes = Change.objects.filter(user_id__in=user_ids)
+    users = CustomUser.objects.filter(pk__in=user_ids)
+    category_count = categories.count()
+    set_total(
+        job,
+        transactions.count() + rollups.count() + category_count
+        # Deleting a category logs one more change
+        + changes.count() + category_count + users.count(),
+    )
+
+    # The rollups are deleted too, so there is nothing to keep in step
+    delete_in_batches(transactions, job, batch_size, raw=True)
+    delete_in_batches(rollups, job, batch_size, raw=True)
+    # Categories are few; a regular delete keeps their signals and SET_NULL
+    delete_in_batches(categories, job, batch_size)
+    # Including the entries the category deletes above just logged
+    delete_in_batches(changes, job, batch_size, raw=True)
+    delete_in_batches(users, job, batch_size)
+
+
+def compact_changes(job, batch_size):
+    """Bound the change log, as described in users.changelog."""
+    superseded = changelog.superseded()
+    deletions = changelog.expired_deletions(job.started_at)
+    orphans = changelog.orphans()
+    set_total(job, superseded.count() + deletions.count() + orphans.count())
+
+    delete_in_batches(superseded, job, batch_size, raw=True)
+    # Clients older than the deletions dropped next can no longer catch up
+    changelog.raise_horizons(deletions)
+    delete_in_batches(deletions, job, batch_size, raw=True)
+    delete_in_batches(orphans, job, batch_size, raw=True)
+
+
+HANDLERS = {
+    Job.DELETE_USERS: delete_users,
+    Job.COMPACT_CHANGES: compact_changes,
+}
@@ -0,0 +1,470 @@
+"""
+Offline HTTP load generator with scripted user journeys.
+
+``run()`` drives concurrent virtual users against a running server
+(runserver, gunicorn, an ASGI server) over real HTTP. Effects that the
+in-process benchmarks (users.benchmarks) cannot show appear here: SQLite
+write locks, session table churn, a saturated worker pool. The client is a
+small HTTP/1.1 implementation on asyncio streams, so nothing beyond the
+standard library is needed and nothing leaves the machine.
+
+Each virtual user behaves like a browser tab of the React frontend. It has
+one keep-alive connection and a cookie jar, signs in with the session
+cookie and sends the CSRF token on writes. It picks a journey at random by
+weight, runs it, and repeats until the run is over:
+
+- register: fetch a CSRF cookie and register a new account
+- login: log in as a seeded account, read the profile, log out
+- transactions: add a few transactions, edit one, delete one
+- dashboard: poll the reads the dashboard makes
+- admin: read the user statistics, then deactivate and reactivate the
+  accounts the register journey created
+
+Apart from register and login, journeys run signed in once per virtual user
+as a seeded account (``manage.py seed_benchmark``; password
+users.seeding.PASSWORD), or as the admin account given for admin.
+
+Requests are reported per endpoint (method and path, ids replaced by
+``{id}``): throughput, p50/p95/p99 latency and error rate. 429 answers count
+as throttled rather than as errors. The auth throttles (users.throttling)
+let few logins per minute through from one address.
+"""
+
+import asyncio
+import json
+import random
+import re
+import secrets
+import ssl
+import statistics
+import time
+from collections import Counter, defaultdict
+from datetime import date
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from . import seeding
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Journey -> default weight
+MIX = {"dashboard": 6, "transactions": 3, "login": 1, "register": 1, "admin": 1}
+
+
+class RequestFailed(Exception):
+    """No usable answer: connection error, timeout or malformed response."""
+
+
+class JourneyFailed(Exception):
+    """A step of a journey got an unexpected answer; the journey is abandoned."""
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+
+class Stats:
+    """Latencies and outcomes per endpoint, and journeys run per name."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.throttled = Counter()
+        self.journeys = Counter()
+        self.failed = Counter()
+
+    def record(self, endpoint, seconds, status):
+        self.latencies[endpoint].append(seconds)
+        if status == 429:
+            self.throttled[endpoint] += 1
+        elif status is None or status >= 400:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies = sorted(seconds * 1000 for seconds in latencies)
+            cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "requests_per_second": round(len(latencies) / elapsed, 2),
+                "errors": self.errors[endpoint],
+                "error_rate": round(self.errors[endpoint] / len(latencies), 4),
+                "throttled": self.throttled[endpoint],
+                "p50_ms": round(cuts[49], 2),
+                "p95_ms": round(cuts[94], 2),
+                "p99_ms": round(cuts[98], 2),
+            }
+        requests = sum(row["requests"] for row in endpoints.values())
+        errors = sum(row["errors"] for row in endpoints.values())
+        return {
+            "seconds": round(elapsed, 2),
+            "requests": requests,
+            "requests_per_second": round(requests / elapsed, 2) if elapsed else 0,
+            "errors": errors,
+            "error_rate": round(errors / requests, 4) if requests else 0,
+            "journeys": dict(sorted(self.journeys.items())),
+            "failed_journeys": dict(sorted(self.failed.items())),
+            "endpoints": endpoints,
+        }
+
+
+def endpoint(method, path):
+    """``method`` and ``path`` without the query string, ids replaced by {id}."""
+    return f"{method} {re.sub(r'/\d+(?=/|$)', '/{id}', path.split('?')[0])}"
+
+
+class Session:
+    """One keep-alive HTTP/1.1 connection to the server, with a cookie jar."""
+
+    def __init__(self, base_url, stats, timeout=30.0):
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL {base_url!r}")
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.netloc = url.netloc
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies = {}
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, data=None):
+        """Send ``data`` as JSON; returns the Response, whatever its status."""
+        body = b"" if data is None else json.dumps(data).encode()
+        headers = {
+            "Host": self.netloc,
+            "Accept": "application/json",
+            "Content-Length": str(len(body)),
+        }
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{key}={value}" for key, value in self.cookies.items())
+        if method not in SAFE_METHODS and "csrftoken" in self.cookies:
+            headers["X-CSRFToken"] = self.cookies["csrftoken"]
+        head = f"{method} {path} HTTP/1.1\r\n" + "".join(
+            f"{k}: {v}\r\n" for k, v in headers.items()
+        )
+        message = head.encode("latin-1") + b"\r\n" + body
+
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self.exchange(message), self.timeout)
+        except (OSError, EOFError, ValueError, asyncio.IncompleteReadError, TimeoutError) as error:
+            await self.close()
+            self.stats.record(endpoint(method, path), time.perf_counter() - started, None)
+            raise RequestFailed(f"{method} {path}: {error!r}") from error
+        self.stats.record(endpoint(method, path), time.perf_counter() - started, response.status)
+
+        for value in response.headers.get("set-cookie", []):
+            cookie = SimpleCookie()
+            cookie.load(value)
+            for key, morsel in cookie.items():
+                if morsel.value and morsel["max-age"] != "0":
+                    self.cookies[key] = morsel.value
+                else:
+                    self.cookies.pop(key, None)
+        return response
+
+    async def exchange(self, message):
+        reused = self.writer is not None
+        if not reused:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port, ssl=self.ssl
+            )
+        try:
+            self.writer.write(message)
+            await self.writer.drain()
+            return await self.read_response()
+        except (ConnectionError, EOFError, asyncio.IncompleteReadError):
+            if not reused:
+                raise
+            # The server closed the idle connection; send again on a new one
+            await self.close()
+            return await self.exchange(message)
+
+    async def read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise EOFError("connection closed")
+        version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+        status = int(status)
+
+        headers = defaultdict(list)
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()].append(value.strip())
+
+        def header(name):
+            return headers[name][-1].lower() if headers.get(name) else ""
+
+        if version == "HTTP/1.1":
+            keep_alive = header("connection") != "close"
+        else:
+            keep_alive = header("connection") == "keep-alive"
+
+        if status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif header("transfer-encoding") == "chunked":
+            body = await self.read_chunked()
+        elif headers.get("content-length"):
+            body = await self.reader.readexactly(int(headers["content-length"][-1]))
+        else:
+            body = await self.reader.read()
+            keep_alive = False
+
+        if not keep_alive:
+            await self.close()
+        return Response(status, headers, body)
+
+    async def read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # Trailers, up to the blank line
+                while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+
+# ------------------------------
+# Journeys
+# ------------------------------
+
+
+def expect(response, *statuses):
+    if response.status not in statuses:
+        raise JourneyFailed(f"answered {response.status}")
+    return response
+
+
+class VirtualUser:
+    """A simulated client: its session, account and random choices."""
+
+    def __init__(self, config, stats, index):
+        self.config = config
+        self.stats = stats
+        self.rng = random.Random(f"{config['seed']}-{index}")
+        self.username = f"{config['prefix']}{index % config['accounts']}"
+        self.session = self.new_session()
+        self.admin_session = None
+        self.signed_in = False
+
+    def new_session(self):
+        return Session(self.config["url"], self.stats, self.config["timeout"])
+
+    async def think(self):
+        if self.config["think"]:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.config["think"]))
+
+    async def sign_in(self, session, username, password):
+        expect(await session.request("GET", "/users/api/csrf/"), 200)
+        data = {"username": username, "password": password}
+        expect(await session.request("POST", "/users/api/login/", data), 200)
+
+    async def signed_in_session(self):
+        if not self.signed_in:
+            await self.sign_in(self.session, self.username, seeding.PASSWORD)
+            self.signed_in = True
+        return self.session
+
+    async def close(self):
+        for session in (self.session, self.admin_session):
+            if session is not None:
+                await session.close()
+
+
+JOURNEYS = {}
+
+
+def journey(function):
+    JOURNEYS[function.__name__] = function
+    return function
+
+
+@journey
+async def register(user):
+    session = user.new_session()
+    try:
+        expect(await session.request("GET", "/users/api/csrf/"), 200)
+        username = f"{user.config['register_prefix']}{secrets.token_hex(4)}"
+        data = {
+            "username": username,
+            "email": f"{username}@example.com",
+            "password1": seeding.PASSWORD,
+            "password2": seeding.PASSWORD,
+        }
+        expect(await session.request("POST", "/users/api/register/", data), 201)
+    finally:
+        await session.close()
+
+
+@journey
+async def login(user):
+    session = user.new_session()
+    try:
+        await user.sign_in(session, user.username, seeding.PASSWORD)
+        await user.think()
+        expect(await session.request("GET", "/users/api/user/"), 200)
+        await user.think()
+        expect(await session.request("POST", "/users/api/logout/"), 200)
+    finally:
+        await session.close()
+
+
+@journey
+async def transactions(user):
+    session = await user.signed_in_session()
+    categories = expect(await session.request("GET", "/api/categories/"), 200).json()
+    categories = (
+        categories.get("results", categories) if isinstance(categories, dict) else categories
+    )
+    category_id = user.rng.choice(categories)["id"] if categories else None
+
+    created = []
+    for _ in range(3):
+        await user.think()
+        data = {
+            "amount": f"-{user.rng.uniform(1, 80):.2f}",
+            "date": date.today().isoformat(),
+            "description": "Load test",
+            "category_id": category_id,
+        }
+        response = expect(await session.request("POST", "/api/transactions/", data), 201)
+        created.append(response.json()["id"])
+
+    await user.think()
+    data = {"description": "Load test, edited"}
+    expect(await session.request("PATCH", f"/api/transactions/{created[0]}/", data), 200)
+    await user.think()
+    expect(await session.request("DELETE", f"/api/transactions/{created[-1]}/"), 204)
+
+
+@journey
+async def dashboard(user):
+    session = await user.signed_in_session()
+    for _ in range(user.config["polls"]):
+        for path in (
+            "/users/api/user/",
+            "/api/transactions/",
+            "/api/transactions/summary/",
+            f"/api/transactions/monthly/?year={date.today().year}",
+            "/api/categories/",
+        ):
+            expect(await session.request("GET", path), 200)
+        await user.think()
+
+
+@journey
+async def admin(user):
+    if user.admin_session is None:
+        user.admin_session = user.new_session()
+        await user.sign_in(user.admin_session, user.config["admin"], user.config["admin_password"])
+    session = user.admin_session
+
+    expect(await session.request("GET", "/api/users/statistics/"), 200)
+    await user.think()
+    query = urlencode({"search": user.config["register_prefix"]})
+    users = expect(await session.request("GET", f"/api/users/?{query}"), 200).json()
+    ids = [row["id"] for row in users.get("results", [])]
+    if not ids:
+        return
+    for action in ("deactivate", "activate"):
+        await user.think()
+        data = {"user_ids": ids, "action": action}
+        expect(await session.request("POST", "/api/users/bulk-actions/", data), 200)
+
+
+# ------------------------------
+# Runs
+# ------------------------------
+
+
+async def run(
+    url,
+    concurrency=10,
+    duration=None,
+    journeys=None,
+    mix=None,
+    prefix="bench",
+    accounts=10,
+    admin=None,
+    admin_password=seeding.PASSWORD,
+    think=0.0,
+    polls=3,
+    timeout=30.0,
+    seed=0,
+):
+    """
+    Run ``concurrency`` virtual users for ``duration`` seconds or ``journeys``
+    journeys each, whichever ends first, and return the report of Stats. The
+    ``mix`` weights default to MIX, without admin unless ``admin`` is given.
+    """
+    if duration is None and journeys is None:
+        raise ValueError("Give a duration, a number of journeys, or both")
+    mix = dict(mix or {name: weight for name, weight in MIX.items() if admin or name != "admin"})
+    unknown = set(mix) - set(JOURNEYS)
+    if unknown:
+        raise ValueError(f"Unknown journey(s): {', '.join(sorted(unknown))}")
+    if mix.get("admin") and not admin:
+        raise ValueError("The admin journey needs an admin account")
+
+    config = {
+        "url": url,
+        "prefix": prefix,
+        "accounts": max(accounts, 1),
+        "admin": admin,
+        "admin_password": admin_password,
+        "register_prefix": f"load-{secrets.token_hex(3)}-",
+        "think": think,
+        "polls": polls,
+        "timeout": timeout,
+        "seed": seed,
+    }
+    names, weights = list(mix), list(mix.values())
+    stats = Stats()
+    started = time.perf_counter()
+    deadline = None if duration is None else started + duration
+
+    async def virtual_user(index):
+        user = VirtualUser(config, stats, index)
+        try:
+            done = 0
+            while journeys is None or done < journeys:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                name = user.rng.choices(names, weights)[0]
+                try:
+                    await JOURNEYS[name](user)
+                    stats.journeys[name] += 1
+                except (JourneyFailed, RequestFailed):
+                    stats.failed[name] += 1
+                done += 1
+        finally:
+            await user.close()
+
+    await asyncio.gather(*(virtual_user(index) for index in range(concurrency)))
+    return stats.report(time.perf_counter() - started)
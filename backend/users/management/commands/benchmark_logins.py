@@ -0,0 +1,55 @@
+import os
+import time
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from users import hashers
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password verifications (the CPU cost of a login) per second on one core "
+        "under each hasher profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="profiles",
+            help="Profile to measure; repeat for several. Default: all of them.",
+        )
+        parser.add_argument("--seconds", type=float, default=2.0, help="Time per profile.")
+
+    def handle(self, *args, **options):
+        available = hashers.profiles()
+        profiles = options["profiles"] or list(available)
+        unknown = set(profiles) - set(available)
+        if unknown:
+            raise CommandError(f"Unknown profile(s): {', '.join(sorted(unknown))}")
+
+        cores = os.cpu_count() or 1
+        self.stdout.write(
+            f"{'profile':<10} {'iterations':>10} {'ms/login':>9} {'logins/s/core':>14} "
+            f"{f'logins/s x{cores}':>14}"
+        )
+        for profile in profiles:
+            with override_settings(PASSWORD_HASHER_PROFILE=profile):
+                rate = self.measure(options["seconds"])
+            self.stdout.write(
+                f"{profile:<10} {available[profile]:>10} {1000 / rate:>9.1f} "
+                f"{rate:>14.1f} {rate * cores:>14.1f}"
+            )
+
+    def measure(self, seconds):
+        # Hashed under the measured profile, as it is after the login rehash
+        encoded = make_password("benchmark-password")
+        logins, started = 0, time.perf_counter()
+        while True:
+            check_password("benchmark-password", encoded)
+            logins += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= seconds:
+                return logins / elapsed
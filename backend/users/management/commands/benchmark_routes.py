@@ -0,0 +1,111 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every route at several data scales (users.benchmarks), in-process against "
+        "the configured database, which is left unchanged. Prints p50/p95/p99 latency and "
+        "query counts, optionally writes them as JSON, and fails on regressions against "
+        "the stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            action="append",
+            dest="scales",
+            choices=sorted(benchmarks.SCALES),
+            help="Scale to run; repeat for several. Default: all of them.",
+        )
+        parser.add_argument(
+            "--route",
+            action="append",
+            dest="routes",
+            help="Route name to run; repeat for several. Default: every route.",
+        )
+        parser.add_argument("--iterations", type=int, default=benchmarks.ITERATIONS)
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--baseline",
+            default=str(Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"),
+            help="Results to compare against. Default: %(default)s",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Replace the baseline with these results instead of comparing.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Fraction by which a p50 may grow before it counts as a regression.",
+        )
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Keep the per-user response cache on (off by default, to measure the work).",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be positive")
+        unknown = set(options["routes"] or ()) - set(benchmarks.SCENARIOS)
+        if unknown:
+            raise CommandError(f"No scenario for route(s): {', '.join(sorted(unknown))}")
+
+        scales = {label: benchmarks.SCALES[label] for label in options["scales"] or ()}
+        results = benchmarks.run(
+            scales,
+            iterations=options["iterations"],
+            routes=options["routes"],
+            cache=options["cache"],
+            progress=self.progress if options["verbosity"] > 1 else None,
+        )
+        self.report(results)
+
+        if options["output"]:
+            self.write(options["output"], results)
+
+        baseline_path = Path(options["baseline"])
+        if options["save_baseline"]:
+            self.write(baseline_path, results)
+            return
+        if not baseline_path.exists():
+            self.stdout.write(f"No baseline at {baseline_path}; run with --save-baseline")
+            return
+
+        baseline = json.loads(baseline_path.read_text())
+        regressions = benchmarks.compare(results, baseline, tolerance=options["tolerance"])
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(line))
+            raise CommandError(f"{len(regressions)} regression(s) against {baseline_path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}"))
+
+    def progress(self, name):
+        self.stderr.write(f"  {name} done")
+
+    def report(self, results):
+        self.stdout.write(
+            f"{'scale':<7} {'route':<42} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>7}"
+        )
+        for label, routes in results["results"].items():
+            for key, row in routes.items():
+                self.stdout.write(
+                    f"{label:<7} {key:<42} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                    f"{row['p99_ms']:>8.1f} {row['queries']:>7}"
+                )
+
+    def write(self, path, results):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        self.stdout.write(f"Wrote {path}")
@@ -0,0 +1,186 @@
+import asyncio
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from users import tokens
+from users.models import CustomUser
+
+# Endpoint name -> (sync DRF path, async path)
+ENDPOINTS = {
+    "user": ("/users/api/user/", "/users/api/async/user/"),
+    "transactions": ("/api/transactions/", "/users/api/async/transactions/"),
+    "summary": ("/api/transactions/summary/", "/users/api/async/transactions/summary/"),
+    "categories": ("/api/categories/", "/users/api/async/categories/"),
+}
+
+HOST = "localhost"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/s and latency of the sync read endpoints served through WSGI "
+        "with a fixed pool of worker threads against their async versions served through "
+        "ASGI, at several numbers of concurrent clients. Runs in-process, no server needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User whose data is read; needs transactions.")
+        parser.add_argument(
+            "--clients",
+            type=int,
+            action="append",
+            help="Concurrent clients; repeat for several. Default: 100, 250, 500, 1000.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=5, help="Requests per client at each level."
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="WSGI worker threads, as a threaded server (e.g. gunicorn gthread) runs.",
+        )
+        parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="transactions")
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Keep the per-user response cache on (off by default, to measure the queries).",
+        )
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"No user named {options['username']!r}")
+
+        authorization = f"Bearer {tokens.issue(user, tokens.ACCESS)}".encode()
+        sync_path, async_path = ENDPOINTS[options["endpoint"]]
+        levels = options["clients"] or [100, 250, 500, 1000]
+
+        cache_settings = {}
+        if not options["cache"]:
+            cache_settings = {
+                "CACHES": {
+                    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                    "benchmark": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+                },
+                "RESPONSE_CACHE_ALIAS": "benchmark",
+            }
+
+        self.stdout.write(
+            f"{'server':<6} {'clients':>7} {'requests':>8} {'errors':>6} {'req/s':>8} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        # Long enough for every level, however slow
+        with override_settings(ACCESS_TOKEN_LIFETIME=24 * 3600, **cache_settings):
+            for clients in levels:
+                for server, path, request in (
+                    ("wsgi", sync_path, self.wsgi_client(options["threads"])),
+                    ("asgi", async_path, self.asgi_client()),
+                ):
+                    result = asyncio.run(
+                        self.load(request, path, authorization, clients, options["requests"])
+                    )
+                    self.report(server, clients, *result)
+
+    async def load(self, request, path, authorization, clients, requests):
+        latencies, errors = [], 0
+
+        async def client():
+            nonlocal errors
+            for _ in range(requests):
+                started = time.perf_counter()
+                status = await request(path, authorization)
+                latencies.append(time.perf_counter() - started)
+                errors += status != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return latencies, errors, time.perf_counter() - started
+
+    def report(self, server, clients, latencies, errors, elapsed):
+        latencies.sort()
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f"{server:<6} {clients:>7} {len(latencies):>8} {errors:>6} "
+            f"{len(latencies) / elapsed:>8.1f} {cuts[49] * 1000:>8.1f} "
+            f"{cuts[94] * 1000:>8.1f} {cuts[98] * 1000:>8.1f}"
+        )
+
+    def wsgi_client(self, threads):
+        """
+        Requests queue for one of ``threads`` workers, each blocked for the
+        whole request, the way a threaded WSGI server handles them.
+        """
+        handler = WSGIHandler()
+        pool = ThreadPoolExecutor(max_workers=threads)
+
+        def call(path, authorization):
+            status = []
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "SERVER_NAME": HOST,
+                "SERVER_PORT": "80",
+                "HTTP_HOST": HOST,
+                "HTTP_AUTHORIZATION": authorization.decode(),
+                "REMOTE_ADDR": "127.0.0.1",
+                "wsgi.input": io.BytesIO(),
+                "wsgi.errors": io.StringIO(),
+                "wsgi.url_scheme": "http",
+            }
+            body = handler(environ, lambda line, headers: status.append(int(line[:3])))
+            b"".join(body)
+            body.close()
+            return status[0]
+
+        async def request(path, authorization):
+            return await asyncio.get_running_loop().run_in_executor(pool, call, path, authorization)
+
+        return request
+
+    def asgi_client(self):
+        """Every request is a task on the one event loop, as under an ASGI server."""
+        handler = ASGIHandler()
+
+        async def request(path, authorization):
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "query_string": b"",
+                "root_path": "",
+                "headers": [(b"host", HOST.encode()), (b"authorization", authorization)],
+                "client": ("127.0.0.1", 0),
+                "server": (HOST, 80),
+            }
+            received = False
+            status = []
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                # The client never disconnects
+                await asyncio.Future()
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status.append(message["status"])
+
+            await handler(scope, receive, send)
+            return status[0]
+
+        return request
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from users import jobs
+from users.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue compaction of the sync change log (users.changelog) for run_jobs. "
+        "Schedule it daily, e.g. from cron."
+    )
+
+    def handle(self, *args, **options):
+        job = jobs.enqueue(Job.COMPACT_CHANGES, {})
+        self.stdout.write(self.style.SUCCESS(f"Queued {job}"))
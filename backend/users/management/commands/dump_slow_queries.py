@@ -0,0 +1,42 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from users.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = "Print the slow-query log (users.slowlog), newest first, with query plans."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=50, help="Entries to print.")
+        parser.add_argument("--view", help="Only queries of this route name.")
+        parser.add_argument("--json", action="store_true", help="One JSON object per line.")
+        parser.add_argument("--clear", action="store_true", help="Empty the log after printing it.")
+
+    def handle(self, *args, **options):
+        entries = SlowQuery.objects.order_by("-id")
+        if options["view"]:
+            entries = entries.filter(view=options["view"])
+
+        for entry in entries[: options["limit"]]:
+            if options["json"]:
+                row = {
+                    field.name: getattr(entry, field.attname) for field in SlowQuery._meta.fields
+                }
+                self.stdout.write(json.dumps(row, default=str))
+                continue
+            self.stdout.write(
+                f"{entry.created_at:%Y-%m-%d %H:%M:%S} {entry.duration * 1000:.1f} ms "
+                f"{entry.method} {entry.path} ({entry.view or '-'}, user {entry.user_id or '-'})"
+            )
+            self.stdout.write(f"  at {entry.callsite or 'unknown callsite'}")
+            self.stdout.write(f"  {entry.sql}")
+            if entry.params:
+                self.stdout.write(f"  params: {entry.params}")
+            for line in entry.plan.splitlines():
+                self.stdout.write(f"    {line}")
+
+        if options["clear"]:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Cleared {deleted} entry(ies)"))
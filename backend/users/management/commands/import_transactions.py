@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users import importers
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Import transactions for a user from a CSV, OFX or QIF bank export."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument("--user", required=True, help="Username to import transactions for.")
+        parser.add_argument("--format", choices=importers.FORMATS)
+        parser.add_argument("--encoding", default="utf-8-sig")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options["user"])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist")
+
+        file_format = options["format"] or importers.detect_format(options["path"])
+        if file_format is None:
+            raise CommandError("Cannot detect the file format, pass --format")
+
+        def progress(report):
+            self.stdout.write(
+                f"{report['processed']} row(s) read, {report['imported']} imported, "
+                f"{report['failed']} failed"
+            )
+
+        try:
+            with open(
+                options["path"], encoding=options["encoding"], errors="replace", newline=""
+            ) as lines:
+                report = importers.import_transactions(
+                    user,
+                    importers.PARSERS[file_format](lines),
+                    chunk_size=max(options["chunk_size"], 1),
+                    progress=progress,
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['imported']} of {report['processed']} transaction(s)"
+            )
+        )
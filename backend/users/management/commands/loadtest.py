@@ -0,0 +1,154 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users import loadtest, seeding
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test a running server over HTTP with scripted user journeys (users.loadtest), "
+        "offline. Journeys sign in as accounts made by seed_benchmark. Prints throughput, "
+        "p50/p95/p99 latency and error rates per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="Server to load. Default: %(default)s",
+        )
+        parser.add_argument(
+            "--serve",
+            action="store_true",
+            help="Start runserver on a free local port for the run instead of using --url.",
+        )
+        parser.add_argument("--concurrency", type=int, default=10, help="Virtual users.")
+        parser.add_argument(
+            "--duration", type=float, help="Seconds to run. Default: 30 unless --journeys is given."
+        )
+        parser.add_argument("--journeys", type=int, help="Journeys per virtual user.")
+        parser.add_argument(
+            "--mix",
+            help=(
+                "Journey weights as name=weight,... "
+                f"Default: {','.join(f'{k}={v}' for k, v in loadtest.MIX.items())} "
+                "(admin only with --admin)."
+            ),
+        )
+        parser.add_argument("--prefix", default="bench", help="Seeded account prefix.")
+        parser.add_argument("--accounts", type=int, default=10, help="Seeded accounts to use.")
+        parser.add_argument("--admin", help="Admin account for the admin journey.")
+        parser.add_argument("--admin-password", default=seeding.PASSWORD)
+        parser.add_argument(
+            "--think", type=float, default=0.0, help="Mean pause between requests, in seconds."
+        )
+        parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the report to this JSON file.")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be positive")
+        duration, journeys = options["duration"], options["journeys"]
+        if duration is None and journeys is None:
+            duration = 30.0
+
+        mix = None
+        if options["mix"]:
+            try:
+                mix = {
+                    name.strip(): int(weight)
+                    for name, weight in (item.split("=") for item in options["mix"].split(","))
+                }
+            except ValueError:
+                raise CommandError("--mix must look like dashboard=6,transactions=3")
+
+        with self.server(options) as url:
+            try:
+                report = asyncio.run(
+                    loadtest.run(
+                        url,
+                        concurrency=options["concurrency"],
+                        duration=duration,
+                        journeys=journeys,
+                        mix=mix,
+                        prefix=options["prefix"],
+                        accounts=options["accounts"],
+                        admin=options["admin"],
+                        admin_password=options["admin_password"],
+                        think=options["think"],
+                        timeout=options["timeout"],
+                        seed=options["seed"],
+                    )
+                )
+            except ValueError as error:
+                raise CommandError(str(error))
+
+        self.report(report)
+        if options["output"]:
+            path = Path(options["output"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(f"Wrote {path}")
+
+    @contextmanager
+    def server(self, options):
+        if not options["serve"]:
+            yield options["url"]
+            return
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        process = subprocess.Popen(
+            [sys.executable, "manage.py", "runserver", "--noreload", f"127.0.0.1:{port}"],
+            cwd=settings.BASE_DIR,
+            env=os.environ.copy(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                    break
+                except OSError:
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        raise CommandError("runserver did not start")
+                    time.sleep(0.2)
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            process.terminate()
+            process.wait()
+
+    def report(self, report):
+        self.stdout.write(
+            f"{'endpoint':<42} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'errors':>7} {'429':>5}"
+        )
+        for key, row in report["endpoints"].items():
+            self.stdout.write(
+                f"{key:<42} {row['requests']:>8} {row['requests_per_second']:>8.1f} "
+                f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+                f"{row['error_rate']:>7.1%} {row['throttled']:>5}"
+            )
+        self.stdout.write(
+            f"{report['requests']} requests in {report['seconds']} s "
+            f"({report['requests_per_second']} req/s), error rate {report['error_rate']:.1%}"
+        )
+        completed, failed = report["journeys"], report["failed_journeys"]
+        for name in sorted({*completed, *failed}):
+            self.stdout.write(
+                f"  {name}: {completed.get(name, 0)} completed, {failed.get(name, 0)} failed"
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users import tokens
+
+
+class Command(BaseCommand):
+    help = "Delete revoked API tokens that have expired anyway."
+
+    def handle(self, *args, **options):
+        deleted = tokens.prune()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} revoked token(s)"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users import rollups
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Rebuild the MonthlyRollup table from the raw transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild rollups for this username.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            try:
+                user = CustomUser.objects.get(username=options["user"])
+            except CustomUser.DoesNotExist:
+                raise CommandError(f"User {options['user']} does not exist")
+
+        written = rollups.rebuild(user=user, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} monthly rollup row(s)"))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users import jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (bulk user deletion) from the users.Job table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once the queue is empty instead of polling."
+        )
+        parser.add_argument("--batch-size", type=int, help="Rows per transaction.")
+        parser.add_argument(
+            "--poll-interval", type=float, default=2.0, help="Seconds between queue checks."
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"] or jobs.default_batch_size(), 1)
+        while True:
+            job = jobs.claim_next()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Running {job}")
+            jobs.run(job, batch_size)
+            if job.status == job.DONE:
+                self.stdout.write(self.style.SUCCESS(f"{job}: {job.processed} row(s) processed"))
+            else:
+                self.stdout.write(self.style.ERROR(f"{job}: {job.error}"))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users import seeding
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users with categories and transactions (users.seeding) "
+        f"for benchmarks and load tests. Every user's password is {seeding.PASSWORD!r}."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--tx-per-user", type=int, default=1000)
+        parser.add_argument("--prefix", default="bench", help="Usernames are <prefix><n>.")
+        parser.add_argument("--months", type=int, default=12, help="Months of history.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["tx_per_user"] < 0 or options["months"] < 1:
+            raise CommandError("--users and --months must be positive, --tx-per-user not negative")
+
+        prefix = options["prefix"]
+        names = [f"{prefix}{n}" for n in range(options["users"])]
+        taken = CustomUser.objects.filter(username__in=names).count()
+        if taken:
+            raise CommandError(f"{taken} user(s) named {prefix}<n> exist already; use --prefix")
+
+        started = time.perf_counter()
+        users = seeding.seed(
+            options["users"],
+            options["tx_per_user"],
+            prefix=prefix,
+            seed=options["seed"],
+            months=options["months"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(users)} user(s) with {options['tx_per_user']} transaction(s) "
+                f"each in {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,213 @@
+"""
+Request metrics: wall time, SQL time and query count, serializer time and
+response size of every request, per view.
+
+MetricsMiddleware (users.middleware) sets up a RequestMetrics for each
+request in the ``current`` context variable. ``execute_wrapper``, installed
+on every DB connection as it opens, hands each query to the RequestMetrics
+of the request running it, so it counts and times every query. Going
+through the context variable keeps concurrent async requests that share a
+connection apart. Serializers add their to_representation time through
+``serializing`` (see users.serializers). When the response is ready, the
+middleware reports the numbers in a ``Server-Timing`` header that browser
+dev tools display, then adds them to in-memory histograms. ``render()``
+writes those histograms in the Prometheus text format for /metrics.
+
+The histograms belong to this process only, like the response cache
+counters. Prometheus scrapes each worker and sums across them. Recording
+takes one lock per request, and label values are route names, so the number
+of series stays bounded.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from . import slowlog
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+BYTES = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+METHODS = {"GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"}
+
+# Histogram -> (help, buckets)
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Wall time of the request in Django.", SECONDS),
+    "http_request_db_duration_seconds": ("Time spent in SQL queries.", SECONDS),
+    "http_request_db_queries": ("SQL queries per request.", QUERIES),
+    "http_request_serialize_duration_seconds": ("Time spent in serializers.", SECONDS),
+    "http_response_size_bytes": ("Size of non-streaming response bodies.", BYTES),
+}
+
+_lock = threading.Lock()
+_histograms = {}  # (histogram, view, method) -> Histogram
+_responses = {}  # (view, method, status) -> count
+
+current = ContextVar("request_metrics", default=None)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class RequestMetrics:
+    """
+    Counters of one request; also the DB execute wrapper that feeds them.
+    Queries of ``slow_threshold`` seconds or more are kept in ``slow`` for the
+    slow-query log (users.slowlog).
+    """
+
+    __slots__ = (
+        "queries",
+        "sql",
+        "serialize",
+        "depth",
+        "serialize_started",
+        "slow_threshold",
+        "slow",
+    )
+
+    def __init__(self, slow_threshold=None):
+        self.queries = 0
+        self.sql = 0.0
+        self.serialize = 0.0
+        self.depth = 0
+        self.serialize_started = 0.0
+        self.slow_threshold = slow_threshold
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql += elapsed
+            self.queries += 1
+            if self.slow_threshold is not None and elapsed >= self.slow_threshold:
+                self.slow.append(slowlog.capture(context["connection"], sql, params, many, elapsed))
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    request_metrics = current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    return request_metrics(execute, sql, params, many, context)
+
+
+class Serializing:
+    """
+    Context manager timing serializer work of the current request. Nested
+    serializers (a category inside a transaction) are counted once, by the
+    outermost.
+    """
+
+    def __enter__(self):
+        metrics = current.get()
+        if metrics is not None:
+            if not metrics.depth:
+                metrics.serialize_started = time.perf_counter()
+            metrics.depth += 1
+
+    def __exit__(self, *exc_info):
+        metrics = current.get()
+        if metrics is not None:
+            metrics.depth -= 1
+            if not metrics.depth:
+                metrics.serialize += time.perf_counter() - metrics.serialize_started
+
+
+serializing = Serializing()
+
+
+def server_timing(metrics, elapsed):
+    return (
+        f"total;dur={elapsed * 1000:.1f}, "
+        f'db;dur={metrics.sql * 1000:.1f};desc="{metrics.queries} queries", '
+        f"serialize;dur={metrics.serialize * 1000:.1f}"
+    )
+
+
+def record(view, method, status, metrics, elapsed, size=None):
+    # Any string can be a method; keep arbitrary ones out of the labels
+    method = method if method in METHODS else "OTHER"
+    values = {
+        "http_request_duration_seconds": elapsed,
+        "http_request_db_duration_seconds": metrics.sql,
+        "http_request_db_queries": metrics.queries,
+        "http_request_serialize_duration_seconds": metrics.serialize,
+    }
+    if size is not None:
+        values["http_response_size_bytes"] = size
+    with _lock:
+        for name, value in values.items():
+            histogram = _histograms.get((name, view, method))
+            if histogram is None:
+                histogram = _histograms[name, view, method] = Histogram(HISTOGRAMS[name][1])
+            histogram.observe(value)
+        key = (view, method, str(status))
+        _responses[key] = _responses.get(key, 0) + 1
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _responses.clear()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{_label(value)}"' for key, value in labels.items())
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Every metric of this process, in the Prometheus text exposition format."""
+    with _lock:
+        histograms = {
+            key: (histogram.buckets, list(histogram.counts), histogram.sum)
+            for key, histogram in _histograms.items()
+        }
+        responses = dict(_responses)
+
+    lines = [
+        "# HELP http_responses_total Responses by view, method and status.",
+        "# TYPE http_responses_total counter",
+    ]
+    for (view, method, status), count in sorted(responses.items()):
+        lines.append(
+            f"http_responses_total{{{_labels(view=view, method=method, status=status)}}} {count}"
+        )
+
+    for name, (help_text, _) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (family, view, method), (buckets, counts, total) in sorted(histograms.items()):
+            if family != name:
+                continue
+            labels = _labels(view=view, method=method)
+            cumulative = 0
+            for bound, count in zip((*buckets, "+Inf"), counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {_number(total)}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,159 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from . import metrics, profiling, slowlog
+from .hashers import HashingBusy, retry_after
+
+
+def view_name(request):
+    match = request.resolver_match
+    return match.view_name if match else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Measures each request for users.metrics and hands its slow queries to
+    users.slowlog. Put it first in MIDDLEWARE so
+    that its time and queries include the other middleware. Streaming
+    responses are measured up to the start of the body, with no size.
+
+    Runs natively under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request_metrics = metrics.RequestMetrics(slowlog.threshold())
+        token = metrics.current.set(request_metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        elapsed = time.perf_counter() - started
+
+        if request_metrics.slow:
+            slowlog.save(request, view_name(request), request_metrics.slow)
+        return self.finish(request, response, request_metrics, elapsed)
+
+    async def __acall__(self, request):
+        request_metrics = metrics.RequestMetrics(slowlog.threshold())
+        token = metrics.current.set(request_metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        elapsed = time.perf_counter() - started
+
+        if request_metrics.slow:
+            await sync_to_async(slowlog.save)(request, view_name(request), request_metrics.slow)
+        return self.finish(request, response, request_metrics, elapsed)
+
+    def finish(self, request, response, request_metrics, elapsed):
+        if getattr(settings, "SERVER_TIMING", True):
+            response["Server-Timing"] = metrics.server_timing(request_metrics, elapsed)
+        metrics.record(
+            view_name(request),
+            request.method,
+            response.status_code,
+            request_metrics,
+            elapsed,
+            None if response.streaming else len(response.content),
+        )
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the requests users.profiling picks. Put it after
+    AuthenticationMiddleware, which sets the user allowed to ask for a
+    profile; its own cost then shows in the request's metrics too.
+
+    Runs natively under both WSGI and ASGI. Under ASGI only the event loop
+    thread is sampled, see users.profiling.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        trigger = profiling.trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        sampler = profiling.Sampler()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        elapsed = time.perf_counter() - started
+
+        profile = profiling.save(request, response, trigger, sampler, elapsed, view_name(request))
+        return self.finish(response, profile, trigger)
+
+    async def __acall__(self, request):
+        if profiling.requested(request):
+            # Checking the caller may query the database
+            trigger = await sync_to_async(profiling.trigger)(request)
+        else:
+            trigger = profiling.trigger(request)
+        if trigger is None:
+            return await self.get_response(request)
+
+        sampler = profiling.Sampler()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            sampler.stop()
+        elapsed = time.perf_counter() - started
+
+        profile = await sync_to_async(profiling.save)(
+            request, response, trigger, sampler, elapsed, view_name(request)
+        )
+        return self.finish(response, profile, trigger)
+
+    def finish(self, response, profile, trigger):
+        if profile is not None and trigger == profile.ON_DEMAND:
+            response["X-Profile-Id"] = str(profile.pk)
+        return response
+
+
+class HashingBusyMiddleware(MiddlewareMixin):
+    """
+    Answers HashingBusy (users.hashers) from HTML views such as the login
+    and registration pages, and the Django admin login, with 503. DRF views
+    answer it themselves (users.exceptions).
+    """
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, HashingBusy):
+            response = HttpResponse(str(exception), status=503, content_type="text/plain")
+            response["Retry-After"] = retry_after()
+            return response
+        return None
@@ -0,0 +1,90 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_rollups(apps, schema_editor):
+    Transaction = apps.get_model("users", "Transaction")
+    MonthlyRollup = apps.get_model("users", "MonthlyRollup")
+
+    rows = (
+        Transaction.objects.order_by()
+        .annotate(month=TruncMonth("date"))
+        .values("user_id", "category_id", "month")
+        .annotate(
+            total=Sum("amount"),
+            count=Count("id"),
+            min_amount=Min("amount"),
+            max_amount=Max("amount"),
+        )
+    )
+    MonthlyRollup.objects.bulk_create(
+        (MonthlyRollup(**row) for row in rows.iterator(chunk_size=1000)), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField()),
+                ("total", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("count", models.PositiveIntegerField()),
+                ("min_amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("max_amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="users.category",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["user", "month"], name="users_month_user_id_7b8515_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("category__isnull", False)),
+                        fields=("user", "category", "month"),
+                        name="unique_rollup_user_category_month",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("category__isnull", True)),
+                        fields=("user", "month"),
+                        name="unique_rollup_user_uncategorized_month",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0002_monthlyrollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(fields=["user", "name"], name="category_user_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                fields=["role", "is_active", "date_joined"],
+                name="user_role_active_joined_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["user", "date", "id"], name="transaction_user_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "category", "date"],
+                name="transaction_user_cat_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:40
+
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="data_version",
+            field=models.CharField(
+                default=users.models.new_data_version, editable=False, max_length=32
+            ),
+        ),
+    ]
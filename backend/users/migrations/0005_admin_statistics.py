@@ -0,0 +1,24 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:52
+
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_user_data_version"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="customuser",
+            managers=[
+                ("objects", users.models.CustomUserManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="monthlyrollup",
+            index=models.Index(fields=["month", "count", "total"], name="rollup_month_volume_idx"),
+        ),
+    ]
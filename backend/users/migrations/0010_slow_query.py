@@ -0,0 +1,41 @@
+# Generated by Django 6.1.2 on 2026-10-18 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0009_change_log"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("duration", models.FloatField(help_text="Seconds")),
+                ("database", models.CharField(max_length=32)),
+                ("sql", models.TextField()),
+                ("params", models.TextField(blank=True)),
+                ("plan", models.TextField(blank=True)),
+                ("view", models.CharField(blank=True, max_length=128)),
+                ("method", models.CharField(blank=True, max_length=8)),
+                ("path", models.CharField(blank=True, max_length=512)),
+                ("user_id", models.BigIntegerField(blank=True, null=True)),
+                ("callsite", models.CharField(blank=True, max_length=512)),
+            ],
+            options={
+                "verbose_name_plural": "slow queries",
+            },
+        ),
+    ]
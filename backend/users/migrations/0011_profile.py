@@ -0,0 +1,46 @@
+# Generated by Django 6.1.2 on 2026-10-18 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0010_slow_query"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Profile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "trigger",
+                    models.CharField(
+                        choices=[
+                            ("on_demand", "Requested by an admin"),
+                            ("sampled", "Sampled traffic"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("view", models.CharField(blank=True, max_length=128)),
+                ("method", models.CharField(max_length=8)),
+                ("path", models.CharField(max_length=512)),
+                ("status", models.PositiveSmallIntegerField()),
+                ("user_id", models.BigIntegerField(blank=True, null=True)),
+                ("duration", models.FloatField(help_text="Seconds")),
+                ("samples", models.PositiveIntegerField()),
+                ("collapsed", models.TextField()),
+            ],
+        ),
+    ]
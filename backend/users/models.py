@@ -1,8 +1,47 @@
 from django.db import models
 
 # Create your models here.
-from django.contrib.auth.models import AbstractUser
-from django.db import models
+import uuid
+
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.db import models, transaction
+from django.db.models.functions import Lower
+from django.dispatch import Signal
+
+# Sent with ``user_ids`` whenever transactions or categories of those users
+# change, inside the DB transaction that changes them.
+user_data_changed = Signal()
+
+
+def new_data_version():
+    return uuid.uuid4().hex
+
+
+class CustomUserQuerySet(models.QuerySet):
+    """Drops the cached admin statistics on bulk writes to the fields they count."""
+
+    def update(self, **kwargs):
+        from . import statistics
+
+        rows = super().update(**kwargs)
+        if statistics.USER_FIELDS.intersection(kwargs):
+            statistics.invalidate()
+        return rows
+
+    update.alters_data = True
+
+    def delete(self):
+        from . import signals
+
+        with signals.deleting_users(self.values_list("pk", flat=True)):
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class CustomUserManager(UserManager.from_queryset(CustomUserQuerySet)):
+    pass
 
 
 class CustomUser(AbstractUser):
@@ -11,6 +50,46 @@ class CustomUser(AbstractUser):
         ("user", "User"),
     ]
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default="user")
+    # Replaced whenever the user's data changes; keys the response cache
+    # (users.cache)
+    data_version = models.CharField(max_length=32, default=new_data_version, editable=False)
+    # Change log entries up to this id have been compacted away; sync cursors
+    # older than it have to start over (users.changelog)
+    sync_horizon = models.BigIntegerField(default=0, editable=False)
+
+    objects = CustomUserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Covers every counter and the join-date histogram of the admin statistics
+            models.Index(
+                fields=["role", "is_active", "date_joined"], name="user_role_active_joined_idx"
+            ),
+            # Filtered admin user listings, walked in username (keyset) order
+            models.Index(fields=["role", "username"], name="user_role_username_idx"),
+            models.Index(fields=["is_active", "username"], name="user_active_username_idx"),
+            # Case-insensitive prefix search of the admin user listings (users.filters)
+            models.Index(Lower("username"), name="user_username_lower_idx"),
+            models.Index(Lower("email"), name="user_email_lower_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Profile changes show up in cached responses (e.g. /users/api/user/);
+        # a login only touches last_login and keeps the cache warm.
+        update_fields = kwargs.get("update_fields")
+        if not self._state.adding and (
+            update_fields is None or not set(update_fields) <= {"last_login"}
+        ):
+            self.data_version = new_data_version()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "data_version"}
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        from . import signals
+
+        with signals.deleting_users([self.pk]):
+            return super().delete(*args, **kwargs)
 
     def is_admin(self):
         return self.role == "admin" or self.is_superuser
@@ -19,16 +98,137 @@ class CustomUser(AbstractUser):
         return self.role == "user"
 
 
+class CategoryQuerySet(models.QuerySet):
+    """
+    Reports bulk writes, which bypass the Category signals, through
+    user_data_changed and to live-update streams as a resync.
+    """
+
+    def changed(self, rows):
+        """Report bulk writes to the categories of ``rows``, (user_id, pk) pairs."""
+        from . import changelog, events
+
+        rows = list(rows)
+        user_ids = {user_id for user_id, _ in rows}
+        user_data_changed.send(sender=Category, user_ids=user_ids)
+        events.resync(user_ids)
+        changelog.record(Change.CATEGORY, Change.UPSERT, rows)
+
+    def update(self, **kwargs):
+        with transaction.atomic():
+            rows = list(self.order_by().values_list("user_id", "pk"))
+            updated = super().update(**kwargs)
+            new_owner = kwargs.get("user_id", kwargs.get("user"))
+            if new_owner is not None:
+                new_owner = getattr(new_owner, "pk", new_owner)
+                rows += [(new_owner, pk) for _, pk in rows]
+            self.changed(rows)
+        return updated
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic():
+            objs = super().bulk_create(objs, *args, **kwargs)
+            self.changed((obj.user_id, obj.pk) for obj in objs)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic():
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            self.changed((obj.user_id, obj.pk) for obj in objs)
+        return rows
+
+    bulk_update.alters_data = True
+
+
 class Category(models.Model):
     name = models.CharField(max_length=100)
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True, blank=True)
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = "Categories"
+        indexes = [models.Index(fields=["user", "name"], name="category_user_name_idx")]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Write the change log entry (post_save) in the same transaction; no
+        # savepoint, as Model.save_base itself does
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class TransactionQuerySet(models.QuerySet):
+    """
+    Keeps MonthlyRollup in step with bulk queryset writes, which bypass
+    Transaction.save() and (for bulk_create/bulk_update/update) signals, and
+    reports them through user_data_changed and to live-update streams as a
+    resync.
+    """
+
+    def update(self, **kwargs):
+        from . import changelog, events, rollups
+
+        with rollups.deferred():
+            rows = list(self.order_by().values_list("user_id", "pk"))
+            user_ids = {user_id for user_id, _ in rows}
+            new_owner = kwargs.get("user_id", kwargs.get("user"))
+            if new_owner is not None:
+                new_owner = getattr(new_owner, "pk", new_owner)
+                user_ids.add(new_owner)
+                rows += [(new_owner, pk) for _, pk in rows]
+            events.resync(user_ids)
+            changelog.record(Change.TRANSACTION, Change.UPSERT, rows)
+
+            if not rollups.ROLLUP_FIELDS.intersection(kwargs):
+                rollups.touch(set(), user_ids)
+                return super().update(**kwargs)
+
+            pks = sorted({pk for _, pk in rows})
+            buckets = rollups.buckets_for_pks(pks)
+            updated = super().update(**kwargs)
+            rollups.touch(buckets | rollups.buckets_for_pks(pks))
+        return updated
+
+    update.alters_data = True
+
+    def delete(self):
+        from . import changelog, rollups
+
+        # post_delete fires per row; deferring refreshes each bucket once and
+        # writes the change log entries with one INSERT
+        with rollups.deferred(), changelog.collect():
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from . import changelog, events, rollups
+
+        with rollups.deferred():
+            objs = super().bulk_create(objs, *args, **kwargs)
+            rollups.touch(rollups.bucket_for(obj) for obj in objs)
+            events.resync(obj.user_id for obj in objs)
+            changelog.record(
+                Change.TRANSACTION, Change.UPSERT, ((obj.user_id, obj.pk) for obj in objs)
+            )
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from . import changelog, rollups
+
+        # Each batch goes through update() above; refresh buckets once overall
+        with rollups.deferred(), changelog.collect():
+            return super().bulk_update(objs, fields, *args, **kwargs)
+
+    bulk_update.alters_data = True
+
 
 class Transaction(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -37,5 +237,204 @@ class Transaction(models.Model):
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
 
+    objects = TransactionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Ledger listing and keyset pagination: WHERE user ORDER BY date, id
+            models.Index(fields=["user", "date", "id"], name="transaction_user_date_idx"),
+            # Per-category totals and rollup refreshes
+            models.Index(fields=["user", "category", "date"], name="transaction_user_cat_date_idx"),
+        ]
+
     def __str__(self):
         return f"{self.amount} - {self.category}"
+
+    def save(self, *args, **kwargs):
+        # Run pre_save/post_save inside the same transaction as the row write
+        # so the rollup refresh in signals.py commits or rolls back with it.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class MonthlyRollup(models.Model):
+    """
+    Per (user, category, month) aggregate of Transaction.amount, kept up to
+    date by users.rollups. Rebuild with ``manage.py rebuild_rollups``.
+    """
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True)
+    month = models.DateField()
+    total = models.DecimalField(max_digits=14, decimal_places=2)
+    count = models.PositiveIntegerField()
+    min_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    max_amount = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "category", "month"],
+                condition=models.Q(category__isnull=False),
+                name="unique_rollup_user_category_month",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "month"],
+                condition=models.Q(category__isnull=True),
+                name="unique_rollup_user_uncategorized_month",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "month"]),
+            # Covers the per-month transaction volume of the admin statistics
+            models.Index(fields=["month", "count", "total"], name="rollup_month_volume_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.month:%Y-%m} {self.category}: {self.total}"
+
+
+class Job(models.Model):
+    """
+    A background job of the local queue in users.jobs, run by
+    ``manage.py run_jobs``.
+    """
+
+    QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+    DELETE_USERS = "delete_users"
+    COMPACT_CHANGES = "compact_changes"
+    KIND_CHOICES = [
+        (DELETE_USERS, "Delete users and their data"),
+        (COMPACT_CHANGES, "Compact the change log"),
+    ]
+
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    # Rows to process / processed so far
+    total = models.PositiveBigIntegerField(default=0)
+    processed = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Last sign of life of the worker running it; a running job silent for
+    # JOB_STALE_AFTER seconds is queued again (users.jobs)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # The worker's "oldest queued job" lookup
+        indexes = [models.Index(fields=["status", "id"], name="job_status_id_idx")]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+
+
+class RevokedToken(models.Model):
+    """A signed API token (users.tokens) revoked before its expiry."""
+
+    jti = models.CharField(max_length=32, unique=True)
+    # Past this the token is rejected anyway and the row can be pruned
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
+
+
+class Change(models.Model):
+    """
+    An entry of the append-only change log of transactions and categories
+    read by /api/sync/ (users.changelog). Written in the same DB transaction
+    as the change; the id is the sync cursor.
+    """
+
+    TRANSACTION, CATEGORY = "transaction", "category"
+    KIND_CHOICES = [(TRANSACTION, "Transaction"), (CATEGORY, "Category")]
+    UPSERT, DELETE = "upsert", "delete"
+    OP_CHOICES = [(UPSERT, "Created or updated"), (DELETE, "Deleted")]
+
+    # No constraint: entries are written while a user's rows are being
+    # deleted, before the user row itself goes; compaction drops orphans
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    op = models.CharField(max_length=6, choices=OP_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # WHERE user AND id > cursor ORDER BY id
+            models.Index(fields=["user", "id"], name="change_user_id_idx"),
+            # Compaction: the later entries for the same row
+            models.Index(fields=["user", "kind", "object_id", "id"], name="change_row_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.op} {self.kind} {self.object_id}"
+
+
+class SlowQuery(models.Model):
+    """
+    A query slower than SLOW_QUERY_THRESHOLD, with where it came from and its
+    plan (users.slowlog). The table keeps only the latest SLOW_QUERY_LOG_SIZE.
+    """
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    duration = models.FloatField(help_text="Seconds")
+    database = models.CharField(max_length=32)
+    sql = models.TextField()
+    params = models.TextField(blank=True)
+    plan = models.TextField(blank=True)
+    # Request: route name, method and path; no FK, so that deleting a user
+    # needs no update here
+    view = models.CharField(max_length=128, blank=True)
+    method = models.CharField(max_length=8, blank=True)
+    path = models.CharField(max_length=512, blank=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    # First frame of project code below the ORM: "users/views.py:412 in list"
+    callsite = models.CharField(max_length=512, blank=True)
+
+    class Meta:
+        verbose_name_plural = "slow queries"
+
+    def __str__(self):
+        return f"{self.duration * 1000:.0f} ms in {self.view or 'unknown view'}"
+
+
+class Profile(models.Model):
+    """
+    A sampled profile of one request (users.profiling), taken on an admin's
+    demand or for a random fraction of traffic. The table keeps only the
+    latest PROFILE_LOG_SIZE.
+    """
+
+    ON_DEMAND, SAMPLED = "on_demand", "sampled"
+    TRIGGER_CHOICES = [(ON_DEMAND, "Requested by an admin"), (SAMPLED, "Sampled traffic")]
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    view = models.CharField(max_length=128, blank=True)
+    method = models.CharField(max_length=8)
+    path = models.CharField(max_length=512)
+    status = models.PositiveSmallIntegerField()
+    # No FK, as for SlowQuery
+    user_id = models.BigIntegerField(null=True, blank=True)
+    duration = models.FloatField(help_text="Seconds")
+    samples = models.PositiveIntegerField()
+    # "frame;frame;frame microseconds" lines, the input of flamegraph.pl,
+    # speedscope and similar tools
+    collapsed = models.TextField()
+
+    def __str__(self):
+        return f"Profile #{self.pk} of {self.method} {self.path}"
@@ -0,0 +1,199 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.encoding import force_str
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over a unique ordering such as ("-date", "-id").
+
+    The cursor is an opaque token holding the ordering values of the last row
+    on the page, so every page is one indexed range scan of ``page_size + 1``
+    rows: no OFFSET and no COUNT(*). The last ordering field must be unique
+    so that rows sharing the leading values are neither skipped nor repeated.
+
+    Also usable from plain Django views, which have ``request.GET`` instead
+    of ``request.query_params``.
+    """
+
+    ordering = ("-id",)
+    cursor_query_param = "cursor"
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 2000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, through the async ORM."""
+        queryset = self.page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset])
+
+    def page_queryset(self, queryset, request):
+        """The rows of the requested page, plus one to tell if there are more."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        values, reverse = self.decode_cursor(request)
+        ordering = self.reversed_ordering() if reverse else self.ordering
+        self.cursor_values, self.reverse = values, reverse
+
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            values = self.clean_values(queryset.model, values)
+            queryset = queryset.filter(self.seek_filter(ordering, values))
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, rows):
+        values, reverse = self.cursor_values, self.reverse
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = values is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(self.query_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.build_link(self.page[0], reverse=True)
+
+    def build_link(self, row, reverse):
+        values = [self.field_value(row, field) for field in self.ordering]
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(values, reverse)
+        )
+
+    def reversed_ordering(self):
+        return tuple(field[1:] if field.startswith("-") else f"-{field}" for field in self.ordering)
+
+    def clean_values(self, model, values):
+        try:
+            values = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (ValidationError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        # Ordering fields are not nullable, and seek_filter() cannot compare to NULL
+        if None in values:
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    @staticmethod
+    def query_params(request):
+        return getattr(request, "query_params", request.GET)
+
+    @staticmethod
+    def field_value(row, field):
+        value = getattr(row, field.lstrip("-"))
+        return value.isoformat() if hasattr(value, "isoformat") else value
+
+    @staticmethod
+    def seek_filter(ordering, values):
+        """
+        Rows strictly after ``values`` in ``ordering``:
+        a >= x AND ((a > x) OR (a = x AND b > y) OR ...)
+
+        The redundant leading bound gives the database a plain range on the
+        first index column to seek to.
+        """
+        names = [field.lstrip("-") for field in ordering]
+        after = ["lt" if field.startswith("-") else "gt" for field in ordering]
+
+        bound = Q(**{f"{names[0]}__{after[0]}e": values[0]})
+        clauses = [
+            Q(**dict(zip(names[:i], values[:i])), **{f"{names[i]}__{after[i]}": values[i]})
+            for i in range(len(ordering))
+        ]
+        return bound & reduce(or_, clauses)
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({"v": values, "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = self.query_params(request).get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(force_str(base64.urlsafe_b64decode(padded)))
+            values, reverse = payload["v"], bool(payload.get("r"))
+        except (AttributeError, TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+
+class TransactionPagination(KeysetPagination):
+    ordering = ("-date", "-id")
+
+
+class CategoryPagination(KeysetPagination):
+    ordering = ("name", "id")
+
+
+class UserPagination(KeysetPagination):
+    # username is unique
+    ordering = ("username",)
+    page_size = 50
+    max_page_size = 500
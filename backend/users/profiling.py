@@ -0,0 +1,197 @@
+"""
+Per-request sampling profiler.
+
+ProfilingMiddleware (users.middleware) profiles a request in two cases:
+
+- an admin asked for it with an ``X-Profile: 1`` header or a ``profile=1``
+  query parameter
+- a random PROFILE_SAMPLE_RATE fraction of all traffic (0 by default)
+
+The caller's rights are checked before an on-demand profile starts: the
+session user that AuthenticationMiddleware set, or else the user of a
+bearer token. For anyone else the flag is ignored.
+
+While the request runs, a Sampler thread reads the request thread's stack
+every PROFILE_INTERVAL seconds. Each stack is weighted by the time since
+the previous sample, so the irregular wake-ups of a thread that has to
+take the GIL do not skew the result. The stacks are stored as a Profile in
+collapsed format ("outer;inner;leaf microseconds" lines). flamegraph.pl,
+speedscope and similar tools read this format directly. /api/profiles/
+lists the profiles, and the response of an on-demand request names its
+profile in ``X-Profile-Id``.
+
+A profiled request runs at near full speed. A request that is not profiled
+pays for a header and query-string check. Code that a sync-to-async bridge
+runs on another thread is not sampled; its time shows up as the bridge
+waiting. Under ASGI that is all sync code, and while the request's
+coroutine is suspended the event loop thread is not sampled at all.
+"""
+
+import logging
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import SignedTokenAuthentication
+from .models import Profile
+
+logger = logging.getLogger(__name__)
+
+HEADER = "X-Profile"
+QUERY_PARAM = "profile"
+TRUE = ("1", "true", "yes")
+
+_labels = {}  # code object -> frame label
+
+
+def requested(request):
+    return (
+        request.headers.get(HEADER, "").lower() in TRUE
+        or request.GET.get(QUERY_PARAM, "").lower() in TRUE
+    )
+
+
+def caller(request):
+    """The user of ``request``'s session or bearer token, or None."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user
+    try:
+        authenticated = SignedTokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return authenticated[0] if authenticated else None
+
+
+def trigger(request):
+    """
+    Why ``request`` should be profiled, as a Profile trigger, or None. Only
+    queries the database for requests that ask for a profile.
+    """
+    if requested(request) and is_admin(caller(request)):
+        return Profile.ON_DEMAND
+    rate = getattr(settings, "PROFILE_SAMPLE_RATE", 0)
+    if rate and random.random() < rate:
+        return Profile.SAMPLED
+    return None
+
+
+def label(code):
+    """``path/to/module.py:Class.function``, relative to the project or site-packages."""
+    try:
+        return _labels[code]
+    except KeyError:
+        pass
+    filename = code.co_filename
+    for root in (str(settings.BASE_DIR), sysconfig.get_paths()["purelib"]):
+        if filename.startswith(os.path.join(root, "")):
+            filename = os.path.relpath(filename, root)
+            break
+    else:
+        filename = os.path.basename(filename)
+    _labels[code] = result = f"{filename}:{code.co_qualname}".replace(";", ":")
+    return result
+
+
+class Sampler:
+    """
+    Samples the stack of the calling thread from a background thread, from
+    ``start()`` to ``stop()``, keeping the frames below the caller's.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = interval or getattr(settings, "PROFILE_INTERVAL", 0.001)
+        self.stacks = Counter()  # tuple of frame labels, root first -> seconds
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        frame = sys._getframe(1)
+        self._target = threading.get_ident()
+        self._root = frame
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None and frame is not self._root:
+                stack.append(label(frame.f_code))
+                frame = frame.f_back
+            # An event loop thread may be running another request, or none
+            if stack and frame is not None:
+                self.stacks[tuple(reversed(stack))] += now - last
+                self.samples += 1
+            last = now
+
+    def collapsed(self):
+        lines = (
+            f"{';'.join(stack)} {round(seconds * 1_000_000)}"
+            for stack, seconds in self.stacks.most_common()
+        )
+        return "\n".join(lines)
+
+
+def top(collapsed, limit=15):
+    """
+    The functions of a collapsed profile with the most time, as dicts of
+    their own time (``self_ms``) and time including callees (``total_ms``).
+    """
+    own, total = Counter(), Counter()
+    for line in collapsed.splitlines():
+        stack, _, micros = line.rpartition(" ")
+        frames = stack.split(";")
+        own[frames[-1]] += int(micros)
+        for frame in set(frames):
+            total[frame] += int(micros)
+    return [
+        {
+            "frame": frame,
+            "self_ms": round(own[frame] / 1000, 1),
+            "total_ms": round(total[frame] / 1000, 1),
+        }
+        for frame, _ in own.most_common(limit)
+    ]
+
+
+def is_admin(user):
+    return user is not None and user.is_authenticated and user.is_admin()
+
+
+def save(request, response, trigger, sampler, elapsed, view):
+    """Store the profile of ``request``; None if that failed."""
+    user = getattr(request, "user", None)
+    try:
+        profile = Profile.objects.create(
+            trigger=trigger,
+            view=view,
+            method=request.method[:8],
+            path=request.get_full_path()[:512],
+            status=response.status_code,
+            user_id=user.pk if user is not None and user.is_authenticated else None,
+            duration=elapsed,
+            samples=sampler.samples,
+            collapsed=sampler.collapsed(),
+        )
+        size = getattr(settings, "PROFILE_LOG_SIZE", 100)
+        Profile.objects.filter(id__lte=profile.pk - size).delete()
+    except DatabaseError:
+        logger.exception("Could not store the profile of %s", request.path)
+        return None
+    return profile
@@ -0,0 +1,171 @@
+"""
+Maintenance of the MonthlyRollup table.
+
+A bucket is a ``(user_id, category_id, month)`` tuple. Whenever transactions
+in a bucket change, the bucket is re-aggregated from the raw rows of that one
+month, which keeps min/max correct on deletes while only ever reading a single
+user's month of data.
+
+This is also where transaction writes are reported: once buckets are
+refreshed, ``user_data_changed`` is sent for their users.
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import date
+
+from django.db import models, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import MonthlyRollup, Transaction, user_data_changed
+
+# Transaction fields that decide which bucket a row belongs to or what it adds
+ROLLUP_FIELDS = frozenset({"amount", "date", "category", "category_id", "user", "user_id"})
+
+# SQLite caps the number of bound parameters per statement
+PK_CHUNK_SIZE = 500
+
+_date_field = models.DateField()
+_state = threading.local()
+
+
+def month_start(value):
+    value = _date_field.to_python(value)
+    return value.replace(day=1)
+
+
+def next_month(value):
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def bucket_for(obj):
+    return (obj.user_id, obj.category_id, month_start(obj.date))
+
+
+def buckets_for(queryset):
+    """Distinct buckets touched by the rows of ``queryset``."""
+    return set(
+        queryset.order_by()
+        .annotate(month=TruncMonth("date"))
+        .values_list("user_id", "category_id", "month")
+        .distinct()
+    )
+
+
+def buckets_for_pks(pks):
+    buckets = set()
+    for i in range(0, len(pks), PK_CHUNK_SIZE):
+        buckets |= buckets_for(Transaction.objects.filter(pk__in=pks[i : i + PK_CHUNK_SIZE]))
+    return buckets
+
+
+def refresh_bucket(user_id, category_id, month):
+    """Re-aggregate one bucket from the raw Transaction rows."""
+    totals = Transaction.objects.filter(
+        user_id=user_id,
+        category_id=category_id,
+        date__gte=month,
+        date__lt=next_month(month),
+    ).aggregate(
+        total=Sum("amount"),
+        count=Count("id"),
+        min_amount=Min("amount"),
+        max_amount=Max("amount"),
+    )
+    rollups = MonthlyRollup.objects.filter(user_id=user_id, category_id=category_id, month=month)
+
+    if not totals["count"]:
+        rollups.delete()
+    elif not rollups.update(**totals):
+        MonthlyRollup.objects.create(
+            user_id=user_id, category_id=category_id, month=month, **totals
+        )
+
+
+def refresh_buckets(buckets):
+    for user_id, category_id, month in buckets:
+        refresh_bucket(user_id, category_id, month_start(month))
+
+
+def apply(buckets, user_ids):
+    refresh_buckets(buckets)
+    user_ids = set(user_ids) | {user_id for user_id, _, _ in buckets}
+    if user_ids:
+        user_data_changed.send(sender=Transaction, user_ids=user_ids)
+
+
+def touch(buckets, user_ids=()):
+    """
+    Mark buckets as changed, along with ``user_ids`` whose data changed
+    without moving between buckets. Inside ``deferred()`` they are refreshed
+    and reported once on exit, otherwise immediately.
+    """
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        pending.update(buckets)
+        _state.pending_users.update(user_ids)
+    else:
+        apply(set(buckets), user_ids)
+
+
+@contextmanager
+def deferred():
+    """
+    Run a block of transaction writes atomically and refresh every bucket it
+    touched once, before the block commits.
+    """
+    if getattr(_state, "pending", None) is not None:
+        # Nested: the outermost block does the refresh
+        yield
+        return
+
+    with transaction.atomic():
+        _state.pending, _state.pending_users = set(), set()
+        try:
+            yield
+            pending, pending_users = _state.pending, _state.pending_users
+        finally:
+            _state.pending = _state.pending_users = None
+        apply(pending, pending_users)
+
+
+def rebuild(user=None, batch_size=1000):
+    """
+    Recreate MonthlyRollup from scratch with one GROUP BY over Transaction.
+    Returns the number of rollup rows written.
+    """
+    transactions = Transaction.objects.all()
+    rollups = MonthlyRollup.objects.all()
+    if user is not None:
+        transactions = transactions.filter(user=user)
+        rollups = rollups.filter(user=user)
+
+    rows = (
+        transactions.order_by()
+        .annotate(month=TruncMonth("date"))
+        .values("user_id", "category_id", "month")
+        .annotate(
+            total=Sum("amount"),
+            count=Count("id"),
+            min_amount=Min("amount"),
+            max_amount=Max("amount"),
+        )
+    )
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(MonthlyRollup(**row))
+            if len(batch) >= batch_size:
+                MonthlyRollup.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            MonthlyRollup.objects.bulk_create(batch)
+            written += len(batch)
+    return written
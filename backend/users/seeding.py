@@ -0,0 +1,115 @@
+"""
+Synthetic users, categories and transactions for benchmarks and load tests.
+
+``seed()`` writes realistic-looking ledgers with bulk_create: a monthly
+salary and rent, and everyday expenses spread over the other categories with
+a long tail of amounts, over the months before ``end``. The same ``seed``
+value gives the same data. Every user's password is ``PASSWORD``.
+"""
+
+import calendar
+import random
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+
+from . import rollups, statistics
+from .models import Category, CustomUser, Transaction
+
+PASSWORD = "benchmark-password"
+
+# Category -> (share of everyday expenses, median amount, descriptions)
+EXPENSES = {
+    "Food": (0.35, 18, ["Supermarket", "Bakery", "Lunch", "Farmers market", "Takeaway"]),
+    "Transport": (0.2, 12, ["Train ticket", "Fuel", "Bus pass", "Taxi", "Parking"]),
+    "Utilities": (0.08, 60, ["Electricity", "Water", "Internet", "Phone"]),
+    "Entertainment": (0.12, 25, ["Cinema", "Concert", "Streaming", "Books"]),
+    "Health": (0.07, 35, ["Pharmacy", "Dentist", "Gym"]),
+    "Shopping": (0.18, 45, ["Clothes", "Electronics", "Home goods", "Gifts"]),
+}
+CATEGORIES = ["Salary", "Rent", *EXPENSES]
+
+CENT = Decimal("0.01")
+
+
+def months_before(end, months):
+    """First days of the ``months`` months up to and including ``end``'s."""
+    year, month = end.year, end.month
+    firsts = []
+    for _ in range(months):
+        firsts.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return firsts[::-1]
+
+
+def ledger(rng, user, categories, count, months, end):
+    """``count`` unsaved transactions of ``user`` over the ``months`` up to ``end``."""
+    firsts = months_before(end, months)
+    salary = Decimal(rng.randrange(2500, 7000))
+    rows = []
+    for first in firsts:
+        rows.append((first, salary, "Salary", "Monthly salary"))
+        rows.append((first.replace(day=3), -(salary * Decimal("0.3")), "Rent", "Rent"))
+    del rows[count:]
+
+    names = list(EXPENSES)
+    weights = [EXPENSES[name][0] for name in names]
+    for name in rng.choices(names, weights, k=count - len(rows)):
+        _, median, descriptions = EXPENSES[name]
+        first = rng.choice(firsts)
+        last_day = calendar.monthrange(first.year, first.month)[1]
+        if first.year == end.year and first.month == end.month:
+            last_day = end.day
+        amount = Decimal(median * rng.lognormvariate(0, 0.8)).quantize(CENT)
+        rows.append(
+            (first.replace(day=rng.randint(1, last_day)), -amount, name, rng.choice(descriptions))
+        )
+
+    return [
+        Transaction(
+            user=user,
+            amount=amount.quantize(CENT),
+            date=day,
+            category=categories[name],
+            description=description,
+        )
+        for day, amount, name, description in rows
+    ]
+
+
+def seed(
+    users, transactions_per_user, prefix="bench", seed=0, months=12, end=None, batch_size=5000
+):
+    """
+    Create ``users`` users named ``<prefix><n>``, each with the categories of
+    CATEGORIES and ``transactions_per_user`` transactions. Rollups are
+    refreshed once at the end. Returns the users.
+    """
+    rng = random.Random(seed)
+    end = end or date.today()
+    # One hash for everyone: hashing is deliberately slow
+    password = make_password(PASSWORD)
+
+    with rollups.deferred():
+        created = CustomUser.objects.bulk_create(
+            CustomUser(username=f"{prefix}{n}", email=f"{prefix}{n}@example.com", password=password)
+            for n in range(users)
+        )
+        categories = {}
+        for category in Category.objects.bulk_create(
+            Category(name=name, user=user) for user in created for name in CATEGORIES
+        ):
+            categories.setdefault(category.user_id, {})[category.name] = category
+
+        batch = []
+        for user in created:
+            batch += ledger(rng, user, categories[user.pk], transactions_per_user, months, end)
+            if len(batch) >= batch_size:
+                Transaction.objects.bulk_create(batch, batch_size=batch_size)
+                batch = []
+        if batch:
+            Transaction.objects.bulk_create(batch, batch_size=batch_size)
+
+    statistics.invalidate()
+    return created
@@ -1,8 +1,17 @@
 from rest_framework import serializers
-from .models import CustomUser, Transaction, Category
+from . import metrics
+from .models import CustomUser, Job, Profile, Transaction, Category
 
 
-class CustomUserSerializer(serializers.ModelSerializer):
+class TimedMixin:
+    """Counts to_representation as serializer time of the request (users.metrics)."""
+
+    def to_representation(self, instance):
+        with metrics.serializing:
+            return super().to_representation(instance)
+
+
+class CustomUserSerializer(TimedMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False)
 
     class Meta:
@@ -47,18 +56,155 @@ class CustomUserSerializer(serializers.ModelSerializer):
         return instance
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = "__all__"
 
 
-class TransactionSerializer(serializers.ModelSerializer):
+class UserCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Accepts only categories owned by the requesting user. The single lookup
+    also yields the instance rendered by the nested ``category`` field, so a
+    write needs no further category query.
+    """
+
+    # Set by TransactionListSerializer to resolve a whole batch from one query
+    prefetched = None
+
+    def get_queryset(self):
+        queryset = Category.objects.all()
+        request = self.context.get("request")
+        if request is not None:
+            queryset = queryset.filter(user=request.user)
+        return queryset
+
+    def to_internal_value(self, data):
+        if self.prefetched is None:
+            return super().to_internal_value(data)
+        try:
+            return self.prefetched[int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
+class TransactionListSerializer(serializers.ListSerializer):
+    """
+    Validates and writes many transactions at once: every referenced category
+    is resolved with a single query and rows are written with
+    bulk_create/bulk_update.
+
+    For updates, pass the instances as ``instance``; each row is matched to
+    one of them by its ``id``.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.prefetch_categories(data)
+        if self.instance is not None:
+            self._instances = {instance.pk: instance for instance in self.instance}
+        self._row_instances = []
+        return super().to_internal_value(data)
+
+    def prefetch_categories(self, data):
+        ids = set()
+        for row in data:
+            try:
+                ids.add(int(row["category_id"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+        field = self.child.fields["category_id"]
+        field.prefetched = field.get_queryset().in_bulk(ids)
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            try:
+                self.child.instance = self._instances[int(data["id"])]
+            except (KeyError, TypeError, ValueError):
+                raise serializers.ValidationError({"id": ["Transaction not found."]})
+            self._row_instances.append(self.child.instance)
+        return super().run_child_validation(data)
+
+    def create(self, validated_data):
+        return Transaction.objects.bulk_create(Transaction(**attrs) for attrs in validated_data)
+
+    def update(self, instances, validated_data):
+        fields = set()
+        for instance, attrs in zip(self._row_instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+            fields.update(attrs)
+
+        if fields:
+            Transaction.objects.bulk_update(self._row_instances, fields)
+        return self._row_instances
+
+
+class TransactionSerializer(TimedMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
-    category_id = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.all(), source="category", write_only=True
-    )
+    category_id = UserCategoryField(source="category", write_only=True)
 
     class Meta:
         model = Transaction
         fields = ["id", "amount", "description", "date", "category", "category_id"]
+        list_serializer_class = TransactionListSerializer
+
+
+class CategoryTotalSerializer(TimedMixin, serializers.Serializer):
+    category_id = serializers.IntegerField(allow_null=True)
+    category_name = serializers.CharField(allow_null=True)
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    income = serializers.DecimalField(max_digits=14, decimal_places=2)
+    expenses = serializers.DecimalField(max_digits=14, decimal_places=2)
+    count = serializers.IntegerField()
+
+
+class TransactionSummarySerializer(TimedMixin, serializers.Serializer):
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2)
+    income = serializers.DecimalField(max_digits=14, decimal_places=2)
+    expenses = serializers.DecimalField(max_digits=14, decimal_places=2)
+    count = serializers.IntegerField()
+    categories = CategoryTotalSerializer(many=True)
+
+
+class MonthlyTotalSerializer(TimedMixin, serializers.Serializer):
+    month = serializers.DateField(format="%Y-%m")
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    count = serializers.IntegerField()
+    min_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    max_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class JobSerializer(TimedMixin, serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "total",
+            "processed",
+            "progress",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+    def get_progress(self, job):
+        """Percentage done, once the job has counted its rows."""
+        if job.status == Job.DONE:
+            return 100.0
+        if not job.total:
+            return 0.0
+        return round(min(job.processed / job.total, 1) * 100, 1)
+
+
+class ProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Profile
+        exclude = ["collapsed"]
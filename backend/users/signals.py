@@ -1,11 +1,190 @@
-from django.db.models.signals import post_save
+import threading
+from contextlib import contextmanager
+
+from django.db.models.functions import TruncMonth
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import CustomUser, Category
+from .models import Change, CustomUser, Category, Transaction, user_data_changed
+from . import cache, changelog, events, metrics, rollups, statistics
+
+_state = threading.local()
+
+
+@contextmanager
+def deleting_users(user_ids):
+    """
+    Mark ``user_ids`` as being deleted. Their rollups and change log entries
+    go with them, so the deletes that cascade from the users skip keeping
+    rollups, change log and live updates in step, which would otherwise
+    run per row and re-create rollups of users on their way out.
+    """
+    previous = being_deleted()
+    _state.user_ids = previous | set(user_ids)
+    try:
+        yield
+    finally:
+        _state.user_ids = previous
+
+
+def being_deleted():
+    return getattr(_state, "user_ids", frozenset())
 
 
 @receiver(post_save, sender=CustomUser)
 def create_default_categories(sender, instance, created, **kwargs):
     if created:
         default_names = ["Food", "Transport", "Salary"]
-        for name in default_names:
-            Category.objects.create(name=name, user=instance)
+        Category.objects.bulk_create(Category(name=name, user=instance) for name in default_names)
+
+
+# ------------------------------
+# Monthly rollup maintenance
+# ------------------------------
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_rollup_bucket(sender, instance, **kwargs):
+    instance._previous_rollup_buckets = (
+        rollups.buckets_for(Transaction.objects.filter(pk=instance.pk)) if instance.pk else set()
+    )
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, **kwargs):
+    buckets = getattr(instance, "_previous_rollup_buckets", set())
+    rollups.touch(buckets | {rollups.bucket_for(instance)})
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    if instance.user_id in being_deleted():
+        return
+    rollups.touch({rollups.bucket_for(instance)})
+
+
+@receiver(pre_delete, sender=Category)
+def remember_reassigned_months(sender, instance, **kwargs):
+    if instance.user_id in being_deleted():
+        return
+    # Transactions of a deleted category are moved to "no category" via
+    # SET_NULL, which issues a plain UPDATE without Transaction signals.
+    instance._reassigned_months = set(
+        Transaction.objects.filter(category=instance)
+        .order_by()
+        .annotate(month=TruncMonth("date"))
+        .values_list("user_id", "month")
+        .distinct()
+    )
+
+
+@receiver(post_delete, sender=Category)
+def update_rollup_on_category_delete(sender, instance, **kwargs):
+    if instance.user_id in being_deleted():
+        return
+    months = getattr(instance, "_reassigned_months", set())
+    rollups.touch({(user_id, None, month) for user_id, month in months}, {instance.user_id})
+
+
+# ------------------------------
+# Response cache invalidation
+# ------------------------------
+
+
+@receiver(user_data_changed)
+def bump_data_version(sender, user_ids, **kwargs):
+    cache.bump_data_version(user_ids)
+
+
+@receiver(post_save, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    # Deletes are reported with the rollup refresh above
+    user_data_changed.send(sender=Category, user_ids={instance.user_id})
+
+
+# ------------------------------
+# Change log (bulk writes are logged by the querysets)
+# ------------------------------
+
+
+@receiver(post_save, sender=Transaction)
+def log_transaction_saved(sender, instance, **kwargs):
+    changelog.record(Change.TRANSACTION, Change.UPSERT, [(instance.user_id, instance.pk)])
+
+
+@receiver(post_delete, sender=Transaction)
+def log_transaction_deleted(sender, instance, **kwargs):
+    if instance.user_id in being_deleted():
+        return
+    changelog.record(Change.TRANSACTION, Change.DELETE, [(instance.user_id, instance.pk)])
+
+
+@receiver(post_save, sender=Category)
+def log_category_saved(sender, instance, **kwargs):
+    changelog.record(Change.CATEGORY, Change.UPSERT, [(instance.user_id, instance.pk)])
+
+
+@receiver(post_delete, sender=Category)
+def log_category_deleted(sender, instance, **kwargs):
+    if instance.user_id in being_deleted():
+        return
+    changelog.record(Change.CATEGORY, Change.DELETE, [(instance.user_id, instance.pk)])
+
+
+# ------------------------------
+# Live updates (bulk writes publish a resync from the querysets)
+# ------------------------------
+
+
+@receiver(post_save, sender=Transaction)
+def publish_transaction_saved(sender, instance, created, **kwargs):
+    delta = events.transaction_delta(instance, "created" if created else "updated")
+    events.publish(instance.user_id, delta)
+
+
+@receiver(post_delete, sender=Transaction)
+def publish_transaction_deleted(sender, instance, **kwargs):
+    if instance.user_id in being_deleted():
+        return
+    events.publish(instance.user_id, events.transaction_delta(instance, "deleted"))
+
+
+@receiver(post_save, sender=Category)
+def publish_category_saved(sender, instance, created, **kwargs):
+    delta = events.category_delta(instance, "created" if created else "updated")
+    events.publish(instance.user_id, delta)
+
+
+@receiver(post_delete, sender=Category)
+def publish_category_deleted(sender, instance, **kwargs):
+    if instance.user_id in being_deleted():
+        return
+    events.publish(instance.user_id, events.category_delta(instance, "deleted"))
+
+
+# ------------------------------
+# Admin statistics invalidation
+# ------------------------------
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_statistics_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or statistics.USER_FIELDS.intersection(update_fields):
+        statistics.invalidate()
+
+
+@receiver(post_delete, sender=CustomUser)
+def invalidate_statistics_on_delete(sender, instance, **kwargs):
+    statistics.invalidate()
+
+
+# ------------------------------
+# Request metrics
+# ------------------------------
+
+
+@receiver(connection_created)
+def install_metrics_wrapper(sender, connection, **kwargs):
+    # Once per connection object, which outlives reconnects
+    if metrics.execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.execute_wrapper)
@@ -0,0 +1,119 @@
+"""
+Slow-query log.
+
+The DB execute wrapper of users.metrics times every query of a request.
+Those taking SLOW_QUERY_THRESHOLD seconds or more are captured with their
+callsite: the first frame of project code under the ORM, which is the line
+that evaluated the queryset. Once the response is ready, the middleware
+passes them to ``save()``. It stores each one as a SlowQuery together with
+the request's route, path and user and the database's plan for it (EXPLAIN
+QUERY PLAN on SQLite).
+
+The table is a ring buffer: every save drops the entries that fall out of
+the last SLOW_QUERY_LOG_SIZE. Browse it in the Django admin, or dump it with
+``manage.py dump_slow_queries``. Entries keep the query parameters, session
+keys included, so only staff should be able to read them.
+
+Fast requests add no work at all. For slow ones, the plan and the insert
+run after the view, outside its transaction, and a failure there is logged
+without failing the request.
+"""
+
+import logging
+import os
+import sys
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+# Frames of these files are the instrumentation itself, never the callsite
+INTERNAL = {
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ("metrics.py", "middleware.py", "slowlog.py")
+}
+
+
+def threshold():
+    """Seconds from which a query is slow, or None when the log is off."""
+    return getattr(settings, "SLOW_QUERY_THRESHOLD", None)
+
+
+def callsite():
+    root = os.path.join(str(settings.BASE_DIR), "")
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(root)
+            and filename not in INTERNAL
+            and "site-packages" not in filename
+        ):
+            relative = os.path.relpath(filename, root)
+            return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return ""
+
+
+def capture(connection, sql, params, many, seconds):
+    """What save() needs of a slow query; called inside the execute wrapper."""
+    return (connection.alias, sql, params, many, seconds, callsite())
+
+
+def explain(alias, sql, params):
+    """The plan of ``sql`` as text; EXPLAIN only plans, it does not run it."""
+    connection = connections[alias]
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        # A savepoint, so that a failed EXPLAIN leaves an outer transaction usable
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            rows = cursor.fetchall()
+    except DatabaseError as error:
+        return f"EXPLAIN failed: {error}"
+
+    if connection.vendor != "sqlite":
+        return "\n".join(" ".join(str(value) for value in row) for row in rows)
+    # (id, parent, unused, detail) rows of a tree
+    depths = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depths[node] = depths.get(parent, -1) + 1
+        lines.append(f"{'  ' * depths[node]}{detail}")
+    return "\n".join(lines)
+
+
+def save(request, view, captured):
+    """Store the ``captured`` slow queries of ``request`` and trim the log."""
+    try:
+        user = getattr(request, "user", None)
+        user_id = user.pk if user is not None and user.is_authenticated else None
+        SlowQuery.objects.bulk_create(
+            SlowQuery(
+                duration=seconds,
+                database=alias,
+                sql=sql,
+                params=repr(params)[:2000],
+                # A batch of executemany() has no single plan
+                plan="" if many else explain(alias, sql, params),
+                view=view,
+                method=request.method[:8],
+                path=request.get_full_path()[:512],
+                user_id=user_id,
+                callsite=site[:512],
+            )
+            for alias, sql, params, many, seconds, site in captured
+        )
+        prune()
+    except DatabaseError:
+        logger.exception("Could not store %d slow queries", len(captured))
+
+
+def prune():
+    size = getattr(settings, "SLOW_QUERY_LOG_SIZE", 500)
+    newest = SlowQuery.objects.order_by("-id").values_list("id", flat=True).first()
+    if newest is not None:
+        SlowQuery.objects.filter(id__lte=newest - size).delete()
@@ -0,0 +1,82 @@
+"""
+Admin statistics shared by the admin dashboard, the admin statistics view and
+the statistics API.
+
+All user counters come from one conditional aggregation over CustomUser, and
+transaction volume is read from MonthlyRollup rather than the raw ledger. The
+result is cached for ADMIN_STATISTICS_TIMEOUT seconds and dropped whenever a
+user is created, deleted or changes role, active status or join date, so the
+user counters are always current and transaction volume lags by at most the
+timeout.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import CustomUser, MonthlyRollup
+
+CACHE_KEY = "admin-statistics"
+
+# CustomUser fields the statistics depend on
+USER_FIELDS = frozenset({"role", "is_active", "date_joined"})
+
+
+def statistics_cache():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def compute():
+    counters = CustomUser.objects.aggregate(
+        total_users=Count("id"),
+        active_users=Count("id", filter=Q(is_active=True)),
+        admin_users=Count("id", filter=Q(role="admin")),
+        regular_users=Count("id", filter=Q(role="user")),
+    )
+    counters["inactive_users"] = counters["total_users"] - counters["active_users"]
+
+    users_by_month = (
+        CustomUser.objects.annotate(month=TruncMonth("date_joined"))
+        .values("month")
+        .annotate(count=Count("id"))
+        .order_by("month")
+    )
+    transactions_by_month = (
+        MonthlyRollup.objects.values("month")
+        .annotate(count=Sum("count"), total=Sum("total"))
+        .order_by("month")
+    )
+
+    return {
+        **counters,
+        "users_by_month": [
+            {"month": entry["month"].strftime("%Y-%m"), "count": entry["count"]}
+            for entry in users_by_month
+        ],
+        "transactions_by_month": [
+            {
+                "month": entry["month"].strftime("%Y-%m"),
+                "count": entry["count"],
+                "total": f"{entry['total']:.2f}",
+            }
+            for entry in transactions_by_month
+        ],
+    }
+
+
+def get_statistics():
+    cache = statistics_cache()
+    statistics = cache.get(CACHE_KEY)
+    if statistics is None:
+        statistics = compute()
+        cache.set(CACHE_KEY, statistics, getattr(settings, "ADMIN_STATISTICS_TIMEOUT", 60))
+    return statistics
+
+
+def invalidate():
+    statistics_cache().delete(CACHE_KEY)
+    # Again once committed, in case a concurrent request cached the old
+    # numbers in between
+    transaction.on_commit(lambda: statistics_cache().delete(CACHE_KEY))
@@ -0,0 +1,82 @@
+"""
+Token-bucket throttles for the unauthenticated auth endpoints (login,
+registration), which burn CPU on password hashing.
+
+Each client key gets a bucket of ``num`` tokens, where ``num/period`` is its
+rate in REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]. The bucket refills
+continuously at num/period tokens per second, so a client can burst up to
+``num`` requests and then gets one request every period/num seconds.
+Buckets live in Django's default cache, so every process that shares the
+cache backend also shares the buckets. Updates are get-then-set, which lets
+a few extra requests through under heavy concurrency but never blocks.
+"""
+
+import time
+
+from django.core.cache import cache as default_cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Subclasses set ``scope`` and define ``get_cache_key(request, view)``: the
+    bucket of a request, or None to let it through.
+    """
+
+    scope = None
+    cache = default_cache
+    cache_format = "throttle_%(scope)s_%(ident)s"
+    # "num/period" strings, as for DRF's own throttles
+    parse_rate = SimpleRateThrottle.parse_rate
+
+    def __init__(self):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        self.capacity, self.period = self.parse_rate(rate)
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        if self.capacity is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        now = time.time()
+        tokens, updated_at = self.cache.get(key, (self.capacity, now))
+        refill = (now - updated_at) * self.capacity / self.period
+        tokens = min(self.capacity, tokens + refill)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self.wait_seconds = (1 - tokens) * self.period / self.capacity
+        # A bucket left alone for a whole period is full again; let it expire
+        self.cache.set(key, (tokens, now), self.period)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Per client address, across usernames."""
+
+    scope = "auth_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    """Per target account, across addresses: slows credential stuffing on one user."""
+
+    scope = "auth_username"
+
+    def get_cache_key(self, request, view):
+        username = request.data.get("username")
+        if not isinstance(username, str) or not username:
+            return None
+        ident = username.strip().lower()[:150]
+        return self.cache_format % {"scope": self.scope, "ident": ident}
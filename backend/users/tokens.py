@@ -0,0 +1,184 @@
+"""
+Signed access/refresh tokens for the API.
+
+A token is ``django.core.signing`` output: a compact payload and a timestamp
+under an HMAC of SECRET_KEY. Verifying one needs no database access and no
+password hashing, only that HMAC, the expiry check and a lookup in the
+in-memory revocation list. The payload holds
+
+- ``uid``: the user's primary key
+- ``typ``: "access" or "refresh"
+- ``jti``: a random id, used to revoke this one token
+- ``pwd``: a digest of the user's password hash, so changing the password
+  invalidates every token issued before (the same check Django applies to
+  sessions)
+
+Revoked token ids are stored in RevokedToken and mirrored in a per-process
+set. Single-use refresh tokens are claimed with the insert of their row, so
+of two concurrent uses on any processes only one succeeds. Revocations made by this process apply at once; those made by other
+processes are picked up within TOKEN_REVOCATION_REFRESH seconds, with one
+indexed query for the rows added since the last look.
+"""
+
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+ACCESS, REFRESH = "access", "refresh"
+SALT = "users.tokens"
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def lifetime(token_type):
+    if token_type == ACCESS:
+        return getattr(settings, "ACCESS_TOKEN_LIFETIME", 300)
+    return getattr(settings, "REFRESH_TOKEN_LIFETIME", 7 * 24 * 3600)
+
+
+def password_digest(user):
+    return user.get_session_auth_hash()[:16]
+
+
+def issue(user, token_type):
+    payload = {
+        "uid": user.pk,
+        "typ": token_type,
+        "jti": uuid.uuid4().hex,
+        "pwd": password_digest(user),
+    }
+    return signing.dumps(payload, salt=SALT, compress=True)
+
+
+def issue_pair(user):
+    return {"access": issue(user, ACCESS), "refresh": issue(user, REFRESH)}
+
+
+def decode(token, token_type):
+    """
+    The payload of a valid, unexpired, unrevoked ``token`` of ``token_type``;
+    raises InvalidToken otherwise. The password digest is checked by the
+    caller once it has the user.
+    """
+    try:
+        payload = signing.loads(token, salt=SALT, max_age=lifetime(token_type))
+    except signing.SignatureExpired:
+        raise InvalidToken("Token expired")
+    except signing.BadSignature:
+        raise InvalidToken("Invalid token")
+
+    if not isinstance(payload, dict) or payload.get("typ") != token_type:
+        raise InvalidToken("Invalid token")
+    if revocations.is_revoked(payload["jti"]):
+        raise InvalidToken("Token revoked")
+    return payload
+
+
+def check_user(payload, user):
+    if user is None or not user.is_active or payload.get("pwd") != password_digest(user):
+        raise InvalidToken("Invalid token")
+    return user
+
+
+def expiry(token_type):
+    return timezone.now() + timedelta(seconds=lifetime(token_type))
+
+
+def revoke(payload, token_type):
+    revocations.add(payload["jti"], expiry(token_type))
+
+
+def use(payload, token_type):
+    """
+    Revoke a single-use token as it is used; raises InvalidToken if another
+    request, in this process or any other, has used it first.
+    """
+    if not revocations.claim(payload["jti"], expiry(token_type)):
+        raise InvalidToken("Token revoked")
+
+
+class RevocationList:
+    """
+    In-memory mirror of RevokedToken, jti -> expiry. Entries past their
+    expiry are dropped on refresh, as such tokens are rejected anyway, so a
+    long-lived worker holds only the revocations that still matter.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.revoked = {}
+        self.last_id = 0
+        self.refreshed_at = None
+
+    def add(self, jti, expires_at):
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True
+        )
+        with self.lock:
+            self.revoked[jti] = expires_at
+
+    def claim(self, jti, expires_at):
+        """Revoke ``jti``; False if its row already existed."""
+        try:
+            # A savepoint, so that the conflict leaves an outer transaction usable
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+            claimed = True
+        except IntegrityError:
+            claimed = False
+        with self.lock:
+            self.revoked[jti] = expires_at
+        return claimed
+
+    def is_revoked(self, jti):
+        self.refresh()
+        return jti in self.revoked
+
+    def refresh(self):
+        interval = getattr(settings, "TOKEN_REVOCATION_REFRESH", 30)
+        now = time.monotonic()
+        if self.refreshed_at is not None and now - self.refreshed_at < interval:
+            return
+
+        rows = list(
+            RevokedToken.objects.filter(id__gt=self.last_id)
+            .order_by("id")
+            .values_list("id", "jti", "expires_at")
+        )
+        expired_before = timezone.now()
+        with self.lock:
+            self.revoked.update((jti, expires_at) for _, jti, expires_at in rows)
+            self.revoked = {
+                jti: expires_at
+                for jti, expires_at in self.revoked.items()
+                if expires_at >= expired_before
+            }
+            if rows:
+                self.last_id = rows[-1][0]
+            self.refreshed_at = now
+
+
+revocations = RevocationList()
+
+
+def prune():
+    """
+    Forget revocations of tokens that have expired anyway. Returns the number
+    of rows deleted.
+    """
+    deleted, _ = RevokedToken.objects.filter(expires_at__lt=timezone.now()).delete()
+    revocations.clear()
+    return deleted
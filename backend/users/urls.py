@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from django.contrib.auth import views as auth_views
+from . import async_views
 from .views import (
     register,
     admin_dashboard,
@@ -14,7 +15,9 @@ from .views import (
     api_register_view,
     api_login_view,
     api_logout_view,
+    api_token_refresh_view,
     user_info,
+    live_events,
     TransactionViewSet,
     CategoryViewSet,
 )
@@ -40,7 +43,22 @@ urlpatterns = [
     path("api/register/", api_register_view, name="api_register"),
     path("api/login/", api_login_view, name="api_login"),
     path("api/logout/", api_logout_view, name="api_logout"),
+    path("api/token/refresh/", api_token_refresh_view, name="api_token_refresh"),
     path("api/user/", user_info, name="user_info"),
+    path("api/events/", live_events, name="api_events"),
+    # Async versions of the hot read endpoints, for ASGI deployments
+    path("api/async/user/", async_views.user_info, name="async_user_info"),
+    path(
+        "api/async/transactions/",
+        async_views.transaction_list,
+        name="async_transaction_list",
+    ),
+    path(
+        "api/async/transactions/summary/",
+        async_views.transaction_summary,
+        name="async_transaction_summary",
+    ),
+    path("api/async/categories/", async_views.category_list, name="async_category_list"),
     # API endpoints for transactions and categories
     path("api/", include(router.urls)),
 ]
@@ -1,22 +1,45 @@
+import io
+from datetime import MAXYEAR, MINYEAR
+
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import login, authenticate, logout
+from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db.models import Count
-from django.http import JsonResponse
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
 from django.views.decorators.http import require_POST
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    permission_classes,
+    renderer_classes,
+    throttle_classes,
+)
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
 
 from .forms import RegisterForm, AdminUserCreationForm, UserBulkActionForm
-from .models import CustomUser, Transaction, Category
-from .serializers import TransactionSerializer, CategorySerializer
+from .models import CustomUser, Transaction, Category, MonthlyRollup
+from .serializers import (
+    TransactionSerializer,
+    CategorySerializer,
+    TransactionSummarySerializer,
+    MonthlyTotalSerializer,
+)
+from .filters import filter_users
+from .pagination import TransactionPagination, CategoryPagination, UserPagination
+from .cache import PerUserCacheMixin, cache_per_user
+from .throttling import AuthIPThrottle, AuthUsernameThrottle
+from . import auth, batch, changelog, events, exporters, importers, jobs, statistics, tokens
 from django.contrib.auth.forms import AuthenticationForm
-from django.db.models.functions import TruncMonth
-
 
 # ------------------------------
 # Traditional Django Views (HTML)
@@ -27,8 +50,7 @@ def register(request):
     if request.method == "POST":
         form = RegisterForm(request.POST)
         if form.is_valid():
-            user = form.save()
-            login(request, user)
+            auth.register(request, form)
             messages.success(request, "Registration successful!")
             return redirect("home")
     else:
@@ -39,16 +61,11 @@ def register(request):
 def login_view(request):
     if request.method == "POST":
         form = AuthenticationForm(request, data=request.POST)
+        # is_valid() has already authenticated the credentials; don't hash again
         if form.is_valid():
-            username = form.cleaned_data.get("username")
-            password = form.cleaned_data.get("password")
-            user = authenticate(username=username, password=password)
-            if user is not None:
-                login(request, user)
-                messages.success(request, f"Welcome back, {username}!")
-                return redirect("home")
-            else:
-                messages.error(request, "Invalid username or password.")
+            user = auth.sign_in(request, form.get_user())
+            messages.success(request, f"Welcome back, {user.username}!")
+            return redirect("home")
         else:
             messages.error(request, "Invalid username or password.")
     else:
@@ -68,16 +85,12 @@ def is_admin(user):
 @login_required
 @user_passes_test(is_admin)
 def admin_dashboard(request):
-    users_count = CustomUser.objects.count()
-    active_users = CustomUser.objects.filter(is_active=True).count()
-    admin_users = CustomUser.objects.filter(role="admin").count()
-    regular_users = CustomUser.objects.filter(role="user").count()
-
+    stats = statistics.get_statistics()
     response_data = {
-        "users_count": users_count,
-        "active_users": active_users,
-        "admin_users": admin_users,
-        "regular_users": regular_users,
+        "users_count": stats["total_users"],
+        "active_users": stats["active_users"],
+        "admin_users": stats["admin_users"],
+        "regular_users": stats["regular_users"],
     }
 
     return JsonResponse(response_data)
@@ -86,12 +99,28 @@ def admin_dashboard(request):
 @login_required
 @user_passes_test(is_admin)
 def admin_users_list(request):
-    users = CustomUser.objects.all().order_by("username")
-    bulk_form = UserBulkActionForm()
-    bulk_form.fields["users"].queryset = users
+    """
+    One page of users in username order, filtered as described in
+    users.filters. Follow "next"/"previous" for the other pages.
+    """
+    try:
+        users = filter_users(CustomUser.objects.all(), request.GET)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    paginator = UserPagination()
+    fields = ("id", "username", "email", "role", "is_active", "date_joined")
+    try:
+        page = paginator.paginate_queryset(users.only(*fields), request)
+    except NotFound as exc:
+        return JsonResponse({"error": str(exc.detail)}, status=404)
 
     return JsonResponse(
-        {"users": list(users.values("id", "username", "email", "role", "is_active", "date_joined"))}
+        {
+            "users": [{field: getattr(user, field) for field in fields} for user in page],
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+        }
     )
 
 
@@ -134,10 +163,16 @@ def admin_delete_user(request, user_id):
             {"success": False, "error": "You cannot delete your own account"}, status=400
         )
 
-    user_name = user.username
-    user.delete()
+    job = jobs.schedule_user_deletion([user.id], created_by=request.user)
 
-    return JsonResponse({"success": True, "message": f"User {user_name} deleted successfully!"})
+    return JsonResponse(
+        {
+            "success": True,
+            "message": f"User {user.username} scheduled for deletion.",
+            "job": job.id,
+        },
+        status=202,
+    )
 
 
 @login_required
@@ -154,9 +189,16 @@ def admin_bulk_actions(request):
         users = users.exclude(id=current_user.id)
 
         if action == "delete":
-            deleted_count = users.count()
-            users.delete()
-            message = f"{deleted_count} user(s) deleted successfully!"
+            user_ids = list(users.values_list("id", flat=True))
+            job = jobs.schedule_user_deletion(user_ids, created_by=current_user)
+            return JsonResponse(
+                {
+                    "success": True,
+                    "message": f"{len(user_ids)} user(s) scheduled for deletion.",
+                    "job": job.id,
+                },
+                status=202,
+            )
         elif action == "activate":
             users.update(is_active=True)
             message = f"{users.count()} user(s) activated successfully!"
@@ -175,34 +217,7 @@ def admin_bulk_actions(request):
 @login_required
 @user_passes_test(is_admin)
 def admin_user_statistics(request):
-    total_users = CustomUser.objects.count()
-    active_users = CustomUser.objects.filter(is_active=True).count()
-    inactive_users = total_users - active_users
-    admin_users = CustomUser.objects.filter(role="admin").count()
-    regular_users = CustomUser.objects.filter(role="user").count()
-
-    users_by_month = (
-        CustomUser.objects.annotate(month=TruncMonth("date_joined"))
-        .values("month")
-        .annotate(count=Count("id"))
-        .order_by("month")
-    )
-
-    users_by_month_data = [
-        {"month": entry["month"].strftime("%Y-%m"), "count": entry["count"]}
-        for entry in users_by_month
-    ]
-
-    return JsonResponse(
-        {
-            "total_users": total_users,
-            "active_users": active_users,
-            "inactive_users": inactive_users,
-            "admin_users": admin_users,
-            "regular_users": regular_users,
-            "users_by_month": users_by_month_data,
-        }
-    )
+    return JsonResponse(statistics.get_statistics())
 
 
 # ------------------------------
@@ -218,11 +233,11 @@ def get_csrf_token(request):
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def api_register_view(request):
     form = RegisterForm(data=request.data)
     if form.is_valid():
-        user = form.save()
-        login(request, user)
+        user = auth.register(request, form)
         return Response(
             {
                 "user": user.username,
@@ -237,34 +252,67 @@ def api_register_view(request):
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def api_login_view(request):
     username = request.data.get("username", "")
     password = request.data.get("password", "")
-    user = authenticate(username=username, password=password)
+    user = auth.authenticate_user(request, username, password)
 
     if user is not None:
-        login(request, user)
+        auth.sign_in(request, user)
+        token_pair = tokens.issue_pair(user)
         return Response(
             {
                 "user": user.username,
                 "email": user.email,
                 "message": "Login successful",
-                "token": "session-auth",  # Placeholder for frontend
+                # Send as "Authorization: Bearer <access>"; the session cookie works too
+                "token": token_pair["access"],
+                **token_pair,
             },
             status=status.HTTP_200_OK,
         )
     return Response({"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
 
 
+@csrf_exempt
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def api_token_refresh_view(request):
+    """
+    Exchange a refresh token for a new access/refresh pair. The refresh
+    token is single use: it is revoked here, before the new pair is issued.
+    """
+    try:
+        payload = tokens.decode(str(request.data.get("refresh", "")), tokens.REFRESH)
+        user = CustomUser.objects.filter(pk=payload["uid"]).first()
+        tokens.check_user(payload, user)
+        tokens.use(payload, tokens.REFRESH)
+    except tokens.InvalidToken as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
+
+    return Response(tokens.issue_pair(user), status=status.HTTP_200_OK)
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def api_logout_view(request):
+    # Token clients: revoke the access token in use and the refresh token, if sent
+    if isinstance(request.auth, dict):
+        tokens.revoke(request.auth, tokens.ACCESS)
+    refresh = request.data.get("refresh")
+    if refresh:
+        try:
+            tokens.revoke(tokens.decode(str(refresh), tokens.REFRESH), tokens.REFRESH)
+        except tokens.InvalidToken:
+            pass
     logout(request)
     return Response({"message": "Logout successful"}, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@cache_per_user
 def user_info(request):
     user = request.user
     return Response(
@@ -276,23 +324,328 @@ def user_info(request):
     )
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    """
+    Transactions and categories changed since ?since=<cursor>, as described
+    in users.changelog. Omit ``since`` to get a cursor to start from.
+    """
+    params = {}
+    for param, default in (("since", None), ("limit", changelog.SYNC_PAGE_SIZE)):
+        value = request.query_params.get(param)
+        if not value:
+            params[param] = default
+        elif value.isascii() and value.isdigit():
+            params[param] = int(value)
+        else:
+            return Response({"error": f"Invalid {param}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    limit = min(max(params["limit"], 1), changelog.SYNC_MAX_PAGE_SIZE)
+    return Response(
+        changelog.changes_since(request.user, params["since"], limit, context={"request": request})
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def batch_operations(request):
+    """
+    Run an ordered list of transaction and category writes in one DB
+    transaction, as described in users.batch. All or nothing: on the first
+    failing operation nothing is written and the results up to it are
+    returned with its index.
+    """
+    try:
+        operations = batch.parse(request.data)
+    except batch.InvalidBatch as error:
+        return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results = batch.execute(request, operations)
+    except batch.Failed as failure:
+        return Response(
+            {
+                "error": f"Operation {failure.index} failed, nothing was written",
+                "index": failure.index,
+                "results": failure.results,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return Response({"results": results})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, events.EventStreamRenderer])
+def live_events(request):
+    """
+    Server-Sent Events stream of the user's ledger changes (see users.events).
+    Open it with ``new EventSource("/users/api/events/")``.
+    """
+    user_id = request.user.pk
+    if isinstance(request._request, ASGIRequest):
+        body = events.astream(user_id)
+    else:
+        body = events.stream(user_id)
+    response = StreamingHttpResponse(body, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def bulk_errors(errors):
+    """
+    Per-row errors of a ListSerializer as {"errors": [{"index": i, "errors": {...}}]}.
+    """
+    if isinstance(errors, dict):
+        if api_settings.NON_FIELD_ERRORS_KEY in errors:
+            return errors
+        rows = errors.items()
+    else:
+        rows = enumerate(errors)
+    return {"errors": [{"index": index, "errors": row} for index, row in rows if row]}
+
+
+def summary_rows(user):
+    """Per-category totals of ``user``'s transactions: one GROUP BY query."""
+    return (
+        Transaction.objects.filter(user=user)
+        .values("category_id", "category__name")
+        .annotate(
+            total=Sum("amount", default=0),
+            income=Sum("amount", filter=Q(amount__gt=0), default=0),
+            expenses=Sum("amount", filter=Q(amount__lt=0), default=0),
+            count=Count("id"),
+        )
+        .order_by("category__name")
+    )
+
+
+def summarize(rows):
+    """The TransactionSummarySerializer input for the rows of ``summary_rows``."""
+    categories = [
+        {
+            "category_id": row["category_id"],
+            "category_name": row["category__name"],
+            "total": row["total"],
+            "income": row["income"],
+            "expenses": row["expenses"],
+            "count": row["count"],
+        }
+        for row in rows
+    ]
+    return {
+        "balance": sum(row["total"] for row in categories),
+        "income": sum(row["income"] for row in categories),
+        "expenses": sum(row["expenses"] for row in categories),
+        "count": sum(row["count"] for row in categories),
+        "categories": categories,
+    }
+
+
+class TransactionViewSet(PerUserCacheMixin, viewsets.ModelViewSet):
     queryset = Transaction.objects.none()
     serializer_class = TransactionSerializer
+    pagination_class = TransactionPagination
+    bulk_max_rows = 5000
 
     def get_queryset(self):
-        return Transaction.objects.filter(user=self.request.user).order_by("-date")
+        return (
+            Transaction.objects.filter(user=self.request.user)
+            .select_related("category")
+            .order_by("-date", "-id")
+        )
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Create many transactions in one DB transaction. The batch is all or
+        nothing: if any row is invalid, nothing is written and the per-row
+        errors are returned.
+        """
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.bulk_max_rows
+        )
+        if not serializer.is_valid():
+            return Response(bulk_errors(serializer.errors), status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        """
+        Partially update many transactions, each row identified by its "id".
+        """
+        ids = []
+        if isinstance(request.data, list):
+            ids = [
+                row["id"]
+                for row in request.data
+                if isinstance(row, dict) and type(row.get("id")) is int
+            ]
+        instances = (
+            Transaction.objects.filter(user=request.user).select_related("category").in_bulk(ids)
+        )
+
+        serializer = self.get_serializer(
+            list(instances.values()),
+            data=request.data,
+            many=True,
+            partial=True,
+            max_length=self.bulk_max_rows,
+        )
+        if not serializer.is_valid():
+            return Response(bulk_errors(serializer.errors), status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        """
+        Delete the transactions listed in {"ids": [...]}. Reports which ids
+        were deleted and which did not exist.
+        """
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        if (
+            not isinstance(ids, list)
+            or len(ids) > self.bulk_max_rows
+            or not all(type(pk) is int for pk in ids)
+        ):
+            return Response(
+                {"error": f"ids must be a list of at most {self.bulk_max_rows} integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            transactions = Transaction.objects.filter(user=request.user, pk__in=ids)
+            deleted = set(transactions.values_list("pk", flat=True))
+            transactions.delete()
+
+        return Response(
+            {
+                "deleted": sorted(deleted),
+                "not_found": [pk for pk in ids if pk not in deleted],
+            }
+        )
+
+    @action(detail=False, methods=["post"], url_path="import", url_name="import")
+    def import_file(self, request):
+        """
+        Import an uploaded CSV, OFX or QIF bank export. The format is taken
+        from a ``format`` form field next to the file, or else from the file
+        extension (``?format=`` would pick DRF's renderer). Invalid rows are
+        skipped and listed in the report.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "Missing file"}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get("format") or importers.detect_format(upload.name)
+        if file_format not in importers.FORMATS:
+            return Response(
+                {"error": f"Unsupported format, expected one of {', '.join(importers.FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            chunk_size = min(max(int(request.data.get("chunk_size", 1000)), 1), 10000)
+        except ValueError:
+            return Response({"error": "Invalid chunk_size"}, status=status.HTTP_400_BAD_REQUEST)
+
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", errors="replace", newline="")
+        report = importers.import_transactions(
+            request.user, importers.PARSERS[file_format](lines), chunk_size=chunk_size
+        )
+        return Response(report)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[JSONRenderer, exporters.CSVRenderer, exporters.NDJSONRenderer],
+    )
+    def export(self, request):
+        """
+        Stream the user's transactions as ?format=csv (default) or ndjson,
+        optionally limited to ?from=YYYY-MM-DD and ?to=YYYY-MM-DD.
+        """
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, exporters.ExportRenderer):
+            renderer = exporters.CSVRenderer()
+
+        bounds = {}
+        for param in ("from", "to"):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    bounds[param] = parse_date(value)
+                except ValueError:
+                    bounds[param] = None
+                if bounds[param] is None:
+                    return Response(
+                        {"error": f"Invalid {param} date"}, status=status.HTTP_400_BAD_REQUEST
+                    )
+
+        rows = exporters.export_rows(request.user, bounds.get("from"), bounds.get("to"))
+        response = StreamingHttpResponse(
+            exporters.stream(rows, renderer.format), content_type=renderer.media_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="transactions.{renderer.format}"'
+        return response
+
+    @action(detail=False, methods=["get"])
+    @cache_per_user
+    def summary(self, request):
+        """
+        Balance, income/expense split and per-category totals over the user's
+        whole ledger, computed by a single GROUP BY query.
+        """
+        rows = summary_rows(request.user)
+        serializer = TransactionSummarySerializer(summarize(rows))
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["get"])
+    @cache_per_user
+    def monthly(self, request):
+        """
+        Per-month totals read from MonthlyRollup, optionally limited to ?year=.
+        """
+        rollups = MonthlyRollup.objects.filter(user=request.user)
+
+        year = request.query_params.get("year")
+        if year:
+            if not (year.isascii() and year.isdigit() and MINYEAR <= int(year) <= MAXYEAR):
+                return Response({"error": "Invalid year"}, status=status.HTTP_400_BAD_REQUEST)
+            rollups = rollups.filter(month__year=int(year))
+
+        months = (
+            rollups.values("month")
+            .annotate(
+                total=Sum("total"),
+                count=Sum("count"),
+                min_amount=Min("min_amount"),
+                max_amount=Max("max_amount"),
+            )
+            .order_by("month")
+        )
+        return Response(MonthlyTotalSerializer(months, many=True).data)
+
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(PerUserCacheMixin, viewsets.ModelViewSet):
     queryset = Category.objects.none()
     serializer_class = CategorySerializer
+    pagination_class = CategoryPagination
 
     def get_queryset(self):
-        return Category.objects.filter(user=self.request.user).order_by("name")
+        return Category.objects.filter(user=self.request.user).order_by("name", "id")
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
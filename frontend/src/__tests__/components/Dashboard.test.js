@@ -50,6 +50,18 @@ describe("Dashboard Component", () => {
     authService.getUserProfile.mockResolvedValue(mockUser);
 
     axiosInstance.get.mockImplementation((url) => {
+      if (url.includes("/api/transactions/summary/")) {
+        return Promise.resolve({
+          data: {
+            balance: "200.00",
+            income: "200.00",
+            expenses: "0.00",
+            count: 1,
+            categories: [],
+          },
+        });
+      }
+
       if (url.includes("/api/transactions/")) {
         return Promise.resolve({
           data: {
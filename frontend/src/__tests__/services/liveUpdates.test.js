@@ -0,0 +1,70 @@
+import { applyChanges, subscribe } from "../../services/liveUpdates";
+
+describe("Live updates", () => {
+  const food = { id: 1, name: "Food", user: 1 };
+  const transactions = [
+    { id: 2, amount: "-5.00", description: "Lunch", date: "2025-05-28", category: food },
+    { id: 1, amount: "200.00", description: "Pay", date: "2025-05-01", category: null },
+  ];
+
+  test("adds, updates and removes transactions", () => {
+    const result = applyChanges(transactions, [
+      {
+        type: "transaction",
+        op: "created",
+        id: 3,
+        amount: "-7.50",
+        date: "2025-05-30",
+        description: "Dinner",
+        category_id: 1,
+      },
+      {
+        type: "transaction",
+        op: "updated",
+        id: 2,
+        amount: "-6.00",
+        date: "2025-05-28",
+        description: "Lunch",
+        category_id: null,
+      },
+      { type: "transaction", op: "deleted", id: 1 },
+    ]);
+
+    expect(result.map((tx) => tx.id)).toEqual([3, 2]);
+    expect(result[0].category).toEqual(food);
+    expect(result[1]).toMatchObject({ amount: "-6.00", category: null });
+  });
+
+  test("renames and removes categories", () => {
+    const renamed = applyChanges(transactions, [
+      { type: "category", op: "updated", id: 1, name: "Groceries" },
+    ]);
+    expect(renamed[0].category.name).toBe("Groceries");
+
+    const removed = applyChanges(transactions, [
+      { type: "category", op: "deleted", id: 1 },
+    ]);
+    expect(removed[0].category).toBeNull();
+  });
+
+  test("asks for a reload when it cannot patch the list", () => {
+    expect(applyChanges(transactions, [{ op: "resync" }])).toBeNull();
+    expect(
+      applyChanges(transactions, [
+        {
+          type: "transaction",
+          op: "created",
+          id: 3,
+          amount: "1.00",
+          date: "2025-05-30",
+          description: "",
+          category_id: 99,
+        },
+      ]),
+    ).toBeNull();
+  });
+
+  test("does nothing without EventSource", () => {
+    expect(subscribe({ onReady: jest.fn(), onDelta: jest.fn() })).toBeNull();
+  });
+});
@@ -1,19 +1,26 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import authService, { axiosInstance } from "../services/authService";
 import "./Dashboard.css";
 import TransactionForm from "./TransactionForm";
+import { applyChanges, subscribe } from "../services/liveUpdates";
 
 const Dashboard = () => {
   const [user, setUser] = useState(null);
   const [transactions, setTransactions] = useState([]);
+  const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
+  const live = useRef(false);
   const navigate = useNavigate();
 
   const fetchTransactions = async () => {
     try {
-      const res = await axiosInstance.get("/api/transactions/");
+      const [res, summaryRes] = await Promise.all([
+        axiosInstance.get("/api/transactions/"),
+        axiosInstance.get("/api/transactions/summary/"),
+      ]);
       setTransactions(res.data.results);
+      setSummary(summaryRes.data);
     } catch (err) {
       console.error("Error loading transactions", err);
     }
@@ -39,10 +46,40 @@ const Dashboard = () => {
     fetchData();
   }, [navigate]);
 
-  const totalBalance = transactions.reduce(
-    (acc, tx) => acc + parseFloat(tx.amount),
-    0,
-  );
+  useEffect(() => {
+    if (!authService.getCurrentUser()) return undefined;
+
+    let connected = false;
+    const close = subscribe({
+      onReady: ({ balance }) => {
+        // A reconnect may have missed changes; the first load already fetched
+        if (connected) fetchTransactions();
+        connected = live.current = true;
+        setSummary((current) => ({ ...current, balance }));
+      },
+      onDelta: ({ balance, changes, resync }) => {
+        setSummary((current) => ({ ...current, balance }));
+        if (resync) {
+          fetchTransactions();
+          return;
+        }
+        setTransactions((current) => {
+          const updated = applyChanges(current, changes);
+          if (updated === null) {
+            fetchTransactions();
+            return current;
+          }
+          return updated;
+        });
+      },
+    });
+    return () => {
+      live.current = false;
+      if (close) close();
+    };
+  }, []);
+
+  const totalBalance = parseFloat(summary?.balance ?? 0);
 
   const grouped = transactions.reduce((acc, tx) => {
     acc[tx.date] = acc[tx.date] || [];
@@ -88,7 +125,12 @@ const Dashboard = () => {
           </ul>
         </div>
 
-        <TransactionForm onAddTransaction={fetchTransactions} />
+        <TransactionForm
+          onAddTransaction={() => {
+            // With live updates on, the new transaction arrives as a delta
+            if (!live.current) fetchTransactions();
+          }}
+        />
 
         <div className="dashboard-card">
           <h2>Recent Transactions</h2>
@@ -0,0 +1,64 @@
+// Live ledger updates pushed by the backend over Server-Sent Events
+// (backend/users/events.py), so the dashboard does not re-poll the list.
+
+const EVENTS_URL = "http://localhost:8000/users/api/events/";
+
+const newestFirst = (a, b) =>
+  a.date === b.date ? b.id - a.id : a.date < b.date ? 1 : -1;
+
+// Apply transaction deltas to the list shown on the dashboard. Returns null
+// when the list cannot be patched (a bulk write, or a category the list does
+// not know yet) and should be fetched again instead.
+export const applyChanges = (transactions, changes) => {
+  const categories = {};
+  transactions.forEach((tx) => {
+    if (tx.category) categories[tx.category.id] = tx.category;
+  });
+
+  let result = transactions;
+  for (const change of changes) {
+    if (change.op === "resync") return null;
+
+    if (change.type === "category") {
+      if (change.op === "deleted") {
+        result = result.map((tx) =>
+          tx.category?.id === change.id ? { ...tx, category: null } : tx,
+        );
+      } else {
+        categories[change.id] = { ...categories[change.id], ...change };
+        result = result.map((tx) =>
+          tx.category?.id === change.id
+            ? { ...tx, category: categories[change.id] }
+            : tx,
+        );
+      }
+      continue;
+    }
+
+    result = result.filter((tx) => tx.id !== change.id);
+    if (change.op === "deleted") continue;
+
+    const { category_id: categoryId, type, op, ...fields } = change;
+    if (categoryId !== null && !categories[categoryId]) return null;
+    result = [
+      ...result,
+      { ...fields, category: categoryId === null ? null : categories[categoryId] },
+    ];
+  }
+  return [...result].sort(newestFirst);
+};
+
+// Subscribe to the stream; returns a function that closes it, or null when
+// the browser has no EventSource.
+export const subscribe = ({ onReady, onDelta }) => {
+  if (typeof EventSource === "undefined") return null;
+
+  const source = new EventSource(EVENTS_URL, { withCredentials: true });
+  source.addEventListener("ready", (event) =>
+    onReady(JSON.parse(event.data)),
+  );
+  source.addEventListener("delta", (event) =>
+    onDelta(JSON.parse(event.data)),
+  );
+  return () => source.close();
+};